@@ -0,0 +1,260 @@
+"""
+Снимок первичной загрузки публичной части (GET /bootstrap): настройки, страницы, сайты,
+шаблоны и узлы workflow схем одним ответом. Разделы и записи в них хранятся готовым JSON;
+запись через админские endpoints (сброс групп response_cache) пересобирает только
+затронутые разделы, а в них - только изменившиеся записи. Ответ склеивается
+из готовых частей, запрос посетителя БД не трогает
+"""
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.response_cache import make_etag, response_cache, serialize
+from app.api.pagination import paginate
+from app.api.settings_cache import settings_cache
+from app.models.page import PageContent
+from app.models.template import Template, WorkflowStep
+from app.models.website import Website
+from app.models.workflow_schema import WorkflowSchema
+from app.schemas.page import PageContentResponse
+from app.schemas.template import TemplateResponse
+from app.schemas.website import WebsiteResponse
+
+# Группа response_cache -> ключ раздела в ответе (в порядке сборки)
+SECTIONS: Dict[str, str] = {
+    "settings": "settings",
+    "pages": "pages",
+    "websites": "websites",
+    "templates": "templates",
+    "workflow-schemas": "workflow_schemas",
+}
+
+# Разделы, которые пересобираются вместе с данным: схемы берутся для шаблонов из снимка
+DEPENDENTS: Dict[str, Tuple[str, ...]] = {"templates": ("workflow-schemas",)}
+
+# Размер пачки id в IN (...) при загрузке изменившихся записей
+LOAD_CHUNK = 500
+
+Snapshot = Tuple[bytes, str, Dict[str, bytes]]
+
+
+def template_stamp() -> List[Any]:
+    """
+    Отметка изменения шаблона: updated_at, число шагов и последнее изменение шага
+    (правка шагов не обновляет строку шаблона)
+    """
+    steps = WorkflowStep.template_id == Template.id
+    return [
+        Template.updated_at,
+        select(func.count()).where(steps).scalar_subquery(),
+        select(func.max(WorkflowStep.updated_at)).where(steps).scalar_subquery(),
+    ]
+
+
+class _ListSection:
+    """
+    Раздел-список (первая страница в порядке списочного endpoint'а). JSON каждой записи
+    хранится отдельно с отметкой изменения; при пересборке читаются только отметки,
+    а загружаются и сериализуются заново лишь записи с изменившейся отметкой
+    """
+
+    def __init__(self, model, response_type: Any, stamp: Callable[[], List[Any]]):
+        self.model = model
+        self.response_type = response_type
+        self.stamp = stamp
+        self.ids: List[str] = []
+        self._fragments: Dict[str, Tuple[tuple, bytes]] = {}
+
+    def clear(self) -> None:
+        self._fragments = {}
+
+    def build(self, session: Session) -> bytes:
+        model = self.model
+        rows = paginate(
+            session.query(model.id, *self.stamp()), model, 0, settings.BOOTSTRAP_LIST_LIMIT, None
+        ).all()
+        stamps = {row[0]: tuple(row[1:]) for row in rows}
+        changed = [id for id, stamp in stamps.items() if self._fragments.get(id, (None,))[0] != stamp]
+        fresh: Dict[str, bytes] = {}
+        for start in range(0, len(changed), LOAD_CHUNK):
+            for obj in session.query(model).filter(model.id.in_(changed[start:start + LOAD_CHUNK])):
+                fresh[obj.id] = serialize(obj, self.response_type)
+        fragments = {}
+        for id, stamp in stamps.items():
+            if id in fresh:
+                fragments[id] = (stamp, fresh[id])
+            elif id in self._fragments and id not in changed:
+                fragments[id] = self._fragments[id]
+            # иначе запись удалена между запросами - в снимок не попадает
+        self._fragments = fragments
+        self.ids = list(fragments)
+        return b"[" + b",".join(fragment for _, fragment in fragments.values()) + b"]"
+
+
+class _WorkflowSchemasSection:
+    """
+    Узлы схем шаблонов раздела templates; узлы схемы пересериализуются при смене её версии
+    """
+
+    def __init__(self, templates: _ListSection):
+        self.templates = templates
+        self._fragments: Dict[str, Tuple[int, bytes]] = {}
+
+    def clear(self) -> None:
+        self._fragments = {}
+
+    def build(self, session: Session) -> bytes:
+        template_ids = self.templates.ids
+        versions: Dict[str, int] = {}
+        for start in range(0, len(template_ids), LOAD_CHUNK):
+            versions.update(session.query(WorkflowSchema.template_id, WorkflowSchema.version).filter(
+                WorkflowSchema.template_id.in_(template_ids[start:start + LOAD_CHUNK])
+            ).all())
+        changed = [id for id, version in versions.items() if self._fragments.get(id, (None,))[0] != version]
+        fragments = {id: self._fragments[id] for id in versions if id not in changed}
+        for start in range(0, len(changed), LOAD_CHUNK):
+            for template_id, version, nodes in session.query(
+                WorkflowSchema.template_id, WorkflowSchema.version, WorkflowSchema.nodes
+            ).filter(WorkflowSchema.template_id.in_(changed[start:start + LOAD_CHUNK])):
+                fragments[template_id] = (version, serialize(nodes or [], List[Dict[str, Any]]))
+        self._fragments = fragments
+        # Шаблон без схемы - пустой список узлов, как GET /workflow-schemas/template/{id}
+        return b"{" + b",".join(
+            json.dumps(id).encode() + b":" + (fragments[id][1] if id in fragments else b"[]")
+            for id in template_ids
+        ) + b"}"
+
+
+class BootstrapSnapshot:
+    """
+    Версионированный снимок ответа /bootstrap.
+    Сброс группы response_cache в этом процессе пересобирает её раздел сразу;
+    изменения из других процессов подхватываются полной пересборкой в фоне
+    раз в refresh_interval секунд (до её окончания отдаётся прежний снимок)
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self.version = 0
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._sections: Dict[str, bytes] = {}
+        self._body: Optional[bytes] = None
+        self._etag: Optional[str] = None
+        self._variants: Dict[str, bytes] = {}
+        self._built_at = 0.0
+        self._refreshing = False
+        templates = _ListSection(Template, TemplateResponse, template_stamp)
+        self._lists = {
+            "pages": _ListSection(
+                PageContent, PageContentResponse, lambda: [PageContent.version, PageContent.updated_at]
+            ),
+            "websites": _ListSection(Website, WebsiteResponse, lambda: [Website.updated_at]),
+            "templates": templates,
+            "workflow-schemas": _WorkflowSchemasSection(templates),
+        }
+        self._builders: Dict[str, Callable[[Session], bytes]] = {
+            "settings": lambda session: settings_cache.refresh(session)[0],
+            **{group: section.build for group, section in self._lists.items()},
+        }
+
+    def current(self) -> Optional[Snapshot]:
+        """
+        Тело, ETag и сжатые варианты текущего снимка; None - снимок ещё не собран.
+        Устаревший снимок отдаётся, а полная пересборка запускается в фоне
+        """
+        with self._lock:
+            if self._body is None:
+                return None
+            refresh = not self._refreshing and time.monotonic() - self._built_at >= self.refresh_interval
+            if refresh:
+                self._refreshing = True
+            snapshot = self._body, self._etag, self._variants
+        if refresh:
+            threading.Thread(target=self._refresh, name="bootstrap-refresh", daemon=True).start()
+        return snapshot
+
+    def build(self, session: Session, groups: Optional[Iterable[str]] = None) -> Snapshot:
+        """
+        Пересобрать разделы групп (None - все) и склеить новый снимок;
+        версия растёт, только если изменились байты разделов.
+        Полная пересборка сериализует все записи заново: отметки изменения
+        не видят правок в обход ORM (SQL вручную, миграции)
+        """
+        full = groups is None or self._body is None
+        if full:
+            wanted = set(SECTIONS)
+        else:
+            wanted = set(groups)
+            for group in list(wanted):
+                wanted.update(DEPENDENTS.get(group, ()))
+        with self._build_lock:
+            if full:
+                for section in self._lists.values():
+                    section.clear()
+            sections = dict(self._sections)
+            for group in SECTIONS:
+                if group in wanted:
+                    sections[group] = self._builders[group](session)
+            if self._body is not None and sections == self._sections:
+                # Данные не изменились: прежние версия, тело и ETag (If-None-Match продолжает работать)
+                with self._lock:
+                    if full:
+                        self._built_at = time.monotonic()
+                    return self._body, self._etag, self._variants
+            version = self.version + 1
+            body = b"".join((
+                b'{"version":', str(version).encode(), b",",
+                b",".join(b'"%s":%s' % (key.encode(), sections[group]) for group, key in SECTIONS.items()),
+                b"}",
+            ))
+            etag = make_etag(body)
+            variants: Dict[str, bytes] = {}
+            with self._lock:
+                self._sections = sections
+                self.version = version
+                self._body, self._etag, self._variants = body, etag, variants
+                if full:
+                    self._built_at = time.monotonic()
+        return body, etag, variants
+
+    def load(self) -> None:
+        """
+        Сборка при старте приложения
+        """
+        with SessionLocal() as session:
+            self.build(session)
+        logger.info(f"Снимок bootstrap собран: {len(self._body)} байт")
+
+    def on_invalidate(self, groups: Tuple[str, ...]) -> None:
+        """
+        Подписчик response_cache: пересобрать разделы сброшенных групп
+        """
+        affected = [group for group in groups if group in SECTIONS]
+        if not affected or self._body is None:
+            return
+        with SessionLocal() as session:
+            self.build(session, affected)
+
+    def _refresh(self) -> None:
+        try:
+            with SessionLocal() as session:
+                self.build(session)
+        except Exception as e:
+            logger.exception(f"Ошибка фоновой пересборки снимка bootstrap: {e}")
+            with self._lock:
+                self._built_at = time.monotonic()  # следующая попытка - через refresh_interval
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+
+bootstrap_snapshot = BootstrapSnapshot(refresh_interval=settings.BOOTSTRAP_REFRESH_SECONDS)
+response_cache.subscribe(bootstrap_snapshot.on_invalidate)
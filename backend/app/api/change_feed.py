@@ -0,0 +1,246 @@
+"""
+Лента изменений контента: компактные события (тип, id, действие, версия) о записях
+сайтов, шаблонов, страниц, настроек и workflow схем. События собираются в after_flush
+(массовый импорт идёт мимо flush и добавляет их явно), публикуются после коммита
+транзакции и раздаются подписчикам GET /changes/stream (SSE) и GET /changes.
+
+Перед публикацией тот же after_commit сбрасывает группы response_cache (и кеш настроек)
+изменённых записей: клиент, перечитавший запись сразу по событию, не получит из кеша
+ответ и ETag до изменения.
+
+Лента и кеши живут в памяти процесса. При нескольких воркерах событие получают только
+клиенты воркера, через который сделана запись, а кеши остальных воркеров устаревают
+до RESPONSE_CACHE_TTL_SECONDS (снимок bootstrap - до BOOTSTRAP_REFRESH_SECONDS)
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.response_cache import response_cache
+from app.api.settings_cache import settings_cache
+from app.models.page import PageContent
+from app.models.settings import Settings
+from app.models.template import Template, WorkflowStep
+from app.models.website import Website
+from app.models.workflow_schema import WorkflowSchema
+
+# Ключ session.info с изменениями незакоммиченной транзакции: (тип, id) -> событие
+_PENDING_KEY = "change_feed"
+
+# Тип события (как в NDJSON-экспорте) и id, по которому запись читается через API
+ENTITY_KEYS = {
+    Website: ("website", "id"),
+    Template: ("template", "id"),
+    PageContent: ("page", "page_id"),
+    Settings: ("settings", "id"),
+    WorkflowSchema: ("workflow_schema", "template_id"),
+}
+
+# Группы response_cache с ответами по записям каждого типа
+CACHE_GROUPS = {
+    "website": ("websites",),
+    "template": ("templates",),
+    "page": ("pages",),
+    "settings": ("settings",),
+    "workflow_schema": ("workflow-schemas",),
+}
+
+# Событие: номер, данные и готовый блок SSE
+Event = Tuple[int, Dict[str, Any], bytes]
+
+
+def record_change(session: Session, type_: str, id: str, action: str, version: Optional[int] = None) -> None:
+    """
+    Добавить событие транзакции; опубликуется после коммита, при откате - отбрасывается.
+    Повторное изменение записи в той же транзакции заменяет событие (created остаётся created)
+    """
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    previous = pending.get((type_, id))
+    if previous is not None and previous["action"] == "created" and action == "updated":
+        action = "created"
+    pending[(type_, id)] = {"type": type_, "id": id, "action": action, "version": version}
+
+
+class _Subscriber:
+    """
+    Подписчик потока: собственный буфер не длиннее limit событий. Переполнение
+    (медленный клиент) очищает буфер - клиент получит reset и перечитает данные
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, limit: int):
+        self.loop = loop
+        self.limit = limit
+        self.ready = asyncio.Event()
+        self._lock = threading.Lock()
+        self._buffer: deque = deque()
+        self._overflowed = False
+
+    def push(self, events: List[Event]) -> None:
+        with self._lock:
+            if not self._overflowed:
+                self._buffer.extend(events)
+                if len(self._buffer) > self.limit:
+                    self._buffer.clear()
+                    self._overflowed = True
+        try:
+            self.loop.call_soon_threadsafe(self.ready.set)
+        except RuntimeError:
+            pass  # цикл событий уже закрыт
+
+    def take(self) -> Tuple[List[Event], bool]:
+        """
+        Накопленные события и признак переполнения (вызывается из цикла событий подписчика)
+        """
+        with self._lock:
+            self.ready.clear()
+            events = list(self._buffer)
+            self._buffer.clear()
+            overflowed, self._overflowed = self._overflowed, False
+        return events, overflowed
+
+
+class ChangeFeed:
+    """
+    Последние history событий с возрастающими номерами и рассылка подписчикам.
+    id события SSE - "<эпоха>:<номер>": эпоха меняется при перезапуске процесса,
+    так что клиент с id из прошлой эпохи или старше истории получает reset
+    """
+
+    def __init__(self, history: int, client_buffer: int):
+        self.client_buffer = client_buffer
+        self.epoch = str(int(time.time() * 1000))
+        self._lock = threading.Lock()
+        self._history: deque = deque(maxlen=history)
+        self._last = 0
+        self._subscribers: set = set()
+
+    @property
+    def last_id(self) -> str:
+        return f"{self.epoch}:{self._last}"
+
+    def publish(self, changes: Iterable[Dict[str, Any]]) -> None:
+        """
+        Присвоить событиям номера, сохранить в истории и разослать подписчикам
+        """
+        with self._lock:
+            events = []
+            for change in changes:
+                self._last += 1
+                change = dict(change)
+                data = json.dumps(change, separators=(",", ":"), ensure_ascii=False)
+                body = f"id: {self.epoch}:{self._last}\nevent: change\ndata: {data}\n\n".encode()
+                events.append((self._last, change, body))
+            if not events:
+                return
+            self._history.extend(events)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.push(events)
+
+    def _since(self, after: Optional[str]) -> Optional[List[Event]]:
+        """
+        События после id after (под self._lock); None - продолжить нельзя, нужен reset
+        """
+        if after is None:
+            return []
+        epoch, _, number = after.partition(":")
+        if epoch != self.epoch or not (number.isascii() and number.isdecimal()) or int(number) > self._last:
+            return None
+        number = int(number)
+        oldest = self._history[0][0] if self._history else self._last + 1
+        if number < oldest - 1:
+            return None
+        return [event for event in self._history if event[0] > number]
+
+    def since(self, after: Optional[str]) -> Tuple[Optional[List[Event]], str]:
+        """
+        События после id after и id последнего события
+        """
+        with self._lock:
+            return self._since(after), self.last_id
+
+    def subscribe(self, after: Optional[str]) -> Tuple[_Subscriber, Optional[List[Event]]]:
+        """
+        Подписаться и получить пропущенные после after события (None - нужен reset).
+        Подписка и выборка истории атомарны: событие не теряется и не приходит дважды
+        """
+        subscriber = _Subscriber(asyncio.get_running_loop(), self.client_buffer)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            return subscriber, self._since(after)
+
+    def unsubscribe(self, subscriber: _Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def reset_event(self) -> bytes:
+        """
+        Событие reset: клиенту нужно перечитать данные целиком и продолжить с этого id
+        """
+        with self._lock:
+            return f"id: {self.last_id}\nevent: reset\ndata: {{}}\n\n".encode()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"subscribers": len(self._subscribers), "events": self._last, "history": len(self._history)}
+
+
+change_feed = ChangeFeed(history=settings.CHANGE_FEED_HISTORY, client_buffer=settings.CHANGE_FEED_CLIENT_BUFFER)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context) -> None:
+    """
+    После flush запомнить созданные, изменённые и удалённые записи контента
+    """
+    for objects, action in ((session.new, "created"), (session.dirty, "updated"), (session.deleted, "deleted")):
+        for obj in objects:
+            if isinstance(obj, WorkflowStep):
+                # Изменение шагов - изменение шаблона, если он сам не попал в транзакцию
+                if obj.template_id and ("template", obj.template_id) not in session.info.get(_PENDING_KEY, {}):
+                    record_change(session, "template", obj.template_id, "updated")
+                continue
+            key = ENTITY_KEYS.get(type(obj))
+            if key is None or (action == "updated" and not session.is_modified(obj, include_collections=False)):
+                continue
+            type_, attribute = key
+            if action == "updated":
+                # Смена page_id / template_id: для клиента прежняя запись удалена
+                history = inspect(obj).attrs[attribute].history
+                for old in history.deleted or ():
+                    if old is not None:
+                        record_change(session, type_, old, "deleted")
+            record_change(session, type_, getattr(obj, attribute), action, getattr(obj, "version", None))
+
+
+def _invalidate_caches(changes: Iterable[Dict[str, Any]]) -> None:
+    groups = set()
+    for change in changes:
+        groups.update(CACHE_GROUPS[change["type"]])
+        if change["type"] == "template" and change["action"] == "deleted":
+            groups.add("workflow-schemas")  # схема удаляется каскадно в БД
+    if "settings" in groups:
+        settings_cache.invalidate()
+    if groups:
+        response_cache.invalidate(*sorted(groups))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        # Сначала кеши: событие уходит, когда перечитывание уже вернёт новые данные
+        _invalidate_caches(pending.values())
+        change_feed.publish(pending.values())
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -1,12 +1,17 @@
 """
 Зависимости для API endpoints
 """
-from typing import Optional
+import hashlib
+import time
+from typing import Optional, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from loguru import logger
 
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import decode_access_token
 from app.models.user import User
@@ -14,15 +19,49 @@ from app.models.user import User
 # HTTP Bearer для JWT токенов
 security = HTTPBearer()
 
+# Кеш: sha256(токена) -> (claims, снимок полей пользователя)
+user_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+_USER_SNAPSHOT_FIELDS = (
+    "id", "username", "email", "hashed_password",
+    "is_active", "is_admin", "created_at", "updated_at",
+)
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _snapshot_user(user: User) -> dict:
+    return {field: getattr(user, field) for field in _USER_SNAPSHOT_FIELDS}
+
+
+def invalidate_user_cache(user_id: Optional[str] = None) -> None:
     """
-    Получение текущего пользователя из JWT токена
+    Сбросить кеш авторизации для пользователя (или целиком, если user_id не передан)
+    """
+    if user_id is None:
+        user_cache.clear()
+        return
+    user_cache.delete_where(lambda _, entry: entry[1]["id"] == user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: User) -> None:
+    invalidate_user_cache(target.id)
+
+
+def _authenticate(token: str, db: Session) -> Tuple[User, bool]:
+    """
+    Пользователь по JWT токену и признак, что он взят из кеша
     """
-    token = credentials.credentials
+    cache_key = _token_key(token)
+    cached = user_cache.get(cache_key)
+    if cached is not None:
+        # Возвращаем новый отсоединённый объект, чтобы запросы не делили один экземпляр
+        return User(**cached[1]), True
+    
     payload = decode_access_token(token)
     
     if payload is None:
@@ -48,15 +87,43 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return user
+    # Запись не должна пережить сам токен
+    ttl = float(settings.AUTH_CACHE_TTL_SECONDS)
+    exp = payload.get("exp")
+    if exp is not None:
+        ttl = min(ttl, exp - time.time())
+    if ttl > 0:
+        user_cache.set(cache_key, (payload, _snapshot_user(user)), ttl=ttl)
+    
+    return user, False
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Получение текущего пользователя из JWT токена
+    """
+    return _authenticate(credentials.credentials, db)[0]
 
 
 def get_current_admin_user(
-    current_user: User = Depends(get_current_user)
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
 ) -> User:
     """
-    Проверка, что пользователь является администратором
+    Проверка, что пользователь является администратором.
+    Кеш сбрасывается при изменении пользователя только в своём процессе, поэтому
+    снимок из кеша сверяется с БД запросом по первичному ключу: отключённый или
+    удалённый через другой воркер пользователь теряет доступ к записи сразу
     """
+    current_user, cached = _authenticate(credentials.credentials, db)
+    if cached:
+        row = db.query(User.is_active, User.is_admin).filter(User.id == current_user.id).first()
+        if row is None or tuple(row) != (True, current_user.is_admin):
+            invalidate_user_cache(current_user.id)
+            current_user, _ = _authenticate(credentials.credentials, db)
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
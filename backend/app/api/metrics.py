@@ -0,0 +1,58 @@
+"""
+Сборка метрик приложения для /metrics в формате Prometheus
+"""
+from typing import Any, Dict
+
+from app.api.change_feed import change_feed
+from app.api.dependencies import user_cache
+from app.api.workflow_analysis import analysis_cache
+from app.core.database import get_pool_stats
+from app.core.instrumentation import request_metrics
+from app.core.metrics import PrometheusText
+from app.core.response_cache import response_cache
+from app.core.security import password_hasher
+
+
+def _add_cache(out: PrometheusText, name: str, stats: Dict[str, Any]) -> None:
+    labels = {"cache": name}
+    out.add("cache_hits_total", "counter", "Попадания в кеш", stats["hits"], labels)
+    out.add("cache_misses_total", "counter", "Промахи кеша", stats["misses"], labels)
+    out.add("cache_evictions_total", "counter", "Вытеснения из кеша", stats["evictions"], labels)
+    out.add("cache_entries", "gauge", "Записей в кеше", stats["size"], labels)
+    out.add("cache_max_entries", "gauge", "Ёмкость кеша", stats["maxsize"], labels)
+
+
+def render_metrics() -> str:
+    """
+    Метрики запросов, пула соединений, кешей, ленты изменений и пула хеширования паролей
+    """
+    out = PrometheusText()
+    request_metrics.render(out)
+
+    pool_stats = get_pool_stats()
+    out.add_histogram("db_pool_checkout_wait_seconds", "Ожидание соединения из пула",
+                      pool_stats["checkout_wait"])
+    for pool, stats in pool_stats["pools"].items():
+        labels = {"pool": pool}
+        out.add("db_pool_size", "gauge", "Размер пула соединений", stats["size"], labels)
+        out.add("db_pool_checked_out", "gauge", "Выданные соединения", stats["checked_out"], labels)
+        out.add("db_pool_overflow", "gauge", "Соединения сверх размера пула", stats["overflow"], labels)
+
+    _add_cache(out, "auth", user_cache.stats())
+    _add_cache(out, "response", response_cache.stats())
+    _add_cache(out, "workflow_analysis", analysis_cache.stats())
+
+    feed = change_feed.stats()
+    out.add("change_feed_subscribers", "gauge", "Подключённые клиенты ленты изменений", feed["subscribers"])
+    out.add("change_feed_events_total", "counter", "Опубликованные события ленты изменений", feed["events"])
+
+    hashing = password_hasher.stats()
+    out.add("password_hash_pending", "gauge", "Операций bcrypt в работе и в очереди", hashing["pending"])
+    out.add("password_hash_max_pending", "gauge", "Лимит очереди bcrypt", hashing["max_pending"])
+    out.add("password_hash_rejected_total", "counter", "Отказы из-за переполнения очереди", hashing["rejected"])
+    out.add_histogram("password_hash_wait_seconds", "Ожидание потока bcrypt", hashing["wait_seconds"])
+    out.add_histogram("password_hash_duration_seconds", "Время bcrypt",
+                      hashing["hash_seconds"], {"operation": "hash"})
+    out.add_histogram("password_hash_duration_seconds", "Время bcrypt",
+                      hashing["verify_seconds"], {"operation": "verify"})
+    return out.render()
@@ -0,0 +1,63 @@
+"""
+Пагинация списков: offset (обратная совместимость) и keyset по (created_at, id)
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Dict, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+# Заголовок с курсором следующей страницы
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    """
+    Непрозрачный курсор из ключа последней записи страницы
+    """
+    raw = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Разбор курсора; невалидный курсор - 400
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Невалидный курсор пагинации"
+        )
+
+
+def paginate(query: Query, model, skip: int, limit: int, cursor: Optional[str] = None) -> Query:
+    """
+    Стабильная сортировка по (created_at, id) и выборка страницы:
+    по курсору (keyset, использует составной индекс) либо по offset
+    """
+    query = query.order_by(model.created_at, model.id)
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        query = query.filter(or_(
+            model.created_at > created_at,
+            and_(model.created_at == created_at, model.id > id),
+        ))
+        return query.limit(limit)
+    return query.offset(skip).limit(limit)
+
+
+def next_cursor_headers(items: Sequence, limit: int) -> Dict[str, str]:
+    """
+    Заголовок X-Next-Cursor, если страница заполнена и дальше могут быть записи
+    """
+    if not items or len(items) < limit:
+        return {}
+    last = items[-1]
+    return {NEXT_CURSOR_HEADER: encode_cursor(last.created_at, last.id)}
@@ -0,0 +1,42 @@
+"""
+Частичные обновления: JSON Patch и оптимистичная проверка версии для endpoints
+"""
+from typing import Any, List, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.json_patch import JsonPatchError, JsonPatchTestFailed, apply_patch
+from app.schemas.json_patch import JsonPatchOperation
+
+
+def apply_json_patch(document: Any, operations: List[JsonPatchOperation]) -> Any:
+    """
+    Применить операции к документу: проваленный test - 409, невалидный патч - 422
+    """
+    try:
+        return apply_patch(document, [operation.to_dict() for operation in operations])
+    except JsonPatchTestFailed as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except JsonPatchError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+
+def check_version(record: Any, expected: Optional[int]) -> None:
+    """
+    Сверить версию записи с ожидаемой клиентом
+    """
+    if expected is not None and record.version != expected:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Версия изменилась: ожидалась {expected}, текущая {record.version}"
+        )
+
+
+def version_conflict() -> HTTPException:
+    """
+    Ошибка для записи, изменённой параллельно между чтением и сохранением
+    """
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Запись была изменена параллельно, повторите запрос"
+    )
@@ -0,0 +1,274 @@
+"""
+История ревизий JSON контента страниц (content) и workflow схем (nodes).
+Каждое сохранение записи пишет ревизию с её версией (version_id): полный снимок
+не реже раза в REVISION_SNAPSHOT_INTERVAL ревизий, между снимками - JSON Patch
+от предыдущей ревизии. Любая ревизия восстанавливается от ближайшего снимка
+не более чем за REVISION_SNAPSHOT_INTERVAL - 1 патчей
+"""
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import delete, event, func, insert, inspect, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.json_patch import apply_patch, make_patch
+from app.models.page import PageContent
+from app.models.revision import ContentRevision
+from app.models.workflow_schema import WorkflowSchema
+
+# Тип записи -> модель и поле с документом
+TRACKED = {
+    "page": (PageContent, "content"),
+    "workflow_schema": (WorkflowSchema, "nodes"),
+}
+_TYPES = {model: (type_, field) for type_, (model, field) in TRACKED.items()}
+
+# Размер пачки id в IN (...) при записи снимков
+LOAD_CHUNK = 500
+
+SNAPSHOT = "snapshot"
+DELTA = "delta"
+
+_MISSING = object()
+
+
+def _size(data: Any) -> int:
+    return len(json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode())
+
+
+def _row(type_: str, entity_id: str, version: int, kind: str, data: Any) -> Dict[str, Any]:
+    return {
+        "entity_type": type_, "entity_id": entity_id, "version": version,
+        "kind": kind, "data": data, "size": _size(data),
+    }
+
+
+def _tail(connection: Connection, type_: str, entity_id: str) -> Tuple[Optional[int], int]:
+    """
+    Версия последней ревизии записи и число патчей после последнего снимка
+    """
+    rows = connection.execute(
+        select(ContentRevision.version, ContentRevision.kind)
+        .where(ContentRevision.entity_type == type_, ContentRevision.entity_id == entity_id)
+        .order_by(ContentRevision.version.desc())
+        .limit(settings.REVISION_SNAPSHOT_INTERVAL)
+    ).all()
+    deltas = 0
+    for _, kind in rows:
+        if kind == SNAPSHOT:
+            break
+        deltas += 1
+    return (rows[0].version if rows else None), deltas
+
+
+def revision_rows(connection: Connection, type_: str, entity_id: str, version: int,
+                  new: Any, old: Any = _MISSING) -> List[Dict[str, Any]]:
+    """
+    Ревизии для сохранения документа new в версии version.
+    old - документ до сохранения (если известен): без него пишется снимок.
+    У записи без истории сначала сохраняется прежний документ (версия version - 1)
+    """
+    latest, deltas = _tail(connection, type_, entity_id)
+    rows = []
+    if latest is None and old is not _MISSING and version > 1:
+        rows.append(_row(type_, entity_id, version - 1, SNAPSHOT, old))
+        latest, deltas = version - 1, 0
+    if latest is not None and latest >= version:
+        # Ревизия этой версии уже есть (запись меняли в обход истории) - не дублируем
+        return rows
+    if latest is None or old is _MISSING:
+        return rows + [_row(type_, entity_id, version, SNAPSHOT, new)]
+    # Пустой патч - сохранение без изменения документа (например, только названия страницы):
+    # версия записи выросла, и ревизия этой версии должна читаться
+    patch = make_patch(old, new)
+    # Снимок вместо патча: цепочка достигла предела, патч не меньше половины документа
+    # или заменяет корень
+    if (deltas + 1 >= settings.REVISION_SNAPSHOT_INTERVAL or any(op["path"] == "" for op in patch)
+            or _size(patch) * 2 > _size(new)):
+        return rows + [_row(type_, entity_id, version, SNAPSHOT, new)]
+    return rows + [_row(type_, entity_id, version, DELTA, patch)]
+
+
+def record_revisions(connection: Connection, type_: str, ids: Iterable[str]) -> None:
+    """
+    Снимки текущих документов записей (для массовых INSERT/UPDATE мимо flush)
+    """
+    model, field = TRACKED[type_]
+    ids = list(set(ids))
+    rows = []
+    for start in range(0, len(ids), LOAD_CHUNK):
+        for entity_id, version, document in connection.execute(
+            select(model.id, model.version, getattr(model, field)).where(model.id.in_(ids[start:start + LOAD_CHUNK]))
+        ):
+            rows.extend(revision_rows(connection, type_, entity_id, version, document))
+    if rows:
+        connection.execute(insert(ContentRevision), rows)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_revisions(session: Session, flush_context) -> None:
+    """
+    После flush записать ревизии созданных и изменённых записей
+    """
+    rows = []
+    connection = None
+    for objects, created in ((session.new, True), (session.dirty, False)):
+        for obj in objects:
+            tracked = _TYPES.get(type(obj))
+            if tracked is None:
+                continue
+            type_, field = tracked
+            # Любое изменение колонок увеличивает version_id - ревизия пишется и без изменения документа
+            if not created and not session.is_modified(obj, include_collections=False):
+                continue
+            history = inspect(obj).attrs[field].history
+            connection = connection or session.connection()
+            if created:
+                old = _MISSING
+            else:
+                old = history.deleted[0] if history.deleted else getattr(obj, field)
+            rows.extend(revision_rows(connection, type_, obj.id, obj.version, getattr(obj, field), old))
+    if rows:
+        connection.execute(insert(ContentRevision), rows)
+
+
+def list_revisions(session: Session, type_: str, entity_id: str, skip: int, limit: int) -> List[Any]:
+    """
+    Ревизии записи, новые первыми (без данных)
+    """
+    return session.execute(
+        select(ContentRevision.version, ContentRevision.kind, ContentRevision.size, ContentRevision.created_at)
+        .where(ContentRevision.entity_type == type_, ContentRevision.entity_id == entity_id)
+        .order_by(ContentRevision.version.desc())
+        .offset(skip)
+        .limit(limit)
+    ).all()
+
+
+def load_revision(connection: Any, type_: str, entity_id: str, version: int) -> Optional[Tuple[Any, datetime]]:
+    """
+    Документ записи в версии version и время ревизии; None - такой ревизии нет.
+    Читается ближайший снимок и не больше REVISION_SNAPSHOT_INTERVAL - 1 патчей после него
+    """
+    entity = (ContentRevision.entity_type == type_, ContentRevision.entity_id == entity_id)
+    snapshot = connection.execute(
+        select(func.max(ContentRevision.version))
+        .where(*entity, ContentRevision.kind == SNAPSHOT, ContentRevision.version <= version)
+    ).scalar()
+    if snapshot is None:
+        return None
+    rows = connection.execute(
+        select(ContentRevision.version, ContentRevision.data, ContentRevision.created_at)
+        .where(*entity, ContentRevision.version >= snapshot, ContentRevision.version <= version)
+        .order_by(ContentRevision.version)
+    ).all()
+    if rows[-1].version != version:
+        return None
+    document = rows[0].data
+    for row in rows[1:]:
+        document = apply_patch(document, row.data)
+    return document, rows[-1].created_at
+
+
+def _compact_entity(connection: Connection, type_: str, entity_id: str, threshold: Optional[datetime]) -> int:
+    """
+    Оставить последние REVISION_MAX_PER_ENTITY ревизий (и не старше threshold, но хотя бы одну);
+    самая старая оставшаяся ревизия становится снимком
+    """
+    entity = (ContentRevision.entity_type == type_, ContentRevision.entity_id == entity_id)
+    revisions = connection.execute(
+        select(ContentRevision.version, ContentRevision.kind, ContentRevision.created_at)
+        .where(*entity)
+        .order_by(ContentRevision.version.desc())
+    ).all()
+    keep = revisions[:settings.REVISION_MAX_PER_ENTITY]
+    if threshold is not None:
+        keep = [revision for revision in keep if revision.created_at >= threshold] or keep[:1]
+    if len(keep) == len(revisions):
+        return 0
+    oldest = keep[-1]
+    if oldest.kind != SNAPSHOT:
+        document, _ = load_revision(connection, type_, entity_id, oldest.version)
+        connection.execute(
+            update(ContentRevision)
+            .where(*entity, ContentRevision.version == oldest.version)
+            .values(kind=SNAPSHOT, data=document, size=_size(document))
+        )
+    return connection.execute(delete(ContentRevision).where(*entity, ContentRevision.version < oldest.version)).rowcount
+
+
+def compact_revisions() -> Dict[str, int]:
+    """
+    Удалить ревизии удалённых записей и сверх лимитов REVISION_MAX_PER_ENTITY / REVISION_RETENTION_DAYS
+    """
+    threshold = (
+        datetime.utcnow() - timedelta(days=settings.REVISION_RETENTION_DAYS)
+        if settings.REVISION_RETENTION_DAYS > 0 else None
+    )
+    stats = {"orphans": 0, "entities": 0, "removed": 0}
+    with engine.begin() as connection:
+        for type_, (model, _) in TRACKED.items():
+            stats["orphans"] += connection.execute(
+                delete(ContentRevision).where(
+                    ContentRevision.entity_type == type_,
+                    ContentRevision.entity_id.notin_(select(model.id)),
+                )
+            ).rowcount
+        over_limit = func.count() > settings.REVISION_MAX_PER_ENTITY
+        if threshold is not None:
+            over_limit = over_limit | (func.min(ContentRevision.created_at) < threshold)
+        candidates = connection.execute(
+            select(ContentRevision.entity_type, ContentRevision.entity_id)
+            .group_by(ContentRevision.entity_type, ContentRevision.entity_id)
+            .having(over_limit)
+        ).all()
+        for type_, entity_id in candidates:
+            removed = _compact_entity(connection, type_, entity_id, threshold)
+            if removed:
+                stats["entities"] += 1
+                stats["removed"] += removed
+    if any(stats.values()):
+        logger.info(
+            f"Сжатие истории ревизий: удалено {stats['removed']} ревизий у {stats['entities']} записей, "
+            f"{stats['orphans']} ревизий удалённых записей"
+        )
+    return stats
+
+
+class RevisionCompactor:
+    """
+    Периодическое сжатие истории в фоновом потоке
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """
+        Сжать историю сейчас и запустить периодическое сжатие (interval <= 0 - только сейчас)
+        """
+        compact_revisions()
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="revision-compactor", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                compact_revisions()
+            except Exception as e:
+                logger.exception(f"Ошибка сжатия истории ревизий: {e}")
+
+
+revision_compactor = RevisionCompactor(interval=settings.REVISION_COMPACT_INTERVAL_SECONDS)
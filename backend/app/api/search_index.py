@@ -0,0 +1,194 @@
+"""
+Поисковый индекс сайтов, шаблонов и страниц: извлечение текста
+и синхронизация документов при каждой записи через ORM
+"""
+from collections import defaultdict
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from loguru import logger
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.search import SearchBackend, SearchResult, create_backend, index_text, query_tokens
+from app.models.page import PageContent
+from app.models.search import SearchDocument
+from app.models.template import Template, WorkflowStep
+from app.models.website import Website
+
+# Ключи JSON контента страниц, значения которых не являются текстом
+NON_TEXT_KEYS = {"id", "url", "href", "src", "image", "img", "icon", "color", "screenshot", "link"}
+
+# Размер пачки id в IN (...) при переиндексации
+REINDEX_CHUNK = 500
+
+
+def extract_text(value: Any, key: Optional[str] = None) -> Iterator[str]:
+    """
+    Строки из JSON контента страницы, кроме ссылок, цветов и идентификаторов
+    """
+    if isinstance(value, str):
+        if key not in NON_TEXT_KEYS and value.strip() and not value.startswith(("http://", "https://", "/", "#")):
+            yield value
+    elif isinstance(value, dict):
+        for child_key, child in value.items():
+            yield from extract_text(child, child_key)
+    elif isinstance(value, list):
+        for child in value:
+            yield from extract_text(child, key)
+
+
+def _join(*parts: Any) -> str:
+    return "\n".join(str(part) for part in parts if part)
+
+
+def _website_documents(connection: Connection, ids: List[str]) -> List[Dict[str, Any]]:
+    rows = connection.execute(
+        select(Website.id, Website.name, Website.client, Website.description,
+               Website.technologies, Website.category)
+        .where(Website.id.in_(ids))
+    )
+    return [
+        {"entity_id": row.id, "ref": None, "title": row.name,
+         "body": _join(row.client, row.description, " ".join(row.technologies or []), row.category)}
+        for row in rows
+    ]
+
+
+def _template_documents(connection: Connection, ids: List[str]) -> List[Dict[str, Any]]:
+    steps = defaultdict(list)
+    for row in connection.execute(
+        select(WorkflowStep.template_id, WorkflowStep.label, WorkflowStep.description)
+        .where(WorkflowStep.template_id.in_(ids))
+        .order_by(WorkflowStep.template_id, WorkflowStep.sort_key, WorkflowStep.id)
+    ):
+        steps[row.template_id].append(_join(row.label, row.description))
+    rows = connection.execute(
+        select(Template.id, Template.title, Template.description, Template.customizable)
+        .where(Template.id.in_(ids))
+    )
+    return [
+        {"entity_id": row.id, "ref": None, "title": row.title,
+         "body": _join(row.description, " ".join(row.customizable or []), *steps[row.id])}
+        for row in rows
+    ]
+
+
+def _page_documents(connection: Connection, ids: List[str]) -> List[Dict[str, Any]]:
+    rows = connection.execute(
+        select(PageContent.id, PageContent.page_id, PageContent.name, PageContent.content)
+        .where(PageContent.id.in_(ids))
+    )
+    return [
+        {"entity_id": row.id, "ref": row.page_id, "title": row.name,
+         "body": "\n".join(extract_text(row.content or {}))}
+        for row in rows
+    ]
+
+
+_SOURCES: Dict[str, Tuple[Any, Callable[[Connection, List[str]], List[Dict[str, Any]]]]] = {
+    "website": (Website, _website_documents),
+    "template": (Template, _template_documents),
+    "page": (PageContent, _page_documents),
+}
+
+
+class SearchIndex:
+    """
+    Синхронизация search_documents с исходными таблицами и выполнение поиска.
+    Документы пересобираются из БД по id изменённых сущностей в той же транзакции,
+    что и запись, поэтому индекс не расходится с данными при откате
+    """
+
+    def __init__(self):
+        self.backend: Optional[SearchBackend] = None
+
+    def setup(self) -> None:
+        """
+        Создать индекс при старте и заполнить его, если таблица документов пуста
+        """
+        backend = create_backend(settings.SEARCH_BACKEND, engine.dialect.name)
+        if backend is None:
+            logger.info("Полнотекстовый поиск выключен")
+            return
+        try:
+            with engine.begin() as connection:
+                backend.setup(connection)
+        except DBAPIError as e:
+            logger.warning(f"Полнотекстовый поиск недоступен ({backend.name}): {e}")
+            return
+        self.backend = backend
+
+        with engine.begin() as connection:
+            if connection.execute(select(func.count()).select_from(SearchDocument)).scalar_one() == 0:
+                self.reindex(connection, {
+                    entity_type: connection.execute(select(model.id)).scalars().all()
+                    for entity_type, (model, _) in _SOURCES.items()
+                })
+        logger.info(f"Полнотекстовый поиск: {backend.name}")
+
+    def reindex(self, connection: Connection, keys: Dict[str, Iterable[str]]) -> None:
+        """
+        Пересобрать документы сущностей по id; отсутствующие в БД удаляются из индекса
+        """
+        if self.backend is None:
+            return
+        for entity_type, ids in keys.items():
+            ids = list(set(ids))
+            for start in range(0, len(ids), REINDEX_CHUNK):
+                chunk = ids[start:start + REINDEX_CHUNK]
+                documents = _SOURCES[entity_type][1](connection, chunk)
+                if documents:
+                    self.backend.upsert(connection, [
+                        {"entity_type": entity_type, **document, "body": index_text(document["body"])}
+                        for document in documents
+                    ])
+                missing = set(chunk) - {document["entity_id"] for document in documents}
+                if missing:
+                    connection.execute(delete(SearchDocument).where(
+                        SearchDocument.entity_type == entity_type,
+                        SearchDocument.entity_id.in_(missing),
+                    ))
+
+    def search(
+        self, session: Session, query: str, types: Optional[Sequence[str]], skip: int, limit: int
+    ) -> Tuple[int, List[SearchResult]]:
+        tokens = query_tokens(query)
+        if not tokens:
+            return 0, []
+        return self.backend.search(session.connection(), tokens, types, limit, skip)
+
+
+search_index = SearchIndex()
+
+
+# Изменённая сущность -> (тип документа, id документа)
+_TRACKED: Dict[type, Tuple[str, Callable[[Any], str]]] = {
+    Website: ("website", lambda obj: obj.id),
+    Template: ("template", lambda obj: obj.id),
+    WorkflowStep: ("template", lambda obj: obj.template_id),
+    PageContent: ("page", lambda obj: obj.id),
+}
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_search_index(session: Session, flush_context) -> None:
+    """
+    После flush переиндексировать затронутые сайты, шаблоны (в т.ч. через шаги) и страницы
+    """
+    if search_index.backend is None:
+        return
+    keys = defaultdict(set)
+    for obj in chain(session.new, session.dirty, session.deleted):
+        tracked = _TRACKED.get(type(obj))
+        if tracked is not None:
+            entity_type, get_id = tracked
+            entity_id = get_id(obj)
+            if entity_id:
+                keys[entity_type].add(entity_id)
+    if keys:
+        search_index.reindex(session.connection(), keys)
@@ -0,0 +1,93 @@
+"""
+Кеш настроек сайта (singleton) в памяти процесса
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings as app_settings
+from app.core.database import SessionLocal
+from app.core.response_cache import make_etag, serialize
+from app.models.settings import Settings
+from app.schemas.settings import SettingsResponse
+
+
+class SettingsCache:
+    """
+    Сериализованные настройки сайта с ETag.
+    Загружаются при старте, обновляются сквозной записью из update_settings;
+    изменения из других процессов ловятся сверкой счётчика version
+    не чаще раза в check_interval секунд
+    """
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._body: Optional[bytes] = None
+        self._etag: Optional[str] = None
+        self._variants: Dict[str, bytes] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+
+    def fresh(self) -> Optional[Tuple[bytes, str, Dict[str, bytes]]]:
+        """
+        Тело, ETag и сжатые варианты тела, если версия сверялась недавно; иначе None
+        """
+        with self._lock:
+            if self._body is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return self._body, self._etag, self._variants
+        return None
+
+    def store(self, settings: Settings) -> Tuple[bytes, str, Dict[str, bytes]]:
+        """
+        Сквозная запись: сохранить актуальную запись настроек
+        """
+        body = serialize(settings, SettingsResponse)
+        etag = make_etag(body)
+        variants: Dict[str, bytes] = {}
+        with self._lock:
+            self._body, self._etag, self._variants, self._version = body, etag, variants, settings.version
+            self._checked_at = time.monotonic()
+        return body, etag, variants
+
+    def refresh(self, session: Session) -> Tuple[bytes, str, Dict[str, bytes]]:
+        """
+        Сверить версию с БД и перечитать запись, только если она изменилась
+        """
+        version = session.query(Settings.version).limit(1).scalar()
+        with self._lock:
+            if version is not None and version == self._version and self._body is not None:
+                self._checked_at = time.monotonic()
+                return self._body, self._etag, self._variants
+        return self.store(self._load(session))
+
+    def load(self) -> None:
+        """
+        Загрузка при старте приложения
+        """
+        with SessionLocal() as session:
+            self.store(self._load(session))
+
+    def invalidate(self) -> None:
+        """
+        Принудительно перечитать настройки при следующем запросе
+        """
+        with self._lock:
+            self._version = None
+            self._checked_at = 0.0
+
+    @staticmethod
+    def _load(session: Session) -> Settings:
+        settings = session.query(Settings).first()
+        if not settings:
+            # Создаем настройки по умолчанию, если их нет
+            settings = Settings()
+            session.add(settings)
+            session.commit()
+            session.refresh(settings)
+        return settings
+
+
+settings_cache = SettingsCache(check_interval=app_settings.SETTINGS_CACHE_CHECK_INTERVAL_SECONDS)
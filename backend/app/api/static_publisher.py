@@ -0,0 +1,252 @@
+"""
+Статическая публикация публичного контента: настройки, страницы, список сайтов
+и шаблоны записываются JSON-файлами (и, по желанию, HTML-фрагментами для SEO)
+в STATIC_PUBLISH_DIR, откуда их отдаёт обычный статический сервер.
+Запись через админские endpoints (сброс групп response_cache) перегенерирует
+только затронутые файлы; каждый файл заменяется атомарно (временный файл + rename)
+
+Раскладка каталога:
+    settings.json, settings.html    - настройки сайта / <title> и meta-теги
+    websites.json                   - все сайты в порядке GET /websites
+    pages/{page_id}.json, .html     - страница как GET /pages/{page_id}
+    templates/{id}.json, .html      - шаблон как GET /templates/{id}
+"""
+import html
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.response_cache import response_cache, serialize
+from app.api.bootstrap import template_stamp
+from app.api.pagination import paginate
+from app.api.settings_cache import settings_cache
+from app.models.page import PageContent
+from app.models.settings import Settings
+from app.models.template import Template
+from app.models.website import Website
+from app.schemas.page import PageContentResponse
+from app.schemas.template import TemplateResponse
+from app.schemas.website import WebsiteResponse
+
+# Группы response_cache, от которых зависят опубликованные файлы
+GROUPS = ("settings", "pages", "websites", "templates")
+
+# Размер пачки id в IN (...) при загрузке изменившихся записей
+LOAD_CHUNK = 500
+
+# page_id становится именем файла: только безопасные символы, без ведущей точки
+_SAFE_NAME = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9_.-]*$")
+
+
+def _write_atomic(path: Path, body: bytes) -> bool:
+    """
+    Записать файл через временный в том же каталоге и os.replace: статический сервер
+    видит либо старое, либо новое содержимое целиком. False - содержимое не изменилось
+    """
+    try:
+        if path.read_bytes() == body:
+            return False
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(body)
+    os.replace(tmp, path)
+    return True
+
+
+def _remove(path: Path) -> bool:
+    try:
+        path.unlink()
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def _texts(value: Any) -> Iterable[str]:
+    """
+    Строки контента страницы в порядке документа
+    """
+    if isinstance(value, str):
+        if value.strip():
+            yield value.strip()
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _texts(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _texts(item)
+
+
+def settings_html(obj: Settings) -> bytes:
+    """
+    Фрагмент <head>: заголовок и meta-теги сайта
+    """
+    tags = [f"<title>{html.escape(obj.meta_title or obj.site_name)}</title>"]
+    if obj.meta_description:
+        tags.append(f'<meta name="description" content="{html.escape(obj.meta_description)}">')
+    if obj.keywords:
+        tags.append(f'<meta name="keywords" content="{html.escape(obj.keywords)}">')
+    return ("\n".join(tags) + "\n").encode()
+
+
+def page_html(page: PageContent) -> bytes:
+    """
+    Фрагмент страницы: название и текстовые значения content
+    """
+    parts = [f'<article data-page="{html.escape(page.page_id)}">', f"<h1>{html.escape(page.name)}</h1>"]
+    parts.extend(f"<p>{html.escape(text)}</p>" for text in _texts(page.content))
+    parts.append("</article>")
+    return ("\n".join(parts) + "\n").encode()
+
+
+def template_html(template: Template) -> bytes:
+    """
+    Фрагмент шаблона: название, описание и шаги workflow по порядку
+    """
+    parts = [f'<article data-template="{html.escape(template.id)}">', f"<h1>{html.escape(template.title)}</h1>"]
+    if template.description:
+        parts.append(f"<p>{html.escape(template.description)}</p>")
+    if template.workflow_steps:
+        parts.append("<ol>")
+        for step in template.workflow_steps:
+            description = f" - {html.escape(step.description)}" if step.description else ""
+            parts.append(f"<li>{html.escape(step.label)}{description}</li>")
+        parts.append("</ol>")
+    parts.append("</article>")
+    return ("\n".join(parts) + "\n").encode()
+
+
+class StaticPublisher:
+    """
+    Публикация файлов в каталог root. Для страниц и шаблонов хранятся отметки изменения
+    (как в снимке bootstrap): при сбросе группы читаются только отметки, а файлы
+    пишутся лишь для изменившихся записей и удаляются для удалённых
+    """
+
+    def __init__(self, root: str, html_fragments: bool):
+        self.root = Path(root) if root else None
+        self.html_fragments = html_fragments
+        self._lock = threading.Lock()
+        self._page_stamps: Dict[str, Tuple] = {}
+        self._template_stamps: Dict[str, Tuple] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None
+
+    def publish(self, session: Session, groups: Optional[Iterable[str]] = None) -> int:
+        """
+        Перегенерировать файлы групп (None - все, с удалением файлов без записей в БД).
+        Возвращает число записанных и удалённых файлов
+        """
+        full = groups is None
+        wanted = set(GROUPS if full else groups)
+        changed = 0
+        with self._lock:
+            if "settings" in wanted:
+                changed += self._publish_settings(session)
+            if "websites" in wanted:
+                changed += self._publish_websites(session)
+            if "pages" in wanted:
+                changed += self._publish_pages(session, full)
+            if "templates" in wanted:
+                changed += self._publish_templates(session, full)
+        return changed
+
+    def load(self) -> None:
+        """
+        Полная публикация при старте приложения
+        """
+        if not self.enabled:
+            return
+        with SessionLocal() as session:
+            changed = self.publish(session)
+        logger.info(f"Статическая публикация в {self.root}: обновлено файлов {changed}")
+
+    def on_invalidate(self, groups: Tuple[str, ...]) -> None:
+        """
+        Подписчик response_cache: перегенерировать файлы сброшенных групп
+        """
+        affected = [group for group in groups if group in GROUPS]
+        if not affected or not self.enabled:
+            return
+        with SessionLocal() as session:
+            self.publish(session, affected)
+
+    def _publish_settings(self, session: Session) -> int:
+        changed = _write_atomic(self.root / "settings.json", settings_cache.refresh(session)[0])
+        if self.html_fragments:
+            obj = session.query(Settings).first()
+            if obj is not None:
+                changed += _write_atomic(self.root / "settings.html", settings_html(obj))
+        return changed
+
+    def _publish_websites(self, session: Session) -> int:
+        websites = paginate(session.query(Website), Website, 0, None, None).all()
+        return _write_atomic(self.root / "websites.json", serialize(websites, List[WebsiteResponse]))
+
+    def _publish_pages(self, session: Session, full: bool) -> int:
+        stamps = {
+            page_id: (version, updated_at)
+            for page_id, version, updated_at in session.query(
+                PageContent.page_id, PageContent.version, PageContent.updated_at
+            )
+            if _SAFE_NAME.match(page_id)
+        }
+        changed = self._publish_items(
+            self.root / "pages", stamps, self._page_stamps, full,
+            lambda ids: session.query(PageContent).filter(PageContent.page_id.in_(ids)),
+            lambda page: page.page_id, PageContentResponse, page_html,
+        )
+        self._page_stamps = stamps
+        return changed
+
+    def _publish_templates(self, session: Session, full: bool) -> int:
+        stamps = {row[0]: tuple(row[1:]) for row in session.query(Template.id, *template_stamp())}
+        changed = self._publish_items(
+            self.root / "templates", stamps, self._template_stamps, full,
+            lambda ids: session.query(Template).filter(Template.id.in_(ids)),
+            lambda template: template.id, TemplateResponse, template_html,
+        )
+        self._template_stamps = stamps
+        return changed
+
+    def _publish_items(self, directory: Path, stamps: Dict[str, Tuple], known: Dict[str, Tuple], full: bool,
+                       load: Callable[[List[str]], Iterable[Any]], name_of: Callable[[Any], str],
+                       response_type: Any, render_html: Callable[[Any], bytes]) -> int:
+        """
+        Записать файлы записей с изменившейся отметкой и удалить файлы исчезнувших записей.
+        При полной публикации пишутся все записи, а удаляются все лишние файлы каталога
+        """
+        names = [name for name, stamp in stamps.items() if full or known.get(name) != stamp]
+        changed = 0
+        for start in range(0, len(names), LOAD_CHUNK):
+            for obj in load(names[start:start + LOAD_CHUNK]):
+                name = name_of(obj)
+                changed += _write_atomic(directory / f"{name}.json", serialize(obj, response_type))
+                if self.html_fragments:
+                    changed += _write_atomic(directory / f"{name}.html", render_html(obj))
+        if full:
+            removed = {
+                path.stem for path in directory.glob("*.*")
+                if path.suffix in (".json", ".html") and path.stem not in stamps
+            } if directory.exists() else set()
+        else:
+            removed = set(known) - set(stamps)
+        for name in removed:
+            changed += _remove(directory / f"{name}.json")
+            changed += _remove(directory / f"{name}.html")
+        return changed
+
+
+static_publisher = StaticPublisher(settings.STATIC_PUBLISH_DIR, settings.STATIC_PUBLISH_HTML)
+response_cache.subscribe(static_publisher.on_invalidate)
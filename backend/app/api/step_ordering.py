@@ -0,0 +1,56 @@
+"""
+Порядок workflow шагов по ключу WorkflowStep.sort_key: выборка поддерева позиции
+диапазоном по индексу и заполнение ключа у строк, созданных до его появления
+"""
+from typing import Any, List, Tuple
+
+from loguru import logger
+from sqlalchemy import bindparam, or_, select, update
+
+from app.core.database import engine
+from app.models.template import WorkflowStep, position_sort_key
+
+# Строк в одном UPDATE при заполнении ключей
+BACKFILL_CHUNK = 1000
+
+
+def subtree_range(position: str) -> Tuple[str, str]:
+    """
+    Границы ключей потомков позиции: [ключ + ".", ключ + "/") - "/" следует за "."
+    """
+    prefix = position_sort_key(position)
+    return f"{prefix}.", f"{prefix}/"
+
+
+def subtree_conditions(position: str, include_self: bool = False) -> List[Any]:
+    """
+    Условия WHERE для шагов внутри позиции ("2" -> 2.1, 2.2, 2.2.1, ...)
+    """
+    low, high = subtree_range(position)
+    children = (WorkflowStep.sort_key >= low) & (WorkflowStep.sort_key < high)
+    if include_self:
+        return [or_(children, WorkflowStep.sort_key == position_sort_key(position))]
+    return [children]
+
+
+def backfill_step_sort_keys() -> None:
+    """
+    Заполнить sort_key шагов, у которых его нет (колонка добавлена в существующую таблицу)
+    """
+    table = WorkflowStep.__table__
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("step_id"))
+        .values(sort_key=bindparam("key"))
+    )
+    with engine.begin() as connection:
+        rows = connection.execute(
+            select(table.c.id, table.c.position).where(table.c.sort_key.is_(None))
+        ).all()
+        for start in range(0, len(rows), BACKFILL_CHUNK):
+            connection.execute(statement, [
+                {"step_id": row.id, "key": position_sort_key(row.position)}
+                for row in rows[start:start + BACKFILL_CHUNK]
+            ])
+    if rows:
+        logger.info(f"Заполнены ключи сортировки шагов: {len(rows)}")
@@ -2,22 +2,40 @@
 Endpoints для авторизации
 """
 from datetime import timedelta
+from contextlib import contextmanager
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from loguru import logger
 
 from app.core.database import get_db
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import PasswordHasherOverloaded, create_access_token, password_hasher
 from app.core.config import settings
-from app.api.dependencies import get_current_user
+from app.core.serialization import FastJSONRoute
+from app.api.dependencies import get_current_user, get_current_admin_user, user_cache
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse, Token, LoginRequest
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=FastJSONRoute)
+
+
+@contextmanager
+def _hashing_slot():
+    """
+    Перевод переполнения пула хеширования в 503
+    """
+    try:
+        yield
+    except PasswordHasherOverloaded:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервер перегружен, повторите попытку позже",
+            headers={"Retry-After": "1"},
+        )
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(
+async def register(
     user_data: UserCreate,
     db: Session = Depends(get_db)
 ):
@@ -25,9 +43,11 @@ def register(
     Регистрация нового пользователя
     """
     # Проверяем, существует ли пользователь
-    existing_user = db.query(User).filter(
-        (User.username == user_data.username) | (User.email == user_data.email)
-    ).first()
+    existing_user = await run_in_threadpool(
+        lambda: db.query(User).filter(
+            (User.username == user_data.username) | (User.email == user_data.email)
+        ).first()
+    )
     
     if existing_user:
         raise HTTPException(
@@ -35,8 +55,9 @@ def register(
             detail="Пользователь с таким именем или email уже существует"
         )
     
-    # Создаем нового пользователя
-    hashed_password = get_password_hash(user_data.password)
+    # Создаем нового пользователя (bcrypt - в отдельном пуле)
+    with _hashing_slot():
+        hashed_password = await password_hasher.hash(user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -44,16 +65,19 @@ def register(
         is_admin=user_data.is_admin
     )
     
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    def save():
+        db.add(new_user)
+        db.commit()
+        db.refresh(new_user)
+    
+    await run_in_threadpool(save)
     
     logger.info(f"Зарегистрирован новый пользователь: {new_user.username}")
     return new_user
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     login_data: LoginRequest,
     db: Session = Depends(get_db)
 ):
@@ -61,11 +85,20 @@ def login(
     Вход в систему (получение JWT токена)
     """
     # Ищем пользователя по username или email
-    user = db.query(User).filter(
-        (User.username == login_data.username) | (User.email == login_data.username)
-    ).first()
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(
+            (User.username == login_data.username) | (User.email == login_data.username)
+        ).first()
+    )
     
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    verified, new_hash = False, None
+    if user:
+        with _hashing_slot():
+            verified, new_hash = await password_hasher.verify_and_update(
+                login_data.password, user.hashed_password
+            )
+    
+    if not user or not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверное имя пользователя или пароль",
@@ -78,6 +111,12 @@ def login(
             detail="Пользователь неактивен"
         )
     
+    # Стоимость bcrypt изменилась - сохраняем пересчитанный хеш
+    if new_hash:
+        user.hashed_password = new_hash
+        await run_in_threadpool(db.commit)
+        logger.info(f"Хеш пароля пользователя {user.username} пересчитан с новой стоимостью")
+    
     # Создаем токен
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -97,3 +136,23 @@ def get_current_user_info(
     Получение информации о текущем пользователе
     """
     return current_user
+
+
+@router.get("/cache-stats")
+def get_auth_cache_stats(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Статистика кеша авторизации: попадания, промахи, размер (только для админов)
+    """
+    return user_cache.stats()
+
+
+@router.get("/hashing-stats")
+def get_password_hashing_stats(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Статистика пула хеширования паролей: очередь, отказы, время (только для админов)
+    """
+    return password_hasher.stats()
@@ -0,0 +1,27 @@
+"""
+Endpoint первичной загрузки публичной части сайта
+"""
+from fastapi import APIRouter, Request
+
+from app.core.database import run_in_session
+from app.core.response_cache import build_response
+from app.core.serialization import FastJSONRoute
+from app.api.bootstrap import bootstrap_snapshot
+from app.schemas.bootstrap import BootstrapResponse
+
+router = APIRouter(prefix="/bootstrap", tags=["bootstrap"], route_class=FastJSONRoute)
+
+
+@router.get("", response_model=BootstrapResponse)
+async def get_bootstrap(
+    request: Request
+):
+    """
+    Настройки, страницы, сайты, шаблоны и узлы workflow схем одним ответом.
+    Отдаётся готовый снимок из памяти, пересобираемый при записи через админские endpoints
+    """
+    snapshot = bootstrap_snapshot.current()
+    if snapshot is None:
+        snapshot = await run_in_session(bootstrap_snapshot.build)
+    body, etag, variants = snapshot
+    return build_response(request, body, etag, variants=variants)
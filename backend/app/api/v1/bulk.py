@@ -0,0 +1,387 @@
+"""
+Endpoints для массового импорта и экспорта контента
+"""
+import uuid
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Tuple, Type
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.core.database import SessionLocal, get_db
+from app.core.response_cache import serialize
+from app.core.serialization import FastJSONRoute
+from app.api.change_feed import record_change
+from app.api.dependencies import get_current_admin_user
+from app.api.revisions import record_revisions
+from app.api.search_index import search_index
+from app.api.website_filters import sync_technologies
+from app.api.workflow_graph import sync_workflow_graph
+from app.models.user import User
+from app.models.website import Website
+from app.models.template import Template, WorkflowStep
+from app.models.page import PageContent
+from app.models.settings import Settings
+from app.models.workflow_schema import WorkflowSchema
+from app.schemas.bulk import (
+    BulkImportRequest,
+    BulkImportResponse,
+    BulkItemResult,
+    BulkTemplateCreate,
+    BulkWorkflowSchemaCreate,
+)
+from app.schemas.page import PageContentCreate, PageContentResponse
+from app.schemas.settings import SettingsCreate, SettingsResponse
+from app.schemas.template import TemplateResponse
+from app.schemas.website import WebsiteCreate, WebsiteResponse
+from app.schemas.workflow_schema import WorkflowSchemaResponse
+
+router = APIRouter(prefix="/bulk", tags=["bulk"], route_class=FastJSONRoute)
+
+# Сколько строк читать с серверного курсора за раз при экспорте
+EXPORT_BATCH_SIZE = 500
+# Размер буфера, после которого накопленный JSON отдаётся клиенту
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# Секции экспорта: ключ, NDJSON-тип, модель, схема ответа
+EXPORT_SECTIONS = (
+    ("settings", "settings", Settings, SettingsResponse),
+    ("websites", "website", Website, WebsiteResponse),
+    ("templates", "template", Template, TemplateResponse),
+    ("pages", "page", PageContent, PageContentResponse),
+    ("workflow_schemas", "workflow_schema", WorkflowSchema, WorkflowSchemaResponse),
+)
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'item'}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+def _validate_items(
+    items: List[Dict[str, Any]], schema: Type[BaseModel], results: List[BulkItemResult]
+) -> List[Tuple[int, BaseModel]]:
+    """
+    Валидация элементов по одному: невалидные попадают в results с ошибкой
+    """
+    valid = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as e:
+            results.append(BulkItemResult(
+                index=index,
+                status="error",
+                source_id=item.get("id") if isinstance(item, dict) else None,
+                error=_format_validation_error(e),
+            ))
+    return valid
+
+
+def _new_id() -> str:
+    return str(uuid.uuid4())
+
+
+def _item_errors(result: BulkImportResponse) -> List[str]:
+    errors = []
+    for section in ("websites", "templates", "pages", "workflow_schemas"):
+        for item in sorted(getattr(result, section), key=lambda item: item.index):
+            if item.status == "error":
+                errors.append(f"{section}[{item.index}]: {item.error}")
+    return errors
+
+
+@router.post("/import", response_model=BulkImportResponse)
+def bulk_import(
+    data: BulkImportRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Массовый импорт настроек, веб-сайтов, шаблонов, страниц и workflow схем
+    одним запросом и одной транзакцией (только для админов).
+    ID шаблонов в workflow схемах сопоставляются с новыми ID на сервере.
+    Ошибка любого элемента отменяет весь импорт (422 со списком ошибок)
+    """
+    result = BulkImportResponse()
+
+    # Настройки (singleton)
+    if data.settings is not None:
+        settings = db.query(Settings).first()
+        if not settings:
+            settings = Settings(**SettingsCreate().model_dump())
+            db.add(settings)
+        for field, value in data.settings.model_dump(exclude_unset=True).items():
+            setattr(settings, field, value)
+        db.flush()
+        result.settings = BulkItemResult(index=0, status="updated", id=settings.id)
+
+    # Веб-сайты
+    websites = _validate_items(data.websites, WebsiteCreate, result.websites)
+    website_rows = []
+    for index, website in websites:
+        row = {"id": _new_id(), **website.model_dump()}
+        website_rows.append(row)
+        result.websites.append(BulkItemResult(index=index, status="created", id=row["id"]))
+    if website_rows:
+        db.execute(insert(Website), website_rows)
+
+    # Шаблоны и их workflow шаги
+    templates = _validate_items(data.templates, BulkTemplateCreate, result.templates)
+    template_rows, step_rows = [], []
+    for index, template in templates:
+        row = {"id": _new_id(), **template.model_dump(exclude={"id", "workflow"})}
+        template_rows.append(row)
+        for step in template.workflow or []:
+            step_rows.append({"id": _new_id(), "template_id": row["id"], **step.model_dump()})
+        if template.id:
+            result.template_id_map[template.id] = row["id"]
+        result.templates.append(BulkItemResult(
+            index=index, status="created", id=row["id"], source_id=template.id
+        ))
+    if template_rows:
+        db.execute(insert(Template), template_rows)
+    if step_rows:
+        db.execute(insert(WorkflowStep), step_rows)
+
+    # Страницы: существующие page_id определяются одним запросом
+    pages = _validate_items(data.pages, PageContentCreate, result.pages)
+    existing_pages = {
+        page_id: (id, version) for page_id, id, version in
+        db.query(PageContent.page_id, PageContent.id, PageContent.version)
+        .filter(PageContent.page_id.in_([page.page_id for _, page in pages]))
+        .all()
+    } if pages else {}
+    page_inserts, page_updates, seen_page_ids = [], [], set()
+    for index, page in pages:
+        if page.page_id in seen_page_ids:
+            result.pages.append(BulkItemResult(
+                index=index, status="error", error=f"page_id '{page.page_id}' повторяется в запросе"
+            ))
+            continue
+        seen_page_ids.add(page.page_id)
+        if page.page_id in existing_pages:
+            if not data.upsert:
+                result.pages.append(BulkItemResult(
+                    index=index, status="error",
+                    error=f"Страница с page_id '{page.page_id}' уже существует"
+                ))
+                continue
+            # version нужен для UPDATE ... WHERE version = ? (оптимистичная блокировка)
+            page_id, version = existing_pages[page.page_id]
+            page_updates.append({"id": page_id, "version": version, **page.model_dump(exclude={"page_id"})})
+            result.pages.append(BulkItemResult(index=index, status="updated", id=page_id))
+        else:
+            row = {"id": _new_id(), **page.model_dump()}
+            page_inserts.append(row)
+            result.pages.append(BulkItemResult(index=index, status="created", id=row["id"]))
+    if page_inserts:
+        db.execute(insert(PageContent), page_inserts)
+    if page_updates:
+        db.execute(update(PageContent), page_updates)
+
+    # Workflow схемы: исходный template_id -> новый, либо ID уже существующего шаблона
+    schemas = _validate_items(data.workflow_schemas, BulkWorkflowSchemaCreate, result.workflow_schemas)
+    unmapped = {s.template_id for _, s in schemas if s.template_id not in result.template_id_map}
+    known_templates = {
+        template_id for (template_id,) in
+        db.query(Template.id).filter(Template.id.in_(unmapped)).all()
+    } if unmapped else set()
+    target_ids = [
+        result.template_id_map.get(s.template_id, s.template_id) for _, s in schemas
+    ]
+    existing_schemas = {
+        template_id: (id, version) for template_id, id, version in
+        db.query(WorkflowSchema.template_id, WorkflowSchema.id, WorkflowSchema.version)
+        .filter(WorkflowSchema.template_id.in_(target_ids))
+        .all()
+    } if target_ids else {}
+    schema_inserts, schema_updates, seen_templates = [], [], set()
+    for (index, schema), template_id in zip(schemas, target_ids):
+        if schema.template_id not in result.template_id_map and template_id not in known_templates:
+            result.workflow_schemas.append(BulkItemResult(
+                index=index, status="error", source_id=schema.template_id,
+                error=f"Шаблон '{schema.template_id}' не найден"
+            ))
+            continue
+        if template_id in seen_templates:
+            result.workflow_schemas.append(BulkItemResult(
+                index=index, status="error", source_id=schema.template_id,
+                error=f"Схема для шаблона '{schema.template_id}' повторяется в запросе"
+            ))
+            continue
+        seen_templates.add(template_id)
+        if template_id in existing_schemas:
+            if not data.upsert:
+                result.workflow_schemas.append(BulkItemResult(
+                    index=index, status="error", source_id=schema.template_id,
+                    error=f"Workflow схема для шаблона '{template_id}' уже существует"
+                ))
+                continue
+            schema_id, version = existing_schemas[template_id]
+            schema_updates.append({"id": schema_id, "version": version, "nodes": schema.nodes})
+            result.workflow_schemas.append(BulkItemResult(
+                index=index, status="updated", id=schema_id, source_id=schema.template_id
+            ))
+        else:
+            row = {"id": _new_id(), "template_id": template_id, "nodes": schema.nodes}
+            schema_inserts.append(row)
+            result.workflow_schemas.append(BulkItemResult(
+                index=index, status="created", id=row["id"], source_id=schema.template_id
+            ))
+    if schema_inserts:
+        db.execute(insert(WorkflowSchema), schema_inserts)
+    if schema_updates:
+        db.execute(update(WorkflowSchema), schema_updates)
+
+    # Импорт атомарный: частично применённые данные рассинхронизировали бы клиента
+    errors = _item_errors(result)
+    if errors:
+        db.rollback()
+        logger.warning(f"Массовый импорт отменён, ошибок: {len(errors)} (пользователь: {current_user.username})")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Импорт отменён, ошибки элементов: " + "; ".join(errors)
+        )
+
+    # Массовые INSERT/UPDATE идут мимо flush - индексы технологий, графа схем и поиска
+    # и снимки истории ревизий обновляются явно
+    sync_technologies(db.connection(), [row["id"] for row in website_rows])
+    sync_workflow_graph(db.connection(), [row["id"] for row in schema_inserts + schema_updates])
+    search_index.reindex(db.connection(), {
+        "website": [row["id"] for row in website_rows],
+        "template": [row["id"] for row in template_rows],
+        "page": [row["id"] for row in page_inserts] + [row["id"] for row in page_updates],
+    })
+    record_revisions(db.connection(), "page", [row["id"] for row in page_inserts + page_updates])
+    record_revisions(db.connection(), "workflow_schema", [row["id"] for row in schema_inserts + schema_updates])
+    # События ленты изменений тоже: опубликуются после коммита
+    page_keys = {id: page_id for page_id, (id, _) in existing_pages.items()}
+    schema_keys = {id: template_id for template_id, (id, _) in existing_schemas.items()}
+    for row in website_rows:
+        record_change(db, "website", row["id"], "created")
+    for row in template_rows:
+        record_change(db, "template", row["id"], "created")
+    for row in page_inserts:
+        record_change(db, "page", row["page_id"], "created", 1)
+    for row in page_updates:
+        record_change(db, "page", page_keys[row["id"]], "updated", row["version"] + 1)
+    for row in schema_inserts:
+        record_change(db, "workflow_schema", row["template_id"], "created", 1)
+    for row in schema_updates:
+        record_change(db, "workflow_schema", schema_keys[row["id"]], "updated", row["version"] + 1)
+    
+    # Кеши ответов сбрасываются по этим событиям в after_commit
+    db.commit()
+
+    for items in (result.websites, result.templates, result.pages, result.workflow_schemas):
+        items.sort(key=lambda item: item.index)
+
+    logger.info(
+        f"Массовый импорт: сайтов {len(website_rows)}, шаблонов {len(template_rows)}, "
+        f"страниц {len(page_inserts) + len(page_updates)}, "
+        f"схем {len(schema_inserts) + len(schema_updates)} (пользователь: {current_user.username})"
+    )
+    return result
+
+
+
+def _stream_rows(session: Session, model) -> Iterator[Any]:
+    """
+    Строки таблицы с серверного курсора порциями по EXPORT_BATCH_SIZE
+    """
+    query = (
+        session.query(model)
+        .order_by(model.created_at, model.id)
+        .execution_options(stream_results=True)
+        .yield_per(EXPORT_BATCH_SIZE)
+    )
+    for row in query:
+        yield row
+        # Выгруженный объект больше не нужен - память не растёт с числом строк
+        session.expunge(row)
+
+
+def _export_json(session: Session) -> Iterator[bytes]:
+    yield b'{"exported_at":"' + datetime.utcnow().isoformat().encode() + b'"'
+    for key, _, model, schema in EXPORT_SECTIONS:
+        if key == "settings":
+            settings = session.query(model).first()
+            yield b',"settings":' + (serialize(settings, schema) if settings else b"null")
+            continue
+        yield b',"' + key.encode() + b'":['
+        separator = b""
+        for row in _stream_rows(session, model):
+            yield separator + serialize(row, schema)
+            separator = b","
+        yield b"]"
+    yield b"}"
+
+
+def _export_ndjson(session: Session) -> Iterator[bytes]:
+    for _, row_type, model, schema in EXPORT_SECTIONS:
+        for row in _stream_rows(session, model):
+            yield b'{"type":"' + row_type.encode() + b'","data":' + serialize(row, schema) + b"}\n"
+
+
+def _chunked(parts: Iterator[bytes], compress: bool) -> Iterator[bytes]:
+    """
+    Склеивает мелкие куски в блоки по EXPORT_CHUNK_SIZE и при необходимости сжимает gzip
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer = bytearray()
+    for part in parts:
+        buffer += part
+        if len(buffer) >= EXPORT_CHUNK_SIZE:
+            chunk = bytes(buffer)
+            buffer.clear()
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+    tail = bytes(buffer)
+    if compressor:
+        tail = compressor.compress(tail) + compressor.flush()
+    if tail:
+        yield tail
+
+
+@router.get("/export")
+def bulk_export(
+    request: Request,
+    format: str = Query("json", pattern="^(json|ndjson)$", description="json - один документ, ndjson - запись на строку"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Потоковый экспорт всего контента сайта (только для админов).
+    Строки читаются серверным курсором, память не зависит от объёма данных;
+    при Accept-Encoding: gzip ответ сжимается на лету
+    """
+    compress = "gzip" in request.headers.get("accept-encoding", "").lower()
+
+    def generate() -> Iterator[bytes]:
+        # Сессия живёт, пока идёт отдача: зависимость get_db закрылась бы раньше
+        session = SessionLocal()
+        try:
+            parts = _export_ndjson(session) if format == "ndjson" else _export_json(session)
+            yield from _chunked(parts, compress)
+        finally:
+            session.close()
+
+    filename = f"atii-export-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"', "Vary": "Accept-Encoding"}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+
+    logger.info(f"Экспорт контента в {format} (пользователь: {current_user.username})")
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson" if format == "ndjson" else "application/json",
+        headers=headers,
+    )
@@ -0,0 +1,75 @@
+"""
+Endpoints ленты изменений контента
+"""
+import asyncio
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.api.change_feed import change_feed
+from app.schemas.changes import ChangeEvent, ChangesResponse
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+
+@router.get("", response_model=ChangesResponse)
+async def list_changes(
+    after: Optional[str] = Query(None, description="id последнего полученного события")
+):
+    """
+    События после after (опрос вместо потока). reset=true - события уже вытеснены
+    из истории или id из прошлого запуска: данные нужно перечитать целиком и продолжить с last_id
+    """
+    events, last_id = change_feed.since(after)
+    return ChangesResponse(
+        last_id=last_id,
+        reset=events is None,
+        changes=[
+            ChangeEvent(event_id=f"{change_feed.epoch}:{number}", **change) for number, change, _ in events or ()
+        ],
+    )
+
+
+@router.get("/stream")
+async def stream_changes(
+    request: Request,
+    after: Optional[str] = Query(None, description="id последнего полученного события"),
+    last_event_id: Optional[str] = Header(None, description="Ставится EventSource при переподключении")
+):
+    """
+    Поток server-sent events: change - {type, id, action, version} для записей website,
+    template, page, settings и workflow_schema (id - как в пути API: page_id страницы,
+    template_id схемы); reset - данные нужно перечитать целиком.
+    Переподключение с Last-Event-ID (или after) досылает пропущенные события
+    """
+    subscriber, backlog = change_feed.subscribe(last_event_id or after)
+
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            yield b"retry: 3000\n\n"
+            if backlog is None:
+                yield change_feed.reset_event()
+            for _, _, body in backlog or ():
+                yield body
+            while not await request.is_disconnected():
+                try:
+                    await asyncio.wait_for(subscriber.ready.wait(), settings.CHANGE_FEED_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"  # держит соединение через прокси
+                    continue
+                pending, overflowed = subscriber.take()
+                if overflowed:
+                    yield change_feed.reset_event()
+                    continue
+                for _, _, body in pending:
+                    yield body
+        finally:
+            change_feed.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,48 +1,77 @@
 """
 Endpoints для страниц контента
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from loguru import logger
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, run_db
+from app.core.response_cache import response_cache
+from app.core.serialization import FastJSONRoute
+from app.api.pagination import next_cursor_headers, paginate
+from app.api.patching import apply_json_patch, check_version, version_conflict
 from app.api.dependencies import get_current_admin_user
+from app.api.revisions import list_revisions, load_revision
 from app.models.user import User
 from app.models.page import PageContent
 from app.schemas.page import PageContentCreate, PageContentUpdate, PageContentResponse
+from app.schemas.json_patch import JsonPatchRequest
+from app.schemas.revision import RevisionInfo, RevisionResponse
 
-router = APIRouter(prefix="/pages", tags=["pages"])
+router = APIRouter(prefix="/pages", tags=["pages"], route_class=FastJSONRoute)
 
 
 @router.get("", response_model=List[PageContentResponse])
-def get_pages(
+async def get_pages(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
     """
-    Получить список всех страниц
+    Получить список всех страниц.
+    Пагинация: skip/limit или cursor из заголовка X-Next-Cursor предыдущей страницы
     """
-    pages = db.query(PageContent).offset(skip).limit(limit).all()
-    return pages
+    cached = response_cache.get("pages", request)
+    if cached is not None:
+        return cached
+    
+    def load(session: Session):
+        pages = paginate(session.query(PageContent), PageContent, skip, limit, cursor).all()
+        return response_cache.put(
+            "pages", request, pages, List[PageContentResponse],
+            headers=next_cursor_headers(pages, limit)
+        )
+    
+    return await run_db(db, load)
 
 
 @router.get("/{page_id}", response_model=PageContentResponse)
-def get_page(
+async def get_page(
     page_id: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_read_db)
 ):
     """
     Получить страницу по page_id (home, about, custom, etc.)
     """
-    page = db.query(PageContent).filter(PageContent.page_id == page_id).first()
-    if not page:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Страница не найдена"
-        )
-    return page
+    cached = response_cache.get("pages", request)
+    if cached is not None:
+        return cached
+    
+    def load(session: Session):
+        page = session.query(PageContent).filter(PageContent.page_id == page_id).first()
+        if not page:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Страница не найдена"
+            )
+        return response_cache.put("pages", request, page, PageContentResponse)
+    
+    return await run_db(db, load)
 
 
 @router.post("", response_model=PageContentResponse, status_code=status.HTTP_201_CREATED)
@@ -97,13 +126,137 @@ def update_page(
     from datetime import datetime
     page.updated = "только что"
     
-    db.commit()
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise version_conflict()
     db.refresh(page)
     
     logger.info(f"Обновлена страница: {page.name} (пользователь: {current_user.username})")
     return page
 
 
+@router.patch("/{page_id}", response_model=PageContentResponse)
+def patch_page_content(
+    page_id: str,
+    patch_data: JsonPatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Частично обновить контент страницы операциями JSON Patch (только для админов).
+    Пути операций отсчитываются от content; version - ожидаемая версия страницы
+    """
+    page = db.query(PageContent).filter(PageContent.page_id == page_id).first()
+    if not page:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Страница не найдена"
+        )
+    check_version(page, patch_data.version)
+    
+    content = apply_json_patch(page.content or {}, patch_data.operations)
+    if not isinstance(content, dict):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Контент страницы должен оставаться объектом"
+        )
+    page.content = content
+    page.updated = "только что"
+    
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise version_conflict()
+    db.refresh(page)
+    
+    logger.info(
+        f"Обновлена страница: {page.name}, операций патча: {len(patch_data.operations)} "
+        f"(пользователь: {current_user.username})"
+    )
+    return page
+
+
+def _get_page(db: Session, page_id: str) -> PageContent:
+    page = db.query(PageContent).filter(PageContent.page_id == page_id).first()
+    if not page:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Страница не найдена"
+        )
+    return page
+
+
+@router.get("/{page_id}/revisions", response_model=List[RevisionInfo])
+def get_page_revisions(
+    page_id: str,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    История ревизий контента страницы, новые первыми (только для админов)
+    """
+    page = _get_page(db, page_id)
+    return list_revisions(db, "page", page.id, skip, limit)
+
+
+@router.get("/{page_id}/revisions/{version}", response_model=RevisionResponse)
+def get_page_revision(
+    page_id: str,
+    version: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Контент страницы в версии ревизии (только для админов)
+    """
+    page = _get_page(db, page_id)
+    revision = load_revision(db, "page", page.id, version)
+    if revision is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ревизия не найдена"
+        )
+    content, created_at = revision
+    return RevisionResponse(version=version, created_at=created_at, data=content)
+
+
+@router.post("/{page_id}/revisions/{version}/rollback", response_model=PageContentResponse)
+def rollback_page(
+    page_id: str,
+    version: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Вернуть контент страницы к ревизии (только для админов).
+    Откат - обычное сохранение: версия растёт, в истории появляется новая ревизия
+    """
+    page = _get_page(db, page_id)
+    revision = load_revision(db, "page", page.id, version)
+    if revision is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ревизия не найдена"
+        )
+    page.content = revision[0]
+    page.updated = "только что"
+    
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise version_conflict()
+    db.refresh(page)
+    
+    logger.info(f"Страница {page.name} возвращена к версии {version} (пользователь: {current_user.username})")
+    return page
+
+
 @router.delete("/{page_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_page(
     page_id: str,
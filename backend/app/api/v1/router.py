@@ -3,7 +3,7 @@
 """
 from fastapi import APIRouter
 
-from app.api.v1 import auth, websites, templates, pages, settings, workflow_schemas
+from app.api.v1 import auth, websites, templates, pages, settings, workflow_schemas, bulk, search, bootstrap, changes
 
 api_router = APIRouter()
 
@@ -14,3 +14,7 @@ api_router.include_router(templates.router)
 api_router.include_router(pages.router)
 api_router.include_router(settings.router)
 api_router.include_router(workflow_schemas.router)
+api_router.include_router(bulk.router)
+api_router.include_router(search.router)
+api_router.include_router(bootstrap.router)
+api_router.include_router(changes.router)
@@ -0,0 +1,45 @@
+"""
+Endpoint полнотекстового поиска по сайтам, шаблонам и страницам
+"""
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.core.database import get_read_db, run_db
+from app.core.serialization import FastJSONRoute
+from app.api.search_index import search_index
+from app.schemas.search import SearchEntityType, SearchHit, SearchResponse
+
+router = APIRouter(prefix="/search", tags=["search"], route_class=FastJSONRoute)
+
+
+@router.get("", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Поисковый запрос"),
+    types: Optional[List[SearchEntityType]] = Query(None, alias="type", description="Фильтр по типу, можно несколько"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Поиск по названию, клиенту, описанию и технологиям сайтов, названию, описанию
+    и шагам шаблонов, тексту страниц. Слова запроса ищутся по префиксу и все сразу,
+    результаты упорядочены по релевантности
+    """
+    if search_index.backend is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Полнотекстовый поиск недоступен"
+        )
+    
+    def load(session: Session):
+        return search_index.search(session, q, types, skip, limit)
+    
+    total, results = await run_db(db, load)
+    return SearchResponse(query=q, total=total, items=[
+        SearchHit(
+            type=result.entity_type, id=result.entity_id, page_id=result.ref,
+            title=result.title, snippet=result.snippet, rank=result.rank,
+        )
+        for result in results
+    ])
@@ -1,35 +1,37 @@
 """
 Endpoints для настроек сайта
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from loguru import logger
 
-from app.core.database import get_db
+from app.core.database import get_db, run_in_session
+from app.core.response_cache import build_response
+from app.core.serialization import FastJSONRoute
 from app.api.dependencies import get_current_admin_user
+from app.api.patching import version_conflict
+from app.api.settings_cache import settings_cache
 from app.models.user import User
 from app.models.settings import Settings
 from app.schemas.settings import SettingsCreate, SettingsUpdate, SettingsResponse
 
-router = APIRouter(prefix="/settings", tags=["settings"])
+router = APIRouter(prefix="/settings", tags=["settings"], route_class=FastJSONRoute)
 
 
 @router.get("", response_model=SettingsResponse)
-def get_settings(
-    db: Session = Depends(get_db)
+async def get_settings(
+    request: Request
 ):
     """
-    Получить настройки сайта (singleton - всегда одна запись)
+    Получить настройки сайта (singleton - всегда одна запись).
+    Отдаются из памяти; с БД сверяется только счётчик версии
     """
-    settings = db.query(Settings).first()
-    if not settings:
-        # Создаем настройки по умолчанию, если их нет
-        default_settings = Settings()
-        db.add(default_settings)
-        db.commit()
-        db.refresh(default_settings)
-        return default_settings
-    return settings
+    cached = settings_cache.fresh()
+    if cached is None:
+        cached = await run_in_session(settings_cache.refresh)
+    body, etag, variants = cached
+    return build_response(request, body, etag, variants=variants)
 
 
 @router.put("", response_model=SettingsResponse)
@@ -54,8 +56,13 @@ def update_settings(
     for field, value in update_data.items():
         setattr(settings, field, value)
     
-    db.commit()
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise version_conflict()
     db.refresh(settings)
+    settings_cache.store(settings)
     
     logger.info(f"Обновлены настройки сайта (пользователь: {current_user.username})")
     return settings
@@ -1,37 +1,128 @@
 """
 Endpoints для шаблонов
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.orm import Session
 from loguru import logger
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, run_db
+from app.core.response_cache import response_cache
+from app.core.serialization import FastJSONRoute
+from app.api.pagination import next_cursor_headers, paginate
+from app.api.patching import apply_json_patch
 from app.api.dependencies import get_current_admin_user
+from app.api.step_ordering import subtree_conditions
 from app.models.user import User
 from app.models.template import Template, WorkflowStep
-from app.schemas.template import TemplateCreate, TemplateUpdate, TemplateResponse, WorkflowStepCreate
+from app.schemas.template import (
+    TemplateCreate,
+    TemplateUpdate,
+    TemplateResponse,
+    WorkflowStepCreate,
+    WorkflowStepResponse,
+    WorkflowStepUpdate,
+)
 
-router = APIRouter(prefix="/templates", tags=["templates"])
+router = APIRouter(prefix="/templates", tags=["templates"], route_class=FastJSONRoute)
+
+# Поля шага, которые сравниваются при обновлении
+_STEP_FIELDS = ("label", "type", "description", "position")
+
+
+def _step_to_dict(step: WorkflowStep) -> dict:
+    return {"id": step.id, **{field: getattr(step, field) for field in _STEP_FIELDS}}
+
+
+def _patch_workflow(template: Template, operations) -> List[WorkflowStepUpdate]:
+    """
+    Применить JSON Patch к текущему списку шагов и провалидировать результат
+    """
+    current = [_step_to_dict(step) for step in template.workflow_steps]
+    patched = apply_json_patch(current, operations)
+    try:
+        return TypeAdapter(List[WorkflowStepUpdate]).validate_python(patched)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=e.errors(include_url=False, include_context=False)
+        )
+
+
+def _sync_workflow_steps(template: Template, steps_data: List[WorkflowStepUpdate]) -> None:
+    """
+    Привести шаги шаблона к переданному списку минимальным набором изменений:
+    шаги сопоставляются по id, затем по позиции; совпавшие обновляются только
+    по изменившимся полям, лишние удаляются (delete-orphan), новые добавляются
+    """
+    existing = list(template.workflow_steps)
+    by_id = {step.id: step for step in existing}
+    matched = [None] * len(steps_data)
+    used = set()
+
+    for index, data in enumerate(steps_data):
+        step = by_id.get(data.id) if data.id else None
+        if step is not None and step.id not in used:
+            matched[index] = step
+            used.add(step.id)
+
+    by_position = {}
+    for step in existing:
+        if step.id not in used:
+            by_position.setdefault(step.position, step)
+    for index, data in enumerate(steps_data):
+        if matched[index] is None and not data.id:
+            step = by_position.pop(data.position, None)
+            if step is not None:
+                matched[index] = step
+                used.add(step.id)
+
+    result = []
+    for data, step in zip(steps_data, matched):
+        values = data.model_dump(exclude={"id"})
+        if step is None:
+            step = WorkflowStep(**values)
+        else:
+            for field, value in values.items():
+                if getattr(step, field) != value:
+                    setattr(step, field, value)
+        result.append(step)
+
+    # Замена коллекции: исчезнувшие шаги удаляются каскадом delete-orphan
+    template.workflow_steps = result
 
 
 @router.get("", response_model=List[TemplateResponse])
-def get_templates(
+async def get_templates(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     status_filter: str = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
     """
-    Получить список всех шаблонов
+    Получить список всех шаблонов.
+    Пагинация: skip/limit или cursor из заголовка X-Next-Cursor предыдущей страницы
     """
-    query = db.query(Template)
+    cached = response_cache.get("templates", request)
+    if cached is not None:
+        return cached
     
-    if status_filter:
-        query = query.filter(Template.status == status_filter)
+    def load(session: Session):
+        query = session.query(Template)
+        
+        if status_filter:
+            query = query.filter(Template.status == status_filter)
+        
+        templates = paginate(query, Template, skip, limit, cursor).all()
+        return response_cache.put(
+            "templates", request, templates, List[TemplateResponse],
+            headers=next_cursor_headers(templates, limit)
+        )
     
-    templates = query.offset(skip).limit(limit).all()
-    return templates
+    return await run_db(db, load)
 
 
 @router.get("/{template_id}", response_model=TemplateResponse)
@@ -51,6 +142,29 @@ def get_template(
     return template
 
 
+@router.get("/{template_id}/steps", response_model=List[WorkflowStepResponse])
+def get_template_steps(
+    template_id: str,
+    under: Optional[str] = Query(None, min_length=1, description="Позиция родителя: шаги 2.x для \"2\""),
+    include_self: bool = Query(False, description="Включить сам шаг с позицией under"),
+    db: Session = Depends(get_db)
+):
+    """
+    Шаги шаблона в порядке позиций ("2" < "2.1" < "10"); с under - только поддерево позиции,
+    выбираемое диапазоном по индексу (template_id, sort_key)
+    """
+    query = db.query(WorkflowStep).filter(WorkflowStep.template_id == template_id)
+    if under is not None:
+        query = query.filter(*subtree_conditions(under, include_self))
+    steps = query.order_by(WorkflowStep.sort_key, WorkflowStep.id).all()
+    if not steps and not db.query(Template.id).filter(Template.id == template_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Шаблон не найден"
+        )
+    return steps
+
+
 @router.post("", response_model=TemplateResponse, status_code=status.HTTP_201_CREATED)
 def create_template(
     template_data: TemplateCreate,
@@ -101,23 +215,23 @@ def update_template(
             detail="Шаблон не найден"
         )
     
+    if template_data.workflow is not None and template_data.workflow_patch is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Передайте либо workflow, либо workflow_patch"
+        )
+    
     # Обновляем шаблон
-    update_data = template_data.model_dump(exclude_unset=True, exclude={"workflow"})
+    update_data = template_data.model_dump(exclude_unset=True, exclude={"workflow", "workflow_patch"})
     for field, value in update_data.items():
         setattr(template, field, value)
     
-    # Обновляем workflow шаги, если они переданы
-    if template_data.workflow is not None:
-        # Удаляем старые шаги
-        db.query(WorkflowStep).filter(WorkflowStep.template_id == template_id).delete()
-        
-        # Создаем новые шаги
-        for step_data in template_data.workflow:
-            step = WorkflowStep(
-                template_id=template.id,
-                **step_data.model_dump()
-            )
-            db.add(step)
+    # Обновляем workflow шаги, если они переданы: только изменившиеся строки
+    steps_data = template_data.workflow
+    if template_data.workflow_patch is not None:
+        steps_data = _patch_workflow(template, template_data.workflow_patch)
+    if steps_data is not None:
+        _sync_workflow_steps(template, steps_data)
     
     db.commit()
     db.refresh(template)
@@ -1,37 +1,82 @@
 """
 Endpoints для веб-сайтов (портфолио)
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from loguru import logger
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, run_db
+from app.core.response_cache import response_cache
+from app.core.serialization import FastJSONRoute
+from app.api.pagination import next_cursor_headers, paginate
+from app.api.website_filters import WebsiteFilters, website_facets, website_filters
 from app.api.dependencies import get_current_admin_user
 from app.models.user import User
 from app.models.website import Website
-from app.schemas.website import WebsiteCreate, WebsiteUpdate, WebsiteResponse
+from app.schemas.website import WebsiteCreate, WebsiteUpdate, WebsiteResponse, WebsiteListResponse
 
-router = APIRouter(prefix="/websites", tags=["websites"])
+router = APIRouter(prefix="/websites", tags=["websites"], route_class=FastJSONRoute)
 
 
 @router.get("", response_model=List[WebsiteResponse])
-def get_websites(
+async def get_websites(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    featured: bool = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    filters: WebsiteFilters = Depends(website_filters),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Получить список всех веб-сайтов.
+    Фильтры: featured, category, technology (+ technology_match), client, date_from/date_to.
+    Пагинация: skip/limit или cursor из заголовка X-Next-Cursor предыдущей страницы
+    """
+    cached = response_cache.get("websites", request)
+    if cached is not None:
+        return cached
+    
+    def load(session: Session):
+        query = session.query(Website).filter(*filters.conditions())
+        websites = paginate(query, Website, skip, limit, cursor).all()
+        return response_cache.put(
+            "websites", request, websites, List[WebsiteResponse],
+            headers=next_cursor_headers(websites, limit)
+        )
+    
+    return await run_db(db, load)
+
+
+@router.get("/browse", response_model=WebsiteListResponse)
+async def browse_websites(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(24, ge=1, le=100),
+    cursor: Optional[str] = None,
+    filters: WebsiteFilters = Depends(website_filters),
+    db: Session = Depends(get_read_db)
 ):
     """
-    Получить список всех веб-сайтов
+    Страница отфильтрованных веб-сайтов вместе с общим числом и фасетами
+    (категории, технологии, клиенты, годы) для построения фильтров портфолио
     """
-    query = db.query(Website)
+    cached = response_cache.get("websites", request)
+    if cached is not None:
+        return cached
     
-    if featured is not None:
-        query = query.filter(Website.featured == featured)
+    def load(session: Session):
+        conditions = filters.conditions()
+        websites = paginate(session.query(Website).filter(*conditions), Website, skip, limit, cursor).all()
+        total = session.query(func.count(Website.id)).filter(*conditions).scalar()
+        payload = {"total": total, "items": websites, "facets": website_facets(session, filters)}
+        return response_cache.put(
+            "websites", request, payload, WebsiteListResponse,
+            headers=next_cursor_headers(websites, limit)
+        )
     
-    websites = query.offset(skip).limit(limit).all()
-    return websites
+    return await run_db(db, load)
 
 
 @router.get("/{website_id}", response_model=WebsiteResponse)
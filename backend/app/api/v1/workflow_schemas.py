@@ -2,55 +2,212 @@
 Endpoints для workflow схем (визуальный редактор)
 """
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from loguru import logger
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, run_db
+from app.core.response_cache import response_cache
+from app.core.serialization import FastJSONRoute
+from app.api.pagination import next_cursor_headers, paginate
+from app.api.patching import apply_json_patch, check_version, version_conflict
 from app.api.dependencies import get_current_admin_user
+from app.api.revisions import list_revisions, load_revision
+from app.api.workflow_analysis import cached_analysis, schema_analysis
+from app.api.workflow_graph import node_neighbors, node_type_counts, templates_with_node_type
+from app.models.template import Template
 from app.models.user import User
 from app.models.workflow_schema import WorkflowSchema
-from app.schemas.workflow_schema import WorkflowSchemaCreate, WorkflowSchemaUpdate, WorkflowSchemaResponse
+from app.schemas.workflow_schema import (
+    WorkflowNodeNeighbors,
+    WorkflowNodeTemplate,
+    WorkflowNodeTypeCount,
+    WorkflowSchemaCreate,
+    WorkflowSchemaAnalysis,
+    WorkflowSchemaResponse,
+    WorkflowSchemaSaveResponse,
+    WorkflowSchemaUpdate,
+)
+from app.schemas.json_patch import JsonPatchRequest
+from app.schemas.revision import RevisionInfo, RevisionResponse
 
-router = APIRouter(prefix="/workflow-schemas", tags=["workflow-schemas"])
+router = APIRouter(prefix="/workflow-schemas", tags=["workflow-schemas"], route_class=FastJSONRoute)
+
+
+def _with_analysis(schema: WorkflowSchema) -> Dict[str, Any]:
+    """
+    Ответ на сохранение: поля схемы и анализ её графа (из кеша по версии)
+    """
+    saved = {name: getattr(schema, name) for name in WorkflowSchemaResponse.model_fields}
+    saved["analysis"] = schema_analysis(schema)
+    return saved
+
+
+def _check_template(db: Session, template_id: str) -> None:
+    """
+    Схема ссылается на шаблон внешним ключом: без проверки запись с несуществующим
+    template_id упала бы на ограничении FOREIGN KEY при коммите
+    """
+    if not db.query(Template.id).filter(Template.id == template_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Шаблон '{template_id}' не найден"
+        )
+
+
+def _check_no_schema(db: Session, template_id: str) -> None:
+    if db.query(WorkflowSchema.id).filter(WorkflowSchema.template_id == template_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Workflow схема для шаблона '{template_id}' уже существует"
+        )
 
 
 @router.get("", response_model=List[WorkflowSchemaResponse])
 def get_workflow_schemas(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
-    Получить список всех workflow схем
+    Получить список всех workflow схем.
+    Пагинация: skip/limit или cursor из заголовка X-Next-Cursor предыдущей страницы
     """
-    schemas = db.query(WorkflowSchema).offset(skip).limit(limit).all()
+    schemas = paginate(db.query(WorkflowSchema), WorkflowSchema, skip, limit, cursor).all()
+    response.headers.update(next_cursor_headers(schemas, limit))
     return schemas
 
 
+@router.get("/node-types", response_model=List[WorkflowNodeTypeCount])
+async def get_node_type_counts(
+    request: Request,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Число узлов каждого типа во всех схемах и число схем, где тип встречается
+    """
+    cached = response_cache.get("workflow-schemas", request)
+    if cached is not None:
+        return cached
+    
+    def load(session: Session):
+        return response_cache.put(
+            "workflow-schemas", request, node_type_counts(session), List[WorkflowNodeTypeCount]
+        )
+    
+    return await run_db(db, load)
+
+
+@router.get("/node-types/{node_type}/templates", response_model=List[WorkflowNodeTemplate])
+async def get_templates_with_node_type(
+    node_type: str,
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Шаблоны, в схемах которых есть узлы данного типа (больше таких узлов - раньше)
+    """
+    cached = response_cache.get("workflow-schemas", request)
+    if cached is not None:
+        return cached
+    
+    def load(session: Session):
+        templates = templates_with_node_type(session, node_type, skip, limit)
+        return response_cache.put("workflow-schemas", request, templates, List[WorkflowNodeTemplate])
+    
+    return await run_db(db, load)
+
+
 @router.get("/template/{template_id}", response_model=WorkflowSchemaResponse)
-def get_workflow_schema_by_template(
+async def get_workflow_schema_by_template(
     template_id: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_read_db)
 ):
     """
     Получить workflow схему по ID шаблона. Если схемы нет — 200 с пустыми nodes.
     """
-    schema = db.query(WorkflowSchema).filter(WorkflowSchema.template_id == template_id).first()
-    if not schema:
-        return WorkflowSchemaResponse(
-            id="",
-            template_id=template_id,
-            nodes=[],
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow(),
-        )
-    return schema
+    cached = response_cache.get("workflow-schemas", request)
+    if cached is not None:
+        return cached
+    
+    def load(session: Session):
+        schema = session.query(WorkflowSchema).filter(WorkflowSchema.template_id == template_id).first()
+        if not schema:
+            schema = WorkflowSchemaResponse(
+                id="",
+                template_id=template_id,
+                nodes=[],
+                version=0,
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow(),
+            )
+        return response_cache.put("workflow-schemas", request, schema, WorkflowSchemaResponse)
+    
+    return await run_db(db, load)
+
+
+@router.get("/template/{template_id}/analysis", response_model=WorkflowSchemaAnalysis)
+async def get_workflow_schema_analysis(
+    template_id: str,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Анализ графа схемы шаблона: целостность связей, циклы, достижимость
+    от триггеров до завершения, топологический порядок
+    """
+    def load(session: Session):
+        # Узлы читаются только при промахе кеша анализа
+        schema = session.query(WorkflowSchema.id, WorkflowSchema.version).filter(
+            WorkflowSchema.template_id == template_id
+        ).first()
+        if not schema:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Workflow схема не найдена"
+            )
+        return cached_analysis(schema.id, schema.version, lambda: session.query(WorkflowSchema.nodes).filter(
+            WorkflowSchema.id == schema.id
+        ).scalar())
+    
+    return await run_db(db, load)
 
 
-@router.post("", response_model=WorkflowSchemaResponse, status_code=status.HTTP_201_CREATED)
+@router.get("/template/{template_id}/nodes/{node_id}/neighbors", response_model=WorkflowNodeNeighbors)
+async def get_node_neighbors(
+    template_id: str,
+    node_id: str,
+    request: Request,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Узел схемы шаблона и его соседи: откуда в него ведут связи и куда ведут его связи
+    """
+    cached = response_cache.get("workflow-schemas", request)
+    if cached is not None:
+        return cached
+    
+    def load(session: Session):
+        schema_id = session.query(WorkflowSchema.id).filter(WorkflowSchema.template_id == template_id).scalar()
+        neighbors = node_neighbors(session, schema_id, node_id) if schema_id else None
+        if neighbors is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Узел схемы не найден"
+            )
+        return response_cache.put("workflow-schemas", request, neighbors, WorkflowNodeNeighbors)
+    
+    return await run_db(db, load)
+
+
+@router.post("", response_model=WorkflowSchemaSaveResponse, status_code=status.HTTP_201_CREATED)
 def create_workflow_schema(
     schema_data: WorkflowSchemaCreate,
     db: Session = Depends(get_db),
@@ -59,15 +216,9 @@ def create_workflow_schema(
     """
     Создать новую workflow схему (только для админов)
     """
+    _check_template(db, schema_data.template_id)
     # Проверяем, не существует ли уже схема для этого шаблона
-    existing = db.query(WorkflowSchema).filter(
-        WorkflowSchema.template_id == schema_data.template_id
-    ).first()
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Workflow схема для шаблона '{schema_data.template_id}' уже существует"
-        )
+    _check_no_schema(db, schema_data.template_id)
     
     new_schema = WorkflowSchema(**schema_data.model_dump())
     db.add(new_schema)
@@ -75,10 +226,10 @@ def create_workflow_schema(
     db.refresh(new_schema)
     
     logger.info(f"Создана workflow схема для шаблона: {new_schema.template_id} (пользователь: {current_user.username})")
-    return new_schema
+    return _with_analysis(new_schema)
 
 
-@router.put("/template/{template_id}", response_model=WorkflowSchemaResponse)
+@router.put("/template/{template_id}", response_model=WorkflowSchemaSaveResponse)
 def update_workflow_schema(
     template_id: str,
     schema_data: WorkflowSchemaUpdate,
@@ -97,16 +248,147 @@ def update_workflow_schema(
     
     # Обновляем только переданные поля
     update_data = schema_data.model_dump(exclude_unset=True)
+    if update_data.get("template_id") is None:
+        update_data.pop("template_id", None)
+    elif update_data["template_id"] != schema.template_id:
+        # Перенос схемы на другой шаблон: он должен существовать и быть без схемы
+        _check_template(db, update_data["template_id"])
+        _check_no_schema(db, update_data["template_id"])
     for field, value in update_data.items():
         setattr(schema, field, value)
     
-    db.commit()
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise version_conflict()
     db.refresh(schema)
     
     logger.info(f"Обновлена workflow схема для шаблона: {schema.template_id} (пользователь: {current_user.username})")
+    return _with_analysis(schema)
+
+
+@router.patch("/template/{template_id}", response_model=WorkflowSchemaSaveResponse)
+def patch_workflow_schema(
+    template_id: str,
+    patch_data: JsonPatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Частично обновить узлы схемы операциями JSON Patch (только для админов).
+    Пути операций отсчитываются от nodes; version - ожидаемая версия схемы
+    """
+    schema = db.query(WorkflowSchema).filter(WorkflowSchema.template_id == template_id).first()
+    if not schema:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Workflow схема не найдена"
+        )
+    check_version(schema, patch_data.version)
+    
+    nodes = apply_json_patch(schema.nodes or [], patch_data.operations)
+    if not isinstance(nodes, list) or not all(isinstance(node, dict) for node in nodes):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="nodes должен оставаться массивом объектов"
+        )
+    schema.nodes = nodes
+    
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise version_conflict()
+    db.refresh(schema)
+    
+    logger.info(
+        f"Обновлена workflow схема для шаблона: {schema.template_id}, операций патча: "
+        f"{len(patch_data.operations)} (пользователь: {current_user.username})"
+    )
+    return _with_analysis(schema)
+
+
+def _get_schema(db: Session, template_id: str) -> WorkflowSchema:
+    schema = db.query(WorkflowSchema).filter(WorkflowSchema.template_id == template_id).first()
+    if not schema:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Workflow схема не найдена"
+        )
     return schema
 
 
+@router.get("/template/{template_id}/revisions", response_model=List[RevisionInfo])
+def get_workflow_schema_revisions(
+    template_id: str,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    История ревизий узлов схемы, новые первыми (только для админов)
+    """
+    schema = _get_schema(db, template_id)
+    return list_revisions(db, "workflow_schema", schema.id, skip, limit)
+
+
+@router.get("/template/{template_id}/revisions/{version}", response_model=RevisionResponse)
+def get_workflow_schema_revision(
+    template_id: str,
+    version: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Узлы схемы в версии ревизии (только для админов)
+    """
+    schema = _get_schema(db, template_id)
+    revision = load_revision(db, "workflow_schema", schema.id, version)
+    if revision is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ревизия не найдена"
+        )
+    nodes, created_at = revision
+    return RevisionResponse(version=version, created_at=created_at, data=nodes)
+
+
+@router.post("/template/{template_id}/revisions/{version}/rollback", response_model=WorkflowSchemaSaveResponse)
+def rollback_workflow_schema(
+    template_id: str,
+    version: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Вернуть узлы схемы к ревизии (только для админов).
+    Откат - обычное сохранение: версия растёт, в истории появляется новая ревизия
+    """
+    schema = _get_schema(db, template_id)
+    revision = load_revision(db, "workflow_schema", schema.id, version)
+    if revision is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ревизия не найдена"
+        )
+    schema.nodes = revision[0]
+    
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise version_conflict()
+    db.refresh(schema)
+    
+    logger.info(
+        f"Workflow схема шаблона {schema.template_id} возвращена к версии {version} "
+        f"(пользователь: {current_user.username})"
+    )
+    return _with_analysis(schema)
+
+
 @router.delete("/template/{template_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_workflow_schema(
     template_id: str,
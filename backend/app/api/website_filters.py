@@ -0,0 +1,212 @@
+"""
+Фильтрация сайтов портфолио и фасеты: категория, технологии, период, клиент.
+Технологии дублируются в нормализованную таблицу website_technologies,
+чтобы фильтр и подсчёт не разбирали JSON каждой строки
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Literal, Optional
+
+from fastapi import Query
+from loguru import logger
+from sqlalchemy import delete, event, exists, func, insert, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.database import engine
+from app.models.website import Website, WebsiteTechnology
+
+TechnologyMatch = Literal["any", "all"]
+
+# Значений в одном фасете (самые частые)
+FACET_LIMIT = 50
+
+# Размер пачки id в IN (...) при синхронизации
+SYNC_CHUNK = 500
+
+DATE_PATTERN = r"^\d{4}(-\d{2})?$"
+
+
+def technology_key(name: str) -> str:
+    """
+    Ключ технологии: без учёта регистра и пробелов по краям
+    """
+    return name.strip().lower()
+
+
+def technology_rows(website_id: str, technologies: Optional[Iterable[str]]) -> List[Dict[str, str]]:
+    """
+    Строки website_technologies сайта; повторы одной технологии схлопываются
+    """
+    rows = {}
+    for name in technologies or []:
+        if isinstance(name, str) and name.strip():
+            rows.setdefault(technology_key(name), {
+                "website_id": website_id, "key": technology_key(name), "name": name.strip(),
+            })
+    return list(rows.values())
+
+
+def sync_technologies(connection: Connection, ids: Iterable[str]) -> None:
+    """
+    Пересобрать строки website_technologies по текущим Website.technologies
+    """
+    ids = list(set(ids))
+    for start in range(0, len(ids), SYNC_CHUNK):
+        chunk = ids[start:start + SYNC_CHUNK]
+        rows = []
+        for website in connection.execute(
+            select(Website.id, Website.technologies).where(Website.id.in_(chunk))
+        ):
+            rows.extend(technology_rows(website.id, website.technologies))
+        connection.execute(delete(WebsiteTechnology).where(WebsiteTechnology.website_id.in_(chunk)))
+        if rows:
+            connection.execute(insert(WebsiteTechnology), rows)
+
+
+def backfill_technologies() -> None:
+    """
+    Заполнить website_technologies при старте, если таблица пуста (первый запуск после обновления)
+    """
+    with engine.begin() as connection:
+        if connection.execute(select(exists().select_from(WebsiteTechnology))).scalar():
+            return
+        ids = connection.execute(select(Website.id)).scalars().all()
+        if ids:
+            sync_technologies(connection, ids)
+            logger.info(f"Индекс технологий заполнен: {len(ids)} сайтов")
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_website_technologies(session: Session, flush_context) -> None:
+    """
+    После flush обновить технологии созданных, изменённых и удалённых сайтов
+    """
+    removed, rows = set(), []
+    for obj in session.new:
+        if isinstance(obj, Website):
+            rows.extend(technology_rows(obj.id, obj.technologies))
+    for obj in session.dirty:
+        if isinstance(obj, Website) and inspect(obj).attrs.technologies.history.has_changes():
+            removed.add(obj.id)
+            rows.extend(technology_rows(obj.id, obj.technologies))
+    for obj in session.deleted:
+        if isinstance(obj, Website):
+            removed.add(obj.id)
+    if not removed and not rows:
+        return
+    connection = session.connection()
+    if removed:
+        connection.execute(delete(WebsiteTechnology).where(WebsiteTechnology.website_id.in_(removed)))
+    if rows:
+        connection.execute(insert(WebsiteTechnology), rows)
+
+
+@dataclass
+class WebsiteFilters:
+    """
+    Фильтры списка сайтов. Внутри одного измерения значения объединяются по ИЛИ
+    (для технологий - по ИЛИ или И, см. technology_match), измерения - по И
+    """
+    featured: Optional[bool] = None
+    categories: List[str] = field(default_factory=list)
+    technologies: List[str] = field(default_factory=list)
+    technology_match: TechnologyMatch = "any"
+    clients: List[str] = field(default_factory=list)
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+
+    def conditions(self, exclude: Optional[str] = None) -> List[Any]:
+        """
+        Условия WHERE для Website; exclude - измерение, фильтр по которому не применяется
+        (для фасета этого же измерения)
+        """
+        conditions = []
+        if self.featured is not None:
+            conditions.append(Website.featured == self.featured)
+        if self.categories and exclude != "category":
+            conditions.append(Website.category.in_(self.categories))
+        if self.clients and exclude != "client":
+            conditions.append(Website.client.in_(self.clients))
+        if exclude != "year":
+            if self.date_from:
+                conditions.append(Website.date >= self.date_from)
+            if self.date_to:
+                # "2023" включает все месяцы 2023 года
+                date_to = self.date_to if len(self.date_to) > 4 else f"{self.date_to}-12"
+                conditions.append(Website.date <= date_to)
+        if self.technologies and exclude != "technology":
+            conditions.append(Website.id.in_(self._technology_subquery()))
+        return conditions
+
+    def _technology_subquery(self):
+        keys = {technology_key(name) for name in self.technologies}
+        subquery = select(WebsiteTechnology.website_id).where(WebsiteTechnology.key.in_(keys))
+        if self.technology_match == "all":
+            subquery = subquery.group_by(WebsiteTechnology.website_id).having(func.count() == len(keys))
+        return subquery
+
+
+def website_filters(
+    featured: Optional[bool] = None,
+    category: Optional[List[str]] = Query(None, description="Категория, можно несколько"),
+    technology: Optional[List[str]] = Query(None, description="Технология, можно несколько"),
+    technology_match: TechnologyMatch = Query("any", description="any - хотя бы одна технология, all - все"),
+    client: Optional[List[str]] = Query(None, description="Клиент, можно несколько"),
+    date_from: Optional[str] = Query(None, pattern=DATE_PATTERN, description="Не раньше (YYYY или YYYY-MM)"),
+    date_to: Optional[str] = Query(None, pattern=DATE_PATTERN, description="Не позже (YYYY или YYYY-MM)"),
+) -> WebsiteFilters:
+    """
+    Фильтры списка сайтов из query-параметров
+    """
+    return WebsiteFilters(
+        featured=featured,
+        categories=category or [],
+        technologies=[name for name in technology or [] if name.strip()],
+        technology_match=technology_match,
+        clients=client or [],
+        date_from=date_from,
+        date_to=date_to,
+    )
+
+
+def _buckets(rows) -> List[Dict[str, Any]]:
+    return [{"value": value, "count": count} for value, count in rows]
+
+
+def website_facets(session: Session, filters: WebsiteFilters) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Число сайтов по значениям категорий, технологий, клиентов и годов.
+    Фасет считается с учётом фильтров остальных измерений, но не своего,
+    чтобы показывать альтернативы выбранному значению. Исключение - технологии
+    в режиме all: каждая выбранная технология сужает выборку
+    """
+    # count(*), а не count(id): группировка по индексированной колонке читает только индекс
+    def count_by(column, dimension: str):
+        count = func.count()
+        return _buckets(session.execute(
+            select(column, count)
+            .where(column.isnot(None), *filters.conditions(exclude=dimension))
+            .group_by(column)
+            .order_by(count.desc(), column)
+            .limit(FACET_LIMIT)
+        ).all())
+
+    technology_conditions = filters.conditions(
+        exclude="technology" if filters.technology_match == "any" else None
+    )
+    count = func.count()
+    query = select(func.min(WebsiteTechnology.name), count)
+    if technology_conditions:
+        query = query.join(Website, Website.id == WebsiteTechnology.website_id).where(*technology_conditions)
+    technologies = session.execute(
+        query.group_by(WebsiteTechnology.key)
+        .order_by(count.desc(), WebsiteTechnology.key)
+        .limit(FACET_LIMIT)
+    ).all()
+
+    return {
+        "categories": count_by(Website.category, "category"),
+        "technologies": _buckets(technologies),
+        "clients": count_by(Website.client, "client"),
+        "years": count_by(func.substr(Website.date, 1, 4), "year"),
+    }
@@ -0,0 +1,224 @@
+"""
+Анализ графа workflow схемы: целостность узлов и связей, циклы, достижимость
+от триггеров до завершения и топологический порядок. Все проходы линейны
+по числу узлов и связей. Результат кешируется по (id схемы, версия):
+узлы схемы одной версии не меняются
+"""
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.api.workflow_graph import node_key, node_targets
+
+# Типы узлов редактора схем, от которых и до которых проверяется достижимость
+TRIGGER_TYPE = "trigger"
+COMPLETE_TYPE = "complete"
+
+analysis_cache = TTLCache(
+    maxsize=settings.WORKFLOW_ANALYSIS_CACHE_SIZE, ttl=settings.WORKFLOW_ANALYSIS_CACHE_TTL_SECONDS
+)
+
+
+def _issue(code: str, severity: str, message: str, nodes: List[str]) -> Dict[str, Any]:
+    return {"code": code, "severity": severity, "message": message, "nodes": nodes}
+
+
+def _strongly_connected(adjacency: List[List[int]]) -> List[List[int]]:
+    """
+    Компоненты сильной связности (Тарьян, без рекурсии - глубина графа не ограничена стеком)
+    """
+    count = len(adjacency)
+    index = [-1] * count
+    low = [0] * count
+    on_stack = [False] * count
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+    for root in range(count):
+        if index[root] != -1:
+            continue
+        work = [(root, 0)]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        while work:
+            node, position = work[-1]
+            if position < len(adjacency[node]):
+                work[-1] = (node, position + 1)
+                target = adjacency[node][position]
+                if index[target] == -1:
+                    index[target] = low[target] = counter
+                    counter += 1
+                    stack.append(target)
+                    on_stack[target] = True
+                    work.append((target, 0))
+                elif on_stack[target]:
+                    low[node] = min(low[node], index[target])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
+
+
+def _reachable(adjacency: List[List[int]], starts: List[int]) -> List[bool]:
+    seen = [False] * len(adjacency)
+    queue = deque(starts)
+    for start in starts:
+        seen[start] = True
+    while queue:
+        node = queue.popleft()
+        for target in adjacency[node]:
+            if not seen[target]:
+                seen[target] = True
+                queue.append(target)
+    return seen
+
+
+def _topological_order(adjacency: List[List[int]]) -> Optional[List[int]]:
+    """
+    Порядок Кана (при равенстве - порядок узлов в схеме); None - в графе есть цикл
+    """
+    indegree = [0] * len(adjacency)
+    for targets in adjacency:
+        for target in targets:
+            indegree[target] += 1
+    queue = deque(node for node, degree in enumerate(indegree) if degree == 0)
+    order = []
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        for target in adjacency[node]:
+            indegree[target] -= 1
+            if indegree[target] == 0:
+                queue.append(target)
+    return order if len(order) == len(adjacency) else None
+
+
+def analyze_workflow(nodes: Any) -> Dict[str, Any]:
+    """
+    Проанализировать узлы схемы (формат WorkflowSchema.nodes).
+    Ошибки: узел без id, повтор id, связь на несуществующий узел, цикл.
+    Предупреждения: нет триггера или завершения, узлы, недостижимые от триггеров,
+    и узлы, из которых не достижимо завершение (если в схеме есть связи)
+    """
+    issues = []
+    ids: List[str] = []
+    positions: Dict[str, int] = {}
+    types: List[Any] = []
+    connections: List[List[str]] = []
+    missing_id, duplicates = [], []
+    for number, node in enumerate(nodes if isinstance(nodes, list) else []):
+        if not isinstance(node, dict):
+            continue
+        key = node_key(node, number)
+        if node.get("id") in (None, ""):
+            missing_id.append(key)
+        if key in positions:
+            # Связи повторного узла относятся к первому с тем же id
+            duplicates.append(key)
+            connections[positions[key]].extend(node_targets(node.get("connections")))
+            continue
+        positions[key] = len(ids)
+        ids.append(key)
+        types.append(node.get("type"))
+        connections.append(node_targets(node.get("connections")))
+
+    if missing_id:
+        issues.append(_issue("missing_id", "error", "Узлы без id (указана позиция в массиве)", missing_id))
+    if duplicates:
+        issues.append(_issue("duplicate_id", "error", "Повторяющиеся id узлов", sorted(set(duplicates))))
+
+    adjacency: List[List[int]] = []
+    dangling, edge_count = [], 0
+    for source, targets in enumerate(connections):
+        resolved = []
+        for target in dict.fromkeys(targets):
+            if target in positions:
+                resolved.append(positions[target])
+            else:
+                dangling.append(f"{ids[source]}->{target}")
+        adjacency.append(resolved)
+        edge_count += len(resolved)
+    if dangling:
+        issues.append(_issue("dangling_edge", "error", "Связи на несуществующие узлы", dangling))
+
+    cycles = [
+        [ids[node] for node in reversed(component)]
+        for component in _strongly_connected(adjacency)
+        if len(component) > 1 or component[0] in adjacency[component[0]]
+    ]
+    cycles.sort(key=lambda cycle: positions[cycle[0]])
+    for cycle in cycles:
+        issues.append(_issue("cycle", "error", "Цикл в графе", cycle))
+
+    triggers = [node for node, node_type in enumerate(types) if node_type == TRIGGER_TYPE]
+    completes = [node for node, node_type in enumerate(types) if node_type == COMPLETE_TYPE]
+    unreachable: List[str] = []
+    dead_ends: List[str] = []
+    if ids and not triggers:
+        issues.append(_issue("no_trigger", "warning", "Нет узла-триггера", []))
+    if ids and not completes:
+        issues.append(_issue("no_complete", "warning", "Нет узла завершения", []))
+    # Схема без связей - список шагов редактора, достижимость по графу не проверяется
+    if triggers and edge_count:
+        from_triggers = _reachable(adjacency, triggers)
+        unreachable = [ids[node] for node, seen in enumerate(from_triggers) if not seen]
+        if unreachable:
+            issues.append(_issue("unreachable", "warning", "Узлы недостижимы от триггеров", unreachable))
+        if completes:
+            reverse: List[List[int]] = [[] for _ in ids]
+            for source, targets in enumerate(adjacency):
+                for target in targets:
+                    reverse[target].append(source)
+            to_complete = _reachable(reverse, completes)
+            dead_ends = [
+                ids[node] for node in range(len(ids)) if from_triggers[node] and not to_complete[node]
+            ]
+            if dead_ends:
+                issues.append(_issue("dead_end", "warning", "Из узлов не достижимо завершение", dead_ends))
+
+    order = _topological_order(adjacency)
+    return {
+        "valid": not any(issue["severity"] == "error" for issue in issues),
+        "node_count": len(ids),
+        "edge_count": edge_count,
+        "issues": issues,
+        "cycles": cycles,
+        "triggers": [ids[node] for node in triggers],
+        "completes": [ids[node] for node in completes],
+        "unreachable": unreachable,
+        "dead_ends": dead_ends,
+        "topological_order": [ids[node] for node in order] if order is not None else None,
+    }
+
+
+def cached_analysis(schema_id: str, version: int, load_nodes: Callable[[], Any]) -> Dict[str, Any]:
+    """
+    Анализ версии схемы из кеша; при промахе узлы загружаются через load_nodes
+    """
+    key = (schema_id, version)
+    analysis = analysis_cache.get(key)
+    if analysis is None:
+        analysis = analyze_workflow(load_nodes())
+        analysis_cache.set(key, analysis)
+    return analysis
+
+
+def schema_analysis(schema: Any) -> Dict[str, Any]:
+    """
+    Анализ сохранённой схемы (WorkflowSchema)
+    """
+    return cached_analysis(schema.id, schema.version, lambda: schema.nodes)
@@ -0,0 +1,210 @@
+"""
+Граф workflow схем: узлы и связи из WorkflowSchema.nodes дублируются в нормализованные
+таблицы workflow_nodes и workflow_edges, чтобы запросы по типам узлов и соседям
+не разбирали JSON схем
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import delete, event, exists, func, insert, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.database import engine
+from app.models.template import Template
+from app.models.workflow_schema import WorkflowEdge, WorkflowNode, WorkflowSchema
+
+# Размер пачки id в IN (...) при синхронизации
+SYNC_CHUNK = 500
+
+
+def node_key(node: Dict[str, Any], index: int) -> str:
+    """
+    Идентификатор узла: его id, а для узла без id - позиция в массиве
+    """
+    node_id = node.get("id")
+    return str(node_id) if node_id not in (None, "") else f"#{index}"
+
+
+def node_targets(connections: Any) -> List[str]:
+    """
+    Цели связей узла: connections - список id или объектов с target / id
+    """
+    if not isinstance(connections, list):
+        return []
+    targets = []
+    for connection in connections:
+        if isinstance(connection, dict):
+            connection = connection.get("target", connection.get("id"))
+        if isinstance(connection, (str, int)) and not isinstance(connection, bool) and connection != "":
+            targets.append(str(connection))
+    return targets
+
+
+def _text(value: Any) -> Optional[str]:
+    return value if isinstance(value, str) else None
+
+
+def graph_rows(schema_id: str, nodes: Any) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+    """
+    Строки workflow_nodes и workflow_edges схемы; повторы узлов и связей схлопываются
+    """
+    node_rows: Dict[str, Dict[str, Any]] = {}
+    edge_rows: Dict[Tuple[str, str], Dict[str, str]] = {}
+    for index, node in enumerate(nodes if isinstance(nodes, list) else []):
+        if not isinstance(node, dict):
+            continue
+        source = node_key(node, index)
+        node_rows.setdefault(source, {
+            "schema_id": schema_id, "node_id": source,
+            "type": _text(node.get("type")), "label": _text(node.get("label")),
+        })
+        for target in node_targets(node.get("connections")):
+            edge_rows.setdefault((source, target), {"schema_id": schema_id, "source": source, "target": target})
+    return list(node_rows.values()), list(edge_rows.values())
+
+
+def _replace(connection: Connection, removed: Iterable[str], nodes: List[Dict], edges: List[Dict]) -> None:
+    removed = list(removed)
+    if removed:
+        connection.execute(delete(WorkflowEdge).where(WorkflowEdge.schema_id.in_(removed)))
+        connection.execute(delete(WorkflowNode).where(WorkflowNode.schema_id.in_(removed)))
+    if nodes:
+        connection.execute(insert(WorkflowNode), nodes)
+    if edges:
+        connection.execute(insert(WorkflowEdge), edges)
+
+
+def sync_workflow_graph(connection: Connection, ids: Iterable[str]) -> None:
+    """
+    Пересобрать узлы и связи схем по текущим WorkflowSchema.nodes
+    """
+    ids = list(set(ids))
+    for start in range(0, len(ids), SYNC_CHUNK):
+        chunk = ids[start:start + SYNC_CHUNK]
+        nodes, edges = [], []
+        for schema in connection.execute(
+            select(WorkflowSchema.id, WorkflowSchema.nodes).where(WorkflowSchema.id.in_(chunk))
+        ):
+            schema_nodes, schema_edges = graph_rows(schema.id, schema.nodes)
+            nodes.extend(schema_nodes)
+            edges.extend(schema_edges)
+        _replace(connection, chunk, nodes, edges)
+
+
+def backfill_workflow_graph() -> None:
+    """
+    Заполнить граф схем при старте, если он пуст (первый запуск после обновления)
+    """
+    with engine.begin() as connection:
+        if connection.execute(select(exists().select_from(WorkflowNode))).scalar():
+            return
+        ids = connection.execute(select(WorkflowSchema.id)).scalars().all()
+        if ids:
+            sync_workflow_graph(connection, ids)
+            logger.info(f"Граф workflow схем заполнен: {len(ids)} схем")
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_workflow_graph(session: Session, flush_context) -> None:
+    """
+    После flush обновить граф созданных, изменённых и удалённых схем
+    """
+    removed, nodes, edges = set(), [], []
+    for obj in session.new:
+        if isinstance(obj, WorkflowSchema):
+            schema_nodes, schema_edges = graph_rows(obj.id, obj.nodes)
+            nodes.extend(schema_nodes)
+            edges.extend(schema_edges)
+    for obj in session.dirty:
+        if isinstance(obj, WorkflowSchema) and inspect(obj).attrs.nodes.history.has_changes():
+            removed.add(obj.id)
+            schema_nodes, schema_edges = graph_rows(obj.id, obj.nodes)
+            nodes.extend(schema_nodes)
+            edges.extend(schema_edges)
+    for obj in session.deleted:
+        if isinstance(obj, WorkflowSchema):
+            removed.add(obj.id)
+    if removed or nodes or edges:
+        _replace(session.connection(), removed, nodes, edges)
+
+
+def node_type_counts(session: Session) -> List[Dict[str, Any]]:
+    """
+    Число узлов и схем по типам узлов, самые частые - первыми
+    """
+    nodes = func.count()
+    rows = session.execute(
+        select(WorkflowNode.type, nodes, func.count(func.distinct(WorkflowNode.schema_id)))
+        .join(WorkflowSchema, WorkflowSchema.id == WorkflowNode.schema_id)
+        .join(Template, Template.id == WorkflowSchema.template_id)
+        .where(WorkflowNode.type.isnot(None))
+        .group_by(WorkflowNode.type)
+        .order_by(nodes.desc(), WorkflowNode.type)
+    ).all()
+    return [{"type": type_, "nodes": count, "templates": templates} for type_, count, templates in rows]
+
+
+def templates_with_node_type(session: Session, node_type: str, skip: int, limit: int) -> List[Dict[str, Any]]:
+    """
+    Шаблоны, в схемах которых есть узлы данного типа, и число таких узлов
+    """
+    # Сначала подсчёт по индексу (type, schema_id), затем join только с найденными схемами
+    nodes = func.count().label("nodes")
+    counts = (
+        select(WorkflowNode.schema_id, nodes)
+        .where(WorkflowNode.type == node_type)
+        .group_by(WorkflowNode.schema_id)
+        .subquery()
+    )
+    rows = session.execute(
+        select(WorkflowSchema.template_id, counts.c.nodes)
+        .join(counts, counts.c.schema_id == WorkflowSchema.id)
+        .join(Template, Template.id == WorkflowSchema.template_id)
+        .order_by(counts.c.nodes.desc(), WorkflowSchema.template_id)
+        .offset(skip)
+        .limit(limit)
+    ).all()
+    return [{"template_id": template_id, "nodes": count} for template_id, count in rows]
+
+
+def _node_refs(session: Session, schema_id: str, node_ids: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Узлы по id с типом и подписью; id без узла в схеме (висячая связь) - с exists=False
+    """
+    node_ids = sorted(set(node_ids))
+    known = {
+        row.node_id: row for row in session.execute(
+            select(WorkflowNode.node_id, WorkflowNode.type, WorkflowNode.label)
+            .where(WorkflowNode.schema_id == schema_id, WorkflowNode.node_id.in_(node_ids))
+        )
+    } if node_ids else {}
+    return [
+        {"id": node_id, "type": known[node_id].type if node_id in known else None,
+         "label": known[node_id].label if node_id in known else None, "exists": node_id in known}
+        for node_id in node_ids
+    ]
+
+
+def node_neighbors(session: Session, schema_id: str, node_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Узел схемы с соседями: incoming - узлы со связью в него, outgoing - узлы, в которые
+    ведут его связи. None - узла в схеме нет
+    """
+    node = session.execute(
+        select(WorkflowNode.node_id, WorkflowNode.type, WorkflowNode.label)
+        .where(WorkflowNode.schema_id == schema_id, WorkflowNode.node_id == node_id)
+    ).first()
+    if node is None:
+        return None
+    outgoing = session.execute(
+        select(WorkflowEdge.target).where(WorkflowEdge.schema_id == schema_id, WorkflowEdge.source == node_id)
+    ).scalars().all()
+    incoming = session.execute(
+        select(WorkflowEdge.source).where(WorkflowEdge.schema_id == schema_id, WorkflowEdge.target == node_id)
+    ).scalars().all()
+    return {
+        "node": {"id": node.node_id, "type": node.type, "label": node.label, "exists": True},
+        "incoming": _node_refs(session, schema_id, incoming),
+        "outgoing": _node_refs(session, schema_id, outgoing),
+    }
@@ -0,0 +1,168 @@
+"""
+Сжатие ответов: выбор кодировки по Accept-Encoding (gzip, а также br и zstd
+при установленных brotli / zstandard), порог размера и ASGI middleware
+"""
+import gzip
+from typing import Callable, Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # необязательная зависимость
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # необязательная зависимость
+    zstandard = None
+
+# Типы содержимого, которые имеет смысл сжимать
+COMPRESSIBLE_TYPES = ("application/json", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def _gzip(body: bytes) -> bytes:
+    # mtime=0: одинаковое тело - одинаковый результат
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _brotli(body: bytes) -> bytes:
+    return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+
+def _zstd(body: bytes) -> bytes:
+    # ZstdCompressor не потокобезопасен - свой экземпляр на вызов
+    return zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compress(body)
+
+
+_COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {"gzip": _gzip}
+if brotli is not None:
+    _COMPRESSORS["br"] = _brotli
+if zstandard is not None:
+    _COMPRESSORS["zstd"] = _zstd
+
+# Доступные кодировки в порядке предпочтения сервера
+ENCODINGS: Tuple[str, ...] = tuple(
+    encoding.strip() for encoding in settings.COMPRESSION_ENCODINGS.split(",")
+    if encoding.strip() in _COMPRESSORS
+)
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Кодировка для ответа по заголовку Accept-Encoding: наибольший q среди доступных,
+    при равенстве - порядок COMPRESSION_ENCODINGS. None - отдавать без сжатия
+    """
+    if not accept_encoding or not settings.COMPRESSION_ENABLED:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip()] = weight
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    return _COMPRESSORS[encoding](body)
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type == "text/event-stream":
+        # События должны уходить клиенту сразу, без буферизации
+        return False
+    return (
+        media_type.startswith("text/")
+        or media_type.endswith("+json")
+        or media_type in COMPRESSIBLE_TYPES
+    )
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    ETag сжатого представления: у разных Content-Encoding разные ETag ("abc" -> "abc-gzip")
+    """
+    if etag.endswith('"'):
+        return f'{etag[:-1]}-{encoding}"'
+    return etag
+
+
+def strip_etag_encoding(etag: str) -> str:
+    """
+    ETag без суффикса кодировки - для сравнения If-None-Match с исходным телом
+    """
+    for encoding in _COMPRESSORS:
+        suffix = f'-{encoding}"'
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware: сжатие ответов, ещё не сжатых endpoint'ом (например кешем ответов),
+    если клиент это поддерживает и тело не меньше COMPRESSION_MIN_SIZE.
+    Потоковые ответы (тело из нескольких частей) пропускаются как есть
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        start: Optional[Message] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if is_compressible(headers.get("content-type")) and "content-encoding" not in headers:
+                    # Заголовки уходят вместе с первой частью тела, когда ясен её размер
+                    start = message
+                    return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(scope=start)
+            if "accept-encoding" not in headers.get("vary", "").lower():
+                headers.add_vary_header("Accept-Encoding")
+            body = message.get("body", b"")
+            if (
+                encoding is not None
+                and not message.get("more_body", False)
+                and len(body) >= settings.COMPRESSION_MIN_SIZE
+            ):
+                compressed = compress(body, encoding)
+                if len(compressed) < len(body):
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(compressed))
+                    if "etag" in headers:
+                        headers["ETag"] = encoded_etag(headers["etag"], encoding)
+                    message = {**message, "body": compressed}
+            await send(start)
+            start = None
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
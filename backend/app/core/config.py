@@ -17,12 +17,99 @@ class Settings(BaseSettings):
     # База данных
     DATABASE_URL: str = "sqlite:///./atii.db"
     
+    # Пул соединений
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # секунд ожидания свободного соединения
+    DB_POOL_RECYCLE: int = 1800  # пересоздавать соединения старше N секунд
+    DB_POOL_PRE_PING: bool = True
+    
+    # Профиль SQLite (PRAGMA при подключении)
+    SQLITE_TUNING: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 МБ
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    
     # JWT настройки
     SECRET_KEY: str = "your-secret-key-change-in-production-use-env-variable"
     ALGORITHM: str = "HS256"
     # Время жизни access token в минутах. 10080 = 7 дней. Задаётся через .env
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080
     
+    # Кеш авторизованных пользователей (токен -> claims + снимок пользователя).
+    # Сброс при изменении пользователя действует в своём процессе: при нескольких воркерах
+    # отключённый или удалённый пользователь сохраняет доступ к чтению на остальных
+    # до AUTH_CACHE_TTL_SECONDS; админские endpoints сверяют снимок с БД
+    AUTH_CACHE_SIZE: int = 1024
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    
+    # Хеширование паролей: стоимость bcrypt и отдельный пул потоков
+    # (хеши со старой стоимостью пересчитываются при входе)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32  # выполняемые + ожидающие; сверх - 503
+    
+    # Кеш ответов публичных GET endpoints. TTL ограничивает устаревание
+    # при нескольких воркерах: сброс при записи действует только в своём процессе
+    RESPONSE_CACHE_SIZE: int = 512
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    
+    # Как часто кеш настроек сверяет версию с БД (изменения из других воркеров)
+    SETTINGS_CACHE_CHECK_INTERVAL_SECONDS: float = 1.0
+    
+    # Кеш анализа графа workflow схем по (id, version): версия схемы неизменна,
+    # TTL только освобождает память от старых версий
+    WORKFLOW_ANALYSIS_CACHE_SIZE: int = 256
+    WORKFLOW_ANALYSIS_CACHE_TTL_SECONDS: int = 3600
+    
+    # Снимок GET /bootstrap: элементов в каждом списке (как limit списочных endpoints)
+    # и период полной пересборки в фоне (изменения из других воркеров)
+    BOOTSTRAP_LIST_LIMIT: int = 100
+    BOOTSTRAP_REFRESH_SECONDS: int = 300
+    
+    # Статическая публикация: каталог для JSON-файлов публичного контента
+    # (пусто - выключена) и HTML-фрагменты страниц и шаблонов для SEO
+    STATIC_PUBLISH_DIR: str = ""
+    STATIC_PUBLISH_HTML: bool = False
+    
+    # Лента изменений /changes: событий в истории для продолжения после переподключения,
+    # буфер событий на клиента (переполнение - reset) и интервал ping потока SSE.
+    # Лента в памяти процесса: при нескольких воркерах события видят только клиенты
+    # воркера, через который сделана запись
+    CHANGE_FEED_HISTORY: int = 1000
+    CHANGE_FEED_CLIENT_BUFFER: int = 256
+    CHANGE_FEED_HEARTBEAT_SECONDS: float = 15.0
+    
+    # История ревизий страниц и workflow схем: полный снимок не реже раза в N ревизий
+    # (между ними - JSON Patch), лимит ревизий на запись, срок хранения (0 - без срока)
+    # и период фонового сжатия истории (0 - только при запуске)
+    REVISION_SNAPSHOT_INTERVAL: int = 20
+    REVISION_MAX_PER_ENTITY: int = 200
+    REVISION_RETENTION_DAYS: int = 0
+    REVISION_COMPACT_INTERVAL_SECONDS: int = 3600
+    
+    # Полнотекстовый поиск: auto (FTS5 для SQLite, tsvector для PostgreSQL) | sqlite | postgres | none
+    SEARCH_BACKEND: str = "auto"
+    
+    # Сжатие ответов по Accept-Encoding. br и zstd доступны при установленных
+    # пакетах brotli / zstandard; порядок в COMPRESSION_ENCODINGS - предпочтение сервера
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # байт; меньшие тела не сжимаются
+    COMPRESSION_ENCODINGS: str = "zstd,br,gzip"
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    
+    # Быстрая сериализация ответов: ORM -> JSON через сгенерированные функции и orjson
+    # (нужен пакет orjson), без валидации response_model на каждый запрос
+    FAST_JSON_ENABLED: bool = False
+    
+    # Инструментация запросов: Server-Timing, /metrics, лог медленных запросов с их SQL
+    METRICS_ENABLED: bool = True
+    SERVER_TIMING_ENABLED: bool = True
+    SLOW_REQUEST_MS: int = 0  # 0 - лог медленных запросов выключен
+    SLOW_REQUEST_MAX_STATEMENTS: int = 50
+    
     # CORS (localhost и 127.0.0.1 — разные origin для браузера)
     CORS_ORIGINS: list[str] = [
         "http://localhost:5173",
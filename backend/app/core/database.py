@@ -1,22 +1,143 @@
 """
 Настройка базы данных
 """
-from sqlalchemy import create_engine
+import time
+from typing import Any, Callable, Dict, TypeVar, Union
+
+from sqlalchemy import Boolean, Integer, Numeric, create_engine, event, inspect, select, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 from loguru import logger
 
 from app.core.config import settings
+from app.core.metrics import Histogram
+
+T = TypeVar("T")
+
+# Асинхронные драйверы и их синхронные пары
+ASYNC_DRIVERS = {
+    "sqlite+aiosqlite": "sqlite",
+    "postgresql+asyncpg": "postgresql",
+}
+
+_url = make_url(settings.DATABASE_URL)
+
+# Асинхронный режим включается драйвером в DATABASE_URL (sqlite+aiosqlite, postgresql+asyncpg)
+ASYNC_MODE = _url.drivername in ASYNC_DRIVERS
+
+# Синхронный движок есть всегда: на нём работают админские endpoints и init_db
+SYNC_DATABASE_URL = (
+    _url.set(drivername=ASYNC_DRIVERS[_url.drivername]) if ASYNC_MODE else _url
+).render_as_string(hide_password=False)
+
+IS_SQLITE = _url.get_backend_name() == "sqlite"
+
+# Время ожидания соединения из пула (секунды)
+pool_checkout_wait = Histogram()
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool, замеряющий время ожидания свободного соединения
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - started)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool, замеряющий время ожидания свободного соединения
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - started)
+
+
+def _pool_kwargs(poolclass) -> Dict[str, Any]:
+    # In-memory SQLite живёт в одном соединении - пул по умолчанию не трогаем
+    if IS_SQLITE and _url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Профиль SQLite: WAL, чтобы запись не блокировала чтение, synchronous=NORMAL,
+    ожидание блокировки вместо мгновенной ошибки и mmap для чтения
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size={-int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record) -> None:
+    """
+    SQLite по умолчанию не проверяет внешние ключи и не выполняет ON DELETE CASCADE:
+    без этого удаление шаблона оставляет его схему и граф
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA foreign_keys=ON")
+    finally:
+        cursor.close()
+
+
+def _configure_engine(sync_engine: Engine) -> None:
+    if IS_SQLITE:
+        event.listen(sync_engine, "connect", _enable_sqlite_foreign_keys)
+    if IS_SQLITE and settings.SQLITE_TUNING:
+        event.listen(sync_engine, "connect", _apply_sqlite_pragmas)
+
 
 # Создаем движок БД
 engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+    SYNC_DATABASE_URL,
+    connect_args={"check_same_thread": False} if "sqlite" in SYNC_DATABASE_URL else {},
+    **_pool_kwargs(TimedQueuePool)
 )
+_configure_engine(engine)
 
 # Создаем фабрику сессий
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Асинхронный движок и фабрика сессий (только в асинхронном режиме)
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_MODE:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(settings.DATABASE_URL, **_pool_kwargs(TimedAsyncQueuePool))
+    _configure_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
 # Базовый класс для моделей
 Base = declarative_base()
 
@@ -36,10 +157,131 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    Dependency для получения асинхронной сессии БД
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Ошибка БД: {e}")
+            await db.rollback()
+            raise
+
+
+# Dependency для публичных read endpoints: сессия того режима, что выбран в DATABASE_URL
+get_read_db = get_async_db if ASYNC_MODE else get_db
+
+
+async def run_db(db: Union[Session, Any], fn: Callable[[Session], T]) -> T:
+    """
+    Выполнить синхронный ORM-код с сессией из get_read_db.
+    AsyncSession исполняет его через run_sync без занятия потока,
+    обычная Session - в threadpool.
+    """
+    if ASYNC_MODE:
+        return await db.run_sync(fn)
+    return await run_in_threadpool(fn, db)
+
+
+async def run_in_session(fn: Callable[[Session], T]) -> T:
+    """
+    Выполнить синхронный ORM-код в новой сессии текущего режима
+    (для кода вне зависимостей FastAPI)
+    """
+    if ASYNC_MODE:
+        async with AsyncSessionLocal() as db:
+            return await db.run_sync(fn)
+
+    def run() -> T:
+        with SessionLocal() as db:
+            return fn(db)
+
+    return await run_in_threadpool(run)
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Состояние пулов соединений и время ожидания checkout
+    """
+    stats = {"checkout_wait": pool_checkout_wait.snapshot(), "pools": {}}
+    for name, pool in (("sync", engine.pool), ("async", async_engine and async_engine.pool)):
+        if isinstance(pool, QueuePool):
+            stats["pools"][name] = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            }
+    return stats
+
+
+def _default_sql(column) -> str:
+    """
+    server_default колонки как SQL: строка в кавычках только у строковых типов,
+    числа и логические значения - как есть, text(...) - через компилятор диалекта
+    """
+    arg = column.server_default.arg
+    if not isinstance(arg, str):
+        return str(arg.compile(dialect=engine.dialect))
+    if isinstance(column.type, (Integer, Numeric, Boolean)):
+        return arg
+    return "'" + arg.replace("'", "''") + "'"
+
+
+def _add_missing_columns() -> None:
+    """
+    Добавить в существующие таблицы колонки, появившиеся в моделях
+    (create_all создаёт только отсутствующие таблицы)
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=engine.dialect)}"
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {_default_sql(column)}"
+                    if not column.nullable:
+                        ddl += " NOT NULL"
+                connection.execute(text(ddl))
+                logger.info(f"Добавлена колонка {table.name}.{column.name}")
+
+
+def _remove_orphans() -> None:
+    """
+    Удалить строки, ссылающиеся через ON DELETE CASCADE на удалённые записи
+    (остались от удалений, сделанных без проверки внешних ключей)
+    """
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            for fk in table.foreign_keys:
+                if (fk.ondelete or "").upper() != "CASCADE":
+                    continue
+                parent = fk.column
+                removed = connection.execute(
+                    table.delete().where(fk.parent.notin_(select(parent)))
+                ).rowcount
+                if removed:
+                    logger.info(f"Удалено {removed} строк {table.name} без записи в {parent.table.name}")
+
+
 def init_db():
     """
     Инициализация БД - создание всех таблиц
     """
     logger.info("Инициализация базы данных...")
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    if IS_SQLITE:
+        _remove_orphans()
+    # create_all не добавляет новые индексы в уже существующие таблицы
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
     logger.info("База данных инициализирована")
@@ -0,0 +1,217 @@
+"""
+Инструментация запросов: время ответа, SQL, сериализация, размер тела.
+Данные отдаются заголовком Server-Timing, в /metrics и в лог медленных запросов
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import Histogram, PrometheusText
+
+# Корзины для числа SQL-запросов и размера ответа
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Маршрут запросов, не попавших ни в один endpoint (ограничивает число серий)
+UNMATCHED_ROUTE = "unmatched"
+
+
+@dataclass
+class RequestTimings:
+    """Счётчики одного запроса"""
+    sql_count: int = 0
+    sql_seconds: float = 0.0
+    serialization_seconds: float = 0.0
+    statements: Optional[List[Tuple[float, str]]] = None
+
+    def server_timing(self, app_seconds: float) -> str:
+        """
+        Значение заголовка Server-Timing (длительности в миллисекундах)
+        """
+        return (
+            f'app;dur={app_seconds * 1000:.3f}, '
+            f'db;dur={self.sql_seconds * 1000:.3f};desc="{self.sql_count} SQL", '
+            f'ser;dur={self.serialization_seconds * 1000:.3f}'
+        )
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def measure_serialization() -> Iterator[None]:
+    """
+    Учесть время блока как сериализацию ответа текущего запроса
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.serialization_seconds += time.perf_counter() - started
+
+
+class InstrumentedJSONResponse(JSONResponse):
+    """JSONResponse с учётом времени рендера тела"""
+
+    def render(self, content: Any) -> bytes:
+        with measure_serialization():
+            return super().render(content)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None and _current.get() is not None:
+        context._instrumentation_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    timings = _current.get()
+    started = getattr(context, "_instrumentation_started", None)
+    if timings is None or started is None:
+        return
+    elapsed = time.perf_counter() - started
+    timings.sql_count += 1
+    timings.sql_seconds += elapsed
+    if timings.statements is not None and len(timings.statements) < settings.SLOW_REQUEST_MAX_STATEMENTS:
+        timings.statements.append((elapsed, statement))
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Подписаться на выполнение SQL движка (для async движка - его sync_engine)
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@dataclass
+class RouteStats:
+    """Накопленные метрики одного маршрута"""
+    statuses: Dict[int, int] = field(default_factory=dict)
+    latency: Histogram = field(default_factory=Histogram)
+    sql_queries: Histogram = field(default_factory=lambda: Histogram(QUERY_BUCKETS))
+    sql_seconds: Histogram = field(default_factory=Histogram)
+    serialization_seconds: Histogram = field(default_factory=Histogram)
+    response_bytes: Histogram = field(default_factory=lambda: Histogram(SIZE_BUCKETS))
+
+
+class RequestMetrics:
+    """
+    Метрики запросов в разрезе (метод, шаблон пути)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str], RouteStats] = {}
+
+    def observe(
+        self, method: str, route: str, status_code: int, seconds: float, timings: RequestTimings, size: int
+    ) -> None:
+        with self._lock:
+            stats = self._routes.get((method, route))
+            if stats is None:
+                stats = self._routes[(method, route)] = RouteStats()
+            stats.statuses[status_code] = stats.statuses.get(status_code, 0) + 1
+        stats.latency.observe(seconds)
+        stats.sql_queries.observe(timings.sql_count)
+        stats.sql_seconds.observe(timings.sql_seconds)
+        stats.serialization_seconds.observe(timings.serialization_seconds)
+        stats.response_bytes.observe(size)
+
+    def render(self, out: PrometheusText) -> None:
+        """
+        Добавить метрики запросов в ответ /metrics
+        """
+        with self._lock:
+            routes = list(self._routes.items())
+        for (method, route), stats in sorted(routes):
+            labels = {"method": method, "route": route}
+            for status_code, count in sorted(stats.statuses.items()):
+                out.add("http_requests_total", "counter", "Обработано запросов",
+                        count, {**labels, "status": status_code})
+            out.add_histogram("http_request_duration_seconds", "Время обработки запроса",
+                              stats.latency.snapshot(), labels)
+            out.add_histogram("http_request_sql_queries", "SQL-запросов на HTTP-запрос",
+                              stats.sql_queries.snapshot(), labels)
+            out.add_histogram("http_request_sql_duration_seconds", "Время SQL на HTTP-запрос",
+                              stats.sql_seconds.snapshot(), labels)
+            out.add_histogram("http_response_serialization_seconds", "Время сериализации ответа",
+                              stats.serialization_seconds.snapshot(), labels)
+            out.add_histogram("http_response_size_bytes", "Размер тела ответа",
+                              stats.response_bytes.snapshot(), labels)
+
+
+request_metrics = RequestMetrics()
+
+
+class InstrumentationMiddleware:
+    """
+    ASGI middleware: замер запроса, заголовок Server-Timing, метрики по маршруту
+    и лог запросов медленнее SLOW_REQUEST_MS вместе с их SQL
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(statements=[] if settings.SLOW_REQUEST_MS > 0 else None)
+        token = _current.set(timings)
+        started = time.perf_counter()
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", timings.server_timing(time.perf_counter() - started)
+                    )
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", UNMATCHED_ROUTE)
+            request_metrics.observe(scope["method"], path, status_code, elapsed, timings, size)
+            if timings.statements is not None and elapsed * 1000 >= settings.SLOW_REQUEST_MS:
+                _log_slow_request(scope, status_code, elapsed, timings)
+
+
+def _log_slow_request(scope: Scope, status_code: int, elapsed: float, timings: RequestTimings) -> None:
+    lines = [
+        f"  {seconds * 1000:8.2f} мс  {' '.join(statement.split())[:500]}"
+        for seconds, statement in timings.statements
+    ]
+    if timings.sql_count > len(timings.statements):
+        lines.append(f"  ... ещё {timings.sql_count - len(timings.statements)} SQL")
+    logger.warning(
+        f"Медленный запрос {scope['method']} {scope['path']} -> {status_code}: "
+        f"{elapsed * 1000:.1f} мс, SQL {timings.sql_count} за {timings.sql_seconds * 1000:.1f} мс, "
+        f"сериализация {timings.serialization_seconds * 1000:.1f} мс"
+        + "".join("\n" + line for line in lines)
+    )
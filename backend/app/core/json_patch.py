@@ -0,0 +1,189 @@
+"""
+JSON Patch (RFC 6902) и JSON Pointer (RFC 6901)
+"""
+import copy
+from typing import Any, Dict, List, Tuple
+
+_MISSING = object()
+
+
+class JsonPatchError(ValueError):
+    """Невалидная операция или путь патча"""
+
+
+class JsonPatchTestFailed(JsonPatchError):
+    """Операция test не прошла: документ изменился"""
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    """
+    Разбор JSON Pointer в список токенов
+    """
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"Путь должен начинаться с '/': {pointer!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _list_index(container: list, token: str, allow_end: bool) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    # Только ASCII-цифры: isdigit() пропускает "²", на котором падает int()
+    if not (token.isascii() and token.isdecimal()) or (len(token) > 1 and token.startswith("0")):
+        raise JsonPatchError(f"Невалидный индекс массива: {token!r}")
+    index = int(token)
+    limit = len(container) if allow_end else len(container) - 1
+    if index > limit:
+        raise JsonPatchError(f"Индекс {index} вне массива длины {len(container)}")
+    return index
+
+
+def _resolve_parent(document: Any, pointer: str) -> Tuple[Any, str]:
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        raise JsonPatchError("Операция над корнем документа не поддерживается")
+    parent = document
+    for token in tokens[:-1]:
+        parent = _get_child(parent, token)
+    return parent, tokens[-1]
+
+
+def _get_child(container: Any, token: str) -> Any:
+    if isinstance(container, dict):
+        if token not in container:
+            raise JsonPatchError(f"Ключ не найден: {token!r}")
+        return container[token]
+    if isinstance(container, list):
+        return container[_list_index(container, token, allow_end=False)]
+    raise JsonPatchError(f"Нельзя перейти по {token!r} в скалярном значении")
+
+
+def resolve(document: Any, pointer: str) -> Any:
+    """
+    Значение по JSON Pointer
+    """
+    value = document
+    for token in parse_pointer(pointer):
+        value = _get_child(value, token)
+    return value
+
+
+def _add(document: Any, pointer: str, value: Any) -> None:
+    parent, token = _resolve_parent(document, pointer)
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, token, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Нельзя добавить значение по пути {pointer!r}")
+
+
+def _remove(document: Any, pointer: str) -> Any:
+    parent, token = _resolve_parent(document, pointer)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f"Ключ не найден: {token!r}")
+        return parent.pop(token)
+    if isinstance(parent, list):
+        return parent.pop(_list_index(parent, token, allow_end=False))
+    raise JsonPatchError(f"Нельзя удалить значение по пути {pointer!r}")
+
+
+def apply_patch(document: Any, operations: List[Dict[str, Any]]) -> Any:
+    """
+    Применить операции к копии документа и вернуть результат.
+    Исходный документ не изменяется; при ошибке не применяется ничего
+    """
+    result = copy.deepcopy(document)
+    for operation in operations:
+        op = operation.get("op")
+        path = operation.get("path")
+        if not isinstance(path, str):
+            raise JsonPatchError(f"Операция без path: {operation!r}")
+        value = operation.get("value", _MISSING)
+        if op in ("add", "replace", "test") and value is _MISSING:
+            raise JsonPatchError(f"Операция {op} требует value")
+        if op in ("move", "copy") and not isinstance(operation.get("from"), str):
+            raise JsonPatchError(f"Операция {op} требует from")
+
+        if op == "add":
+            _add(result, path, copy.deepcopy(value))
+        elif op == "remove":
+            _remove(result, path)
+        elif op == "replace":
+            _remove(result, path)
+            _add(result, path, copy.deepcopy(value))
+        elif op == "move":
+            source = operation["from"]
+            if path.startswith(source + "/"):
+                raise JsonPatchError("Нельзя переместить значение внутрь самого себя")
+            _add(result, path, _remove(result, source))
+        elif op == "copy":
+            _add(result, path, copy.deepcopy(resolve(result, operation["from"])))
+        elif op == "test":
+            if resolve(result, path) != value:
+                raise JsonPatchTestFailed(f"Проверка не прошла: {path}")
+        else:
+            raise JsonPatchError(f"Неизвестная операция: {op!r}")
+    return result
+
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _same(a: Any, b: Any) -> bool:
+    """
+    Равенство JSON значений с учётом типа (1, 1.0 и True различаются)
+    """
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_same(value, b[key]) for key, value in a.items())
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def _diff(source: Any, target: Any, path: str, operations: List[Dict[str, Any]]) -> None:
+    if _same(source, target):
+        return
+    if isinstance(source, dict) and isinstance(target, dict):
+        for key in source:
+            if key not in target:
+                operations.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in target.items():
+            if key in source:
+                _diff(source[key], value, f"{path}/{_escape(key)}", operations)
+            else:
+                operations.append({"op": "add", "path": f"{path}/{_escape(key)}", "value": copy.deepcopy(value)})
+        return
+    if isinstance(source, list) and isinstance(target, list):
+        # Общие начало и конец списка пропускаются, середина сравнивается попарно
+        start = 0
+        while start < len(source) and start < len(target) and _same(source[start], target[start]):
+            start += 1
+        source_end, target_end = len(source), len(target)
+        while source_end > start and target_end > start and _same(source[source_end - 1], target[target_end - 1]):
+            source_end -= 1
+            target_end -= 1
+        common = min(source_end, target_end) - start
+        for index in range(start, start + common):
+            _diff(source[index], target[index], f"{path}/{index}", operations)
+        for index in range(source_end - 1, start + common - 1, -1):
+            operations.append({"op": "remove", "path": f"{path}/{index}"})
+        for index in range(start + common, target_end):
+            operations.append({"op": "add", "path": f"{path}/{index}", "value": copy.deepcopy(target[index])})
+        return
+    operations.append({"op": "replace", "path": path, "value": copy.deepcopy(target)})
+
+
+def make_patch(source: Any, target: Any) -> List[Dict[str, Any]]:
+    """
+    Операции, переводящие source в target (apply_patch(source, ops) == target).
+    Замена корня документа - операция replace с пустым path
+    """
+    operations: List[Dict[str, Any]] = []
+    _diff(source, target, "", operations)
+    return operations
@@ -0,0 +1,105 @@
+"""
+Метрики приложения
+"""
+import bisect
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Границы корзин гистограммы по умолчанию, в секундах
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class Histogram:
+    """
+    Потокобезопасная гистограмма наблюдений: count, sum, max и корзины
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Добавить наблюдение
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Текущее состояние: кумулятивные корзины в формате le -> count
+        """
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip(self.buckets, self._counts):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            buckets["+Inf"] = self.count
+            return {
+                "count": self.count,
+                "sum": round(self.sum, 6),
+                "max": round(self.max, 6),
+                "avg": round(self.sum / self.count, 6) if self.count else 0.0,
+                "buckets": buckets,
+            }
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Optional[Dict[str, Any]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+class PrometheusText:
+    """
+    Сборка ответа в текстовом формате Prometheus (exposition format 0.0.4).
+    Серии группируются по имени метрики, HELP/TYPE выводятся один раз
+    """
+
+    def __init__(self):
+        self._families: Dict[str, Tuple[str, str, List[str]]] = {}
+
+    def _samples(self, name: str, kind: str, help: str) -> List[str]:
+        if name not in self._families:
+            self._families[name] = (kind, help, [])
+        return self._families[name][2]
+
+    def add(self, name: str, kind: str, help: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Значение counter или gauge
+        """
+        self._samples(name, kind, help).append(f"{name}{_format_labels(labels)} {value}")
+
+    def add_histogram(
+        self, name: str, help: str, snapshot: Dict[str, Any], labels: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Гистограмма из Histogram.snapshot()
+        """
+        samples = self._samples(name, "histogram", help)
+        labels = labels or {}
+        for bound, count in snapshot["buckets"].items():
+            samples.append(f"{name}_bucket{_format_labels({**labels, 'le': bound})} {count}")
+        samples.append(f"{name}_sum{_format_labels(labels)} {snapshot['sum']}")
+        samples.append(f"{name}_count{_format_labels(labels)} {snapshot['count']}")
+
+    def render(self) -> str:
+        lines = []
+        for name, (kind, help, samples) in self._families.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
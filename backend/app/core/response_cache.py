@@ -0,0 +1,178 @@
+"""
+Кеш готовых JSON-ответов публичных GET endpoints с поддержкой ETag / If-None-Match
+и однократно сжатыми вариантами тела
+"""
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from fastapi import Request, Response, status
+from loguru import logger
+from pydantic import TypeAdapter
+
+from app.core.cache import TTLCache
+from app.core.compression import compress, encoded_etag, negotiate, strip_etag_encoding
+from app.core.config import settings
+from app.core.instrumentation import measure_serialization
+from app.core.serialization import fast_serializer
+
+
+@lru_cache(maxsize=None)
+def _adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def serialize(content: Any, response_type: Any) -> bytes:
+    """
+    Сериализация ORM-объектов (или схем) в JSON по схеме ответа
+    """
+    fast = fast_serializer(response_type)
+    adapter = _adapter(response_type) if fast is None else None
+    with measure_serialization():
+        if fast is not None:
+            return fast(content)
+        return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Сильный ETag по содержимому тела ответа
+    """
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Проверка заголовка If-None-Match
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [strip_etag_encoding(tag.strip().removeprefix("W/")) for tag in header.split(",")]
+    return etag in candidates
+
+
+def build_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    extra_headers: Optional[Dict[str, str]] = None,
+    variants: Optional[Dict[str, bytes]] = None,
+) -> Response:
+    """
+    Ответ с готовым телом: 304, если клиент уже имеет эту версию.
+    Тело сжимается по Accept-Encoding; variants - сжатые варианты, которые
+    сохраняются вместе с телом, чтобы сжимать его один раз, а не на каждый запрос
+    """
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding", **(extra_headers or {})}
+    encoding = negotiate(request.headers.get("accept-encoding"))
+    if encoding is not None and len(body) >= settings.COMPRESSION_MIN_SIZE:
+        compressed = variants.get(encoding) if variants is not None else None
+        if compressed is None:
+            compressed = compress(body, encoding)
+            if variants is not None:
+                variants[encoding] = compressed
+        if len(compressed) < len(body):
+            body = compressed
+            headers["Content-Encoding"] = encoding
+    headers["ETag"] = encoded_etag(etag, headers["Content-Encoding"]) if "Content-Encoding" in headers else etag
+    if etag_matches(request, etag):
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """
+    Кеш сериализованных тел ответов, сгруппированных по ресурсу.
+    Попадание отдаётся без обращения к БД и без Pydantic-сериализации,
+    запись через админские endpoints сбрасывает всю группу.
+    Подписчики (производные снимки данных) узнают о сброшенных группах через subscribe.
+    У каждой группы есть поколение, которое увеличивает сброс: get запоминает его
+    в request.state до чтения из БД, и put не сохраняет тело, если за время чтения
+    группу сбросили (иначе в кеш до TTL попал бы ответ, прочитанный до коммита)
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._subscribers: List[Callable[[Tuple[str, ...]], None]] = []
+        self._lock = threading.Lock()
+        self._generations: Dict[str, int] = {}
+
+    @staticmethod
+    def _key(group: str, request: Request) -> Hashable:
+        return (group, request.url.path, tuple(sorted(request.query_params.multi_items())))
+
+    def get(self, group: str, request: Request) -> Optional[Response]:
+        """
+        Готовый ответ из кеша (200 или 304) либо None при промахе.
+        При промахе запоминает поколение группы для последующего put
+        """
+        cached = self._cache.get(self._key(group, request))
+        if cached is None:
+            generations = getattr(request.state, "response_cache_generations", None)
+            if generations is None:
+                generations = request.state.response_cache_generations = {}
+            with self._lock:
+                generations[group] = self._generations.get(group, 0)
+            return None
+        body, etag, extra_headers, variants = cached
+        return build_response(request, body, etag, extra_headers, variants)
+
+    def put(
+        self,
+        group: str,
+        request: Request,
+        content: Any,
+        response_type: Any,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        """
+        Сериализовать ответ, сохранить в кеш и вернуть его клиенту.
+        headers - дополнительные заголовки, которые кешируются вместе с телом.
+        Тело не сохраняется, если группу сбросили после get (или get не вызывался)
+        """
+        body = serialize(content, response_type)
+        etag = make_etag(body)
+        variants: Dict[str, bytes] = {}
+        generation = getattr(request.state, "response_cache_generations", {}).get(group)
+        with self._lock:
+            if generation is not None and generation == self._generations.get(group, 0):
+                self._cache.set(self._key(group, request), (body, etag, headers, variants))
+        return build_response(request, body, etag, headers, variants)
+
+    def subscribe(self, callback: Callable[[Tuple[str, ...]], None]) -> None:
+        """
+        Вызывать callback(groups) после каждого сброса групп (запись уже закоммичена)
+        """
+        self._subscribers.append(callback)
+
+    def invalidate(self, *groups: str) -> None:
+        """
+        Сбросить закешированные ответы указанных групп и уведомить подписчиков
+        """
+        with self._lock:
+            for group in groups:
+                self._generations[group] = self._generations.get(group, 0) + 1
+            self._cache.delete_where(lambda key, _: key[0] in groups)
+        for callback in self._subscribers:
+            try:
+                callback(groups)
+            except Exception as e:
+                # Запись уже выполнена - ошибка подписчика не должна превращаться в 500
+                logger.exception(f"Ошибка обработчика сброса кеша {groups}: {e}")
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+response_cache = ResponseCache(
+    maxsize=settings.RESPONSE_CACHE_SIZE,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+)
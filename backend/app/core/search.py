@@ -0,0 +1,238 @@
+"""
+Полнотекстовый поиск поверх таблицы search_documents:
+SQLite FTS5 (external content) и PostgreSQL tsvector + GIN
+"""
+import html
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+
+from app.models.search import SearchDocument
+
+_TOKEN = re.compile(r"\w+")
+MAX_QUERY_TOKENS = 16
+
+# Границы совпадений во фрагменте от БД: управляющие символы, которых нет в тексте
+# документов (см. index_text); после экранирования текста заменяются на <mark>
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+_MARKS = re.compile(f"[{_MARK_START}{_MARK_END}]")
+
+
+@dataclass
+class SearchResult:
+    """Найденный документ"""
+    entity_type: str
+    entity_id: str
+    ref: Optional[str]
+    title: str
+    snippet: str
+    rank: float
+
+
+def query_tokens(query: str) -> List[str]:
+    """
+    Слова запроса. Пользовательский ввод не интерпретируется как синтаксис
+    FTS5 / tsquery: операторы и кавычки отбрасываются, слова объединяются по И
+    """
+    return _TOKEN.findall(query.lower())[:MAX_QUERY_TOKENS]
+
+
+def index_text(value: str) -> str:
+    """
+    Текст для индекса без символов-границ выделения
+    """
+    return _MARKS.sub(" ", value)
+
+
+def highlight(snippet: str) -> str:
+    """
+    Фрагмент от БД как HTML: текст экранирован, совпадения выделены <mark>
+    """
+    return html.escape(snippet or "").replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def _types_filter(types: Optional[Sequence[str]]) -> Tuple[str, Dict[str, Any]]:
+    if not types:
+        return "", {}
+    return "AND d.entity_type IN :types", {"types": list(types)}
+
+
+class SearchBackend(ABC):
+    """
+    Бэкенд поиска: создание индекса, запись документов и ранжированная выборка
+    """
+    name = "base"
+    dialect_insert = None
+
+    @abstractmethod
+    def setup(self, connection: Connection) -> None:
+        """
+        Создать индекс поверх search_documents (идемпотентно)
+        """
+
+    def upsert(self, connection: Connection, rows: List[Dict[str, Any]]) -> None:
+        """
+        Вставить или обновить документы по (entity_type, entity_id)
+        """
+        statement = self.dialect_insert(SearchDocument)
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=["entity_type", "entity_id"],
+                set_={
+                    "ref": statement.excluded.ref,
+                    "title": statement.excluded.title,
+                    "body": statement.excluded.body,
+                },
+            ),
+            rows,
+        )
+
+    def _execute(
+        self, connection: Connection, sql: str, params: Dict[str, Any], types: Optional[Sequence[str]]
+    ):
+        statement = text(sql)
+        if types:
+            statement = statement.bindparams(bindparam("types", expanding=True))
+        return connection.execute(statement, params)
+
+    @abstractmethod
+    def search(
+        self,
+        connection: Connection,
+        tokens: List[str],
+        types: Optional[Sequence[str]],
+        limit: int,
+        offset: int,
+    ) -> Tuple[int, List[SearchResult]]:
+        """
+        Общее число совпадений и страница результатов по убыванию релевантности
+        """
+
+
+class SqliteFtsBackend(SearchBackend):
+    """
+    FTS5 с external content: текст хранится только в search_documents,
+    индекс search_fts поддерживается триггерами, ранжирование - bm25
+    """
+    name = "sqlite-fts5"
+    dialect_insert = staticmethod(sqlite.insert)
+
+    TRIGGERS = (
+        """CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN
+            INSERT INTO search_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN
+            INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN
+            INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+            INSERT INTO search_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+        END""",
+    )
+
+    # Вес совпадения в заголовке относительно текста
+    TITLE_WEIGHT = 10.0
+
+    def setup(self, connection: Connection) -> None:
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_fts'")
+        ).first()
+        if not exists:
+            connection.execute(text(
+                "CREATE VIRTUAL TABLE search_fts USING fts5("
+                "title, body, content='search_documents', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2')"
+            ))
+            # Документы, записанные до появления индекса
+            connection.execute(text("INSERT INTO search_fts(search_fts) VALUES ('rebuild')"))
+        for trigger in self.TRIGGERS:
+            connection.execute(text(trigger))
+
+    def search(self, connection, tokens, types, limit, offset):
+        types_sql, params = _types_filter(types)
+        # Каждое слово - префиксный терм в кавычках, термы через пробел - И
+        params["match"] = " ".join(f'"{token}"*' for token in tokens)
+        params["mark_start"], params["mark_end"] = _MARK_START, _MARK_END
+        source = (
+            "FROM search_fts JOIN search_documents d ON d.id = search_fts.rowid "
+            f"WHERE search_fts MATCH :match {types_sql}"
+        )
+        total = self._execute(connection, f"SELECT count(*) {source}", params, types).scalar_one()
+        rows = self._execute(
+            connection,
+            "SELECT d.entity_type, d.entity_id, d.ref, d.title, "
+            "snippet(search_fts, -1, :mark_start, :mark_end, '…', 16) AS snippet, "
+            f"bm25(search_fts, {self.TITLE_WEIGHT}, 1.0) AS score {source} "
+            "ORDER BY score, d.id LIMIT :limit OFFSET :offset",
+            {**params, "limit": limit, "offset": offset},
+            types,
+        ).all()
+        # bm25 в SQLite отрицательный: чем меньше, тем релевантнее
+        return total, [
+            SearchResult(row.entity_type, row.entity_id, row.ref, row.title, highlight(row.snippet), -row.score)
+            for row in rows
+        ]
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Сохраняемая вычисляемая колонка tsvector (заголовок с весом A, текст - B)
+    с GIN индексом, ранжирование - ts_rank_cd
+    """
+    name = "postgres-tsvector"
+    dialect_insert = staticmethod(postgresql.insert)
+
+    def __init__(self, ts_config: str = "simple"):
+        self.ts_config = ts_config
+
+    def setup(self, connection: Connection) -> None:
+        connection.execute(text(
+            "ALTER TABLE search_documents ADD COLUMN IF NOT EXISTS document tsvector "
+            f"GENERATED ALWAYS AS (setweight(to_tsvector('{self.ts_config}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{self.ts_config}', coalesce(body, '')), 'B')) STORED"
+        ))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_search_documents_document ON search_documents USING GIN (document)"
+        ))
+
+    def search(self, connection, tokens, types, limit, offset):
+        types_sql, params = _types_filter(types)
+        params["query"] = " & ".join(f"{token}:*" for token in tokens)
+        params["headline"] = f"StartSel={_MARK_START}, StopSel={_MARK_END}, MaxWords=20, MinWords=8"
+        source = (
+            f"FROM search_documents d, to_tsquery('{self.ts_config}', :query) q "
+            f"WHERE d.document @@ q {types_sql}"
+        )
+        total = self._execute(connection, f"SELECT count(*) {source}", params, types).scalar_one()
+        rows = self._execute(
+            connection,
+            "SELECT d.entity_type, d.entity_id, d.ref, d.title, "
+            f"ts_headline('{self.ts_config}', d.body, q, :headline) AS snippet, "
+            f"ts_rank_cd(d.document, q) AS score {source} "
+            "ORDER BY score DESC, d.id LIMIT :limit OFFSET :offset",
+            {**params, "limit": limit, "offset": offset},
+            types,
+        ).all()
+        return total, [
+            SearchResult(row.entity_type, row.entity_id, row.ref, row.title, highlight(row.snippet), row.score)
+            for row in rows
+        ]
+
+
+def create_backend(name: str, dialect: str) -> Optional[SearchBackend]:
+    """
+    Бэкенд по настройке SEARCH_BACKEND: auto - по диалекту БД, none - поиск выключен
+    """
+    if name == "auto":
+        name = {"sqlite": "sqlite", "postgresql": "postgres"}.get(dialect, "none")
+    if name == "sqlite":
+        return SqliteFtsBackend()
+    if name == "postgres":
+        return PostgresSearchBackend()
+    return None
@@ -1,16 +1,26 @@
 """
 Безопасность: JWT, хеширование паролей
 """
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from loguru import logger
 
 from app.core.config import settings
+from app.core.metrics import Histogram
 
-# Контекст для хеширования паролей
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Контекст для хеширования паролей.
+# Хеши с другой стоимостью считаются устаревшими (needs_update)
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -27,6 +37,85 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHasherOverloaded(Exception):
+    """Очередь хеширования паролей переполнена"""
+
+
+class PasswordHasher:
+    """
+    Выполняет bcrypt в отдельном ограниченном пуле потоков, чтобы всплеск
+    входов не занимал общий threadpool. Сверх max_pending задач - отказ
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+        self.wait_seconds = Histogram()
+        self.hash_seconds = Histogram()
+        self.verify_seconds = Histogram()
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherOverloaded()
+            self._pending += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def _run(self, histogram: Histogram, fn, *args) -> Any:
+        self._acquire()
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            self.wait_seconds.observe(started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                histogram.observe(time.perf_counter() - started)
+
+        try:
+            return await asyncio.wrap_future(self._executor.submit(task))
+        finally:
+            self._release()
+
+    async def hash(self, password: str) -> str:
+        """
+        Хеширование пароля
+        """
+        return await self._run(self.hash_seconds, pwd_context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Проверка пароля; второй элемент - новый хеш, если стоимость изменилась
+        """
+        return await self._run(self.verify_seconds, pwd_context.verify_and_update, password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = self._pending
+        return {
+            "pending": pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+            "wait_seconds": self.wait_seconds.snapshot(),
+            "hash_seconds": self.hash_seconds.snapshot(),
+            "verify_seconds": self.verify_seconds.snapshot(),
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Создание JWT токена
@@ -0,0 +1,287 @@
+"""
+Быстрая сериализация ответов (FAST_JSON_ENABLED): ORM-объекты -> байты JSON через orjson
+без промежуточной валидации Pydantic. Для каждой схемы ответа один раз генерируется
+функция, которая читает нужные атрибуты и собирает dict / list для orjson.
+Структура ответа совпадает со схемой (и OpenAPI); если объект ей не соответствует
+(None в обязательном поле, не тот тип элементов списка), ответ собирается через Pydantic
+"""
+import asyncio
+import functools
+import inspect
+import threading
+import types
+import typing
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute
+from loguru import logger
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.config import settings
+from app.core.instrumentation import InstrumentedJSONResponse, measure_serialization
+
+try:
+    import orjson
+except ImportError:  # необязательная зависимость
+    orjson = None
+
+if settings.FAST_JSON_ENABLED and orjson is None:
+    logger.warning("FAST_JSON_ENABLED: пакет orjson не установлен, ответы сериализуются через Pydantic")
+
+# Значения этих типов orjson пишет так же, как Pydantic в режиме JSON
+_PASSTHROUGH = (str, int, float, bool, datetime, date)
+
+_NoneType = type(None)
+
+
+def fast_json_enabled() -> bool:
+    return settings.FAST_JSON_ENABLED and orjson is not None
+
+
+class _Mismatch(Exception):
+    """Объект не соответствует схеме - сериализовать через Pydantic"""
+
+
+def _required(value: Any) -> Any:
+    if value is None:
+        raise _Mismatch()
+    return value
+
+
+def _list_of(kind: type) -> Callable[[Any], Any]:
+    def check(value: Any) -> Any:
+        if not isinstance(value, (list, tuple)) or not all(isinstance(item, kind) for item in value):
+            raise _Mismatch()
+        return value
+    return check
+
+
+def _dict(value: Any) -> Any:
+    if not isinstance(value, dict):
+        raise _Mismatch()
+    return value
+
+
+class _Compiler:
+    """
+    Генерация исходного кода функций сериализации по аннотациям схем.
+    Для модели создаются две функции: по ключам (dict, __dict__ объекта) и по атрибутам
+    """
+
+    def __init__(self):
+        self.namespace: Dict[str, Any] = {
+            "_required": _required, "_dict": _dict, "_Mismatch": _Mismatch,
+            "_dict_list": _list_of(dict),
+        }
+        self.sources: List[str] = []
+        self.models: Dict[type, str] = {}
+        self._counter = 0
+
+    def _name(self, prefix: str) -> str:
+        self._counter += 1
+        return f"{prefix}{self._counter}"
+
+    def model(self, model: type) -> str:
+        """
+        Имя функции сериализации модели (сгенерировать, если ещё нет)
+        """
+        if model in self.models:
+            return self.models[model]
+        decorators = model.__pydantic_decorators__
+        if (
+            decorators.validators or decorators.field_validators or decorators.root_validators
+            or decorators.field_serializers or decorators.model_serializers
+            or decorators.model_validators or decorators.computed_fields
+        ):
+            raise TypeError(f"{model.__name__}: валидаторы и сериализаторы не поддерживаются")
+        name = self._name(f"_{model.__name__}_")
+        self.models[model] = name
+
+        for suffix, access in (("attrs", "obj.{}"), ("keys", "obj[{!r}]")):
+            items = [
+                f"{(field.serialization_alias or field.alias or field_name)!r}: "
+                f"{self.value(field.annotation, access.format(field_name))}"
+                for field_name, field in model.model_fields.items()
+            ]
+            self.sources.append(
+                f"def {name}_{suffix}(obj):\n    return {{\n        " + ",\n        ".join(items) + ",\n    }\n"
+            )
+        # Загруженные атрибуты ORM-объекта лежат в __dict__: чтение оттуда на порядок
+        # быстрее инструментированного getattr. Незагруженные (expired, lazy) -
+        # через getattr, который их подгрузит
+        self.sources.append(
+            f"def {name}(obj):\n"
+            f"    if isinstance(obj, dict):\n"
+            f"        return {name}_keys(obj)\n"
+            f"    try:\n"
+            f"        return {name}_keys(obj.__dict__)\n"
+            f"    except (KeyError, AttributeError):\n"
+            f"        return {name}_attrs(obj)\n"
+        )
+        return name
+
+    def value(self, annotation: Any, expression: str, nullable: bool = False) -> str:
+        """
+        Выражение, превращающее значение поля в данные для orjson
+        """
+        origin = typing.get_origin(annotation)
+        args = typing.get_args(annotation)
+
+        if origin is typing.Union or origin is types.UnionType:
+            if _NoneType not in args:
+                raise TypeError(f"Union без None не поддерживается: {annotation}")
+            inner = [arg for arg in args if arg is not _NoneType]
+            if len(inner) != 1:
+                raise TypeError(f"Union из нескольких типов не поддерживается: {annotation}")
+            variable = self._name("_v")
+            return (
+                f"(None if ({variable} := {expression}) is None "
+                f"else {self.value(inner[0], variable, nullable=True)})"
+            )
+
+        checked = expression if nullable else f"_required({expression})"
+        if annotation is Any:
+            return expression
+        if origin is typing.Literal or annotation in _PASSTHROUGH:
+            return checked
+        if annotation is dict or origin is dict:
+            return f"_dict({expression})"
+        if origin in (list, List) and args:
+            item = args[0]
+            if item in (str, int, float, bool):
+                check = self._name("_list")
+                self.namespace[check] = _list_of(item)
+                return f"{check}({expression})"
+            if item is dict or typing.get_origin(item) is dict:
+                return f"_dict_list({expression})"
+            variable = self._name("_i")
+            return f"[{self.value(item, variable, nullable=False)} for {variable} in {checked}]"
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            return f"{self.model(annotation)}({checked})"
+        raise TypeError(f"Тип не поддерживается: {annotation}")
+
+    def build(self, entry: str) -> Callable[[Any], Any]:
+        exec("\n".join(self.sources), self.namespace)
+        return self.namespace[entry]
+
+
+class FastSerializer:
+    """
+    Сериализатор схемы ответа: сгенерированная функция + orjson,
+    Pydantic - для объектов, не соответствующих схеме
+    """
+
+    def __init__(self, response_type: Any, build: Callable[[Any], Any]):
+        self.response_type = response_type
+        self._build = build
+        self._adapter = TypeAdapter(response_type)
+
+    def __call__(self, content: Any) -> bytes:
+        try:
+            return orjson.dumps(self._build(content))
+        except (_Mismatch, AttributeError, KeyError, TypeError, orjson.JSONEncodeError):
+            return self._adapter.dump_json(self._adapter.validate_python(content, from_attributes=True))
+
+
+_serializers: Dict[Any, Optional[FastSerializer]] = {}
+_serializers_lock = threading.Lock()
+
+
+def fast_serializer(response_type: Any) -> Optional[FastSerializer]:
+    """
+    Скомпилированный сериализатор схемы ответа (List[...] или модель);
+    None - схема не поддерживается быстрым путём или он выключен
+    """
+    if not fast_json_enabled():
+        return None
+    try:
+        return _serializers[response_type]
+    except KeyError:
+        pass
+    with _serializers_lock:
+        if response_type not in _serializers:
+            compiler = _Compiler()
+            try:
+                entry = compiler._name("_serialize_")
+                expression = compiler.value(response_type, "obj")
+                compiler.sources.append(f"def {entry}(obj):\n    return {expression}\n")
+                _serializers[response_type] = FastSerializer(response_type, compiler.build(entry))
+            except (TypeError, KeyError) as e:
+                logger.debug(f"Быстрая сериализация недоступна для {response_type}: {e}")
+                _serializers[response_type] = None
+        return _serializers[response_type]
+
+
+class FastJSONResponse(InstrumentedJSONResponse):
+    """JSONResponse с рендером через orjson (для ответов без схемы)"""
+
+    def render(self, content: Any) -> bytes:
+        with measure_serialization():
+            return orjson.dumps(content)
+
+
+def _response_params(endpoint: Callable) -> Tuple[str, ...]:
+    """
+    Параметры endpoint'а типа Response (заголовки и статус, выставленные через них)
+    """
+    return tuple(
+        name for name, parameter in inspect.signature(endpoint).parameters.items()
+        if isinstance(parameter.annotation, type) and issubclass(parameter.annotation, Response)
+    )
+
+
+class FastJSONRoute(APIRoute):
+    """
+    Маршрут, ответ которого сериализуется сгенерированной функцией сразу в байты,
+    минуя проверку response_model и jsonable_encoder FastAPI.
+    Схема в OpenAPI остаётся прежней; при FAST_JSON_ENABLED=False - обычный APIRoute
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any):
+        response_model = kwargs.get("response_model")
+        if isinstance(response_model, DefaultPlaceholder):
+            response_model = None  # схема из аннотации возврата - обычный путь
+        plain = any(kwargs.get(option) for option in (
+            "response_model_include", "response_model_exclude", "response_model_exclude_unset",
+            "response_model_exclude_defaults", "response_model_exclude_none",
+        ))
+        serializer = fast_serializer(response_model) if response_model is not None and not plain else None
+        if serializer is not None:
+            endpoint = self._wrap(endpoint, serializer, kwargs.get("status_code"))
+        super().__init__(path, endpoint, **kwargs)
+
+    @staticmethod
+    def _wrap(endpoint: Callable, serializer: FastSerializer, status_code: Optional[int]) -> Callable:
+        response_params = _response_params(endpoint)
+
+        def respond(result: Any, kwargs: Dict[str, Any]) -> Any:
+            if isinstance(result, Response):
+                return result
+            with measure_serialization():
+                body = serializer(result)
+            response = Response(content=body, status_code=status_code or 200, media_type="application/json")
+            for name in response_params:
+                sub_response = kwargs.get(name)
+                if sub_response is None:
+                    continue
+                if sub_response.status_code:
+                    response.status_code = sub_response.status_code
+                for key, value in sub_response.headers.items():
+                    if key != "content-length":
+                        response.headers.append(key, value)
+            return response
+
+        # Синхронный endpoint остаётся синхронным: сериализация идёт в том же потоке пула
+        if asyncio.iscoroutinefunction(endpoint):
+            @functools.wraps(endpoint)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                return respond(await endpoint(*args, **kwargs), kwargs)
+            return async_wrapper
+
+        @functools.wraps(endpoint)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return respond(endpoint(*args, **kwargs), kwargs)
+        return wrapper
@@ -3,18 +3,32 @@
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from loguru import logger
 
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import async_engine, engine, get_pool_stats, init_db
+from app.core.instrumentation import InstrumentationMiddleware, InstrumentedJSONResponse, instrument_engine
+from app.core.serialization import FastJSONResponse, fast_json_enabled
 from app.api.v1.router import api_router
+from app.api.metrics import render_metrics
+from app.api.search_index import search_index
+from app.api.bootstrap import bootstrap_snapshot
+from app.api.static_publisher import static_publisher
+from app.api.revisions import revision_compactor
+from app.api.step_ordering import backfill_step_sort_keys
+from app.api.website_filters import backfill_technologies
+from app.api.workflow_graph import backfill_workflow_graph
+from app.api.settings_cache import settings_cache
 
 # Создаем приложение
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse if fast_json_enabled() else InstrumentedJSONResponse,
 )
 
 # Настраиваем CORS
@@ -24,8 +38,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "Server-Timing"],
 )
 
+# Сжатие ответов (внутри замера - в метриках размер тела после сжатия)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Замер запросов (внешний слой, чтобы учитывать и CORS)
+if settings.METRICS_ENABLED:
+    app.add_middleware(InstrumentationMiddleware)
+    instrument_engine(engine)
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine)
+
 # Подключаем роутеры
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
@@ -37,9 +63,27 @@ async def startup_event():
     """
     logger.info("Запуск приложения...")
     init_db()
+    settings_cache.load()
+    backfill_step_sort_keys()
+    backfill_technologies()
+    backfill_workflow_graph()
+    search_index.setup()
+    bootstrap_snapshot.load()
+    static_publisher.load()
+    revision_compactor.start()
     logger.info("Приложение запущено")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Освобождение ресурсов при остановке приложения
+    """
+    revision_compactor.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
 @app.get("/")
 async def root():
     """
@@ -58,3 +102,20 @@ async def health_check():
     Проверка здоровья приложения
     """
     return {"status": "ok"}
+
+
+@app.get("/health/db")
+async def db_health_check():
+    """
+    Состояние пула соединений БД и время ожидания соединения
+    """
+    return get_pool_stats()
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def metrics():
+        """
+        Метрики в формате Prometheus: запросы по маршрутам, SQL, пул, кеши
+        """
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -2,18 +2,25 @@
 Модели базы данных
 """
 from app.models.user import User
-from app.models.website import Website
+from app.models.website import Website, WebsiteTechnology
 from app.models.template import Template, WorkflowStep
 from app.models.page import PageContent
 from app.models.settings import Settings
-from app.models.workflow_schema import WorkflowSchema
+from app.models.workflow_schema import WorkflowSchema, WorkflowNode, WorkflowEdge
+from app.models.search import SearchDocument
+from app.models.revision import ContentRevision
 
 __all__ = [
     "User",
     "Website",
+    "WebsiteTechnology",
     "Template",
     "WorkflowStep",
     "PageContent",
     "Settings",
     "WorkflowSchema",
+    "WorkflowNode",
+    "WorkflowEdge",
+    "SearchDocument",
+    "ContentRevision",
 ]
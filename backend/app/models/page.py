@@ -1,7 +1,7 @@
 """
 Модель страницы контента
 """
-from sqlalchemy import Column, String, Integer, JSON
+from sqlalchemy import Column, String, Integer, JSON, Index
 from loguru import logger
 
 from app.core.base import BaseModel
@@ -12,12 +12,19 @@ class PageContent(BaseModel):
     Модель страницы с контентом
     """
     __tablename__ = "pages"
+    __table_args__ = (
+        # Стабильная сортировка и keyset-пагинация списка
+        Index("ix_pages_created_at_id", "created_at", "id"),
+    )
     
     page_id = Column(String, unique=True, index=True, nullable=False)  # home, about, custom, etc.
     name = Column(String, nullable=False)
     sections = Column(Integer, default=0)
     updated = Column(String, nullable=True)  # "2 часа назад", "только что", etc.
     content = Column(JSON, default=dict)  # Весь контент страницы в JSON
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Для оптимистичной блокировки
+    
+    __mapper_args__ = {"version_id_col": version}
     
     def __repr__(self):
         return f"<PageContent(page_id={self.page_id}, name={self.name})>"
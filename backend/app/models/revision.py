@@ -0,0 +1,28 @@
+"""
+Модель ревизий JSON контента (страницы, workflow схемы)
+"""
+from sqlalchemy import Column, String, Integer, JSON, Index
+
+from app.core.base import BaseModel
+
+
+class ContentRevision(BaseModel):
+    """
+    Ревизия документа записи на момент её версии: полный снимок (kind=snapshot)
+    или JSON Patch от предыдущей ревизии той же записи (kind=delta)
+    """
+    __tablename__ = "content_revisions"
+    __table_args__ = (
+        # Ревизии записи по версии: список, поиск ближайшего снимка и цепочки патчей
+        Index("ix_content_revisions_entity_version", "entity_type", "entity_id", "version", unique=True),
+    )
+    
+    entity_type = Column(String, nullable=False)  # page | workflow_schema
+    entity_id = Column(String, nullable=False)  # PageContent.id / WorkflowSchema.id
+    version = Column(Integer, nullable=False)  # Версия записи после сохранения
+    kind = Column(String, nullable=False)  # snapshot | delta
+    data = Column(JSON, nullable=True)  # Документ целиком либо список операций JSON Patch
+    size = Column(Integer, nullable=False, default=0)  # Размер data в JSON, байт
+    
+    def __repr__(self):
+        return f"<ContentRevision({self.entity_type}:{self.entity_id} v{self.version} {self.kind})>"
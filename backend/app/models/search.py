@@ -0,0 +1,28 @@
+"""
+Модель документа поискового индекса
+"""
+from sqlalchemy import Column, Integer, String, Text, UniqueConstraint
+
+from app.core.database import Base
+
+
+class SearchDocument(Base):
+    """
+    Плоский текст сущности для полнотекстового поиска.
+    Заполняется автоматически при записи сайтов, шаблонов и страниц;
+    сам индекс (FTS5 / tsvector) строится поверх этой таблицы бэкендом поиска
+    """
+    __tablename__ = "search_documents"
+    __table_args__ = (
+        UniqueConstraint("entity_type", "entity_id", name="uq_search_documents_entity"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)  # rowid для FTS5 external content
+    entity_type = Column(String, nullable=False)  # website | template | page
+    entity_id = Column(String, nullable=False)
+    ref = Column(String, nullable=True)  # page_id для страниц
+    title = Column(String, nullable=False, default="")
+    body = Column(Text, nullable=False, default="")
+    
+    def __repr__(self):
+        return f"<SearchDocument(entity_type={self.entity_type}, entity_id={self.entity_id})>"
@@ -1,7 +1,7 @@
 """
 Модель настроек сайта
 """
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, Integer
 from loguru import logger
 
 from app.core.base import BaseModel
@@ -22,6 +22,10 @@ class Settings(BaseModel):
     meta_title = Column(String, nullable=True)
     meta_description = Column(String, nullable=True)
     keywords = Column(String, nullable=True)
+    # Счётчик изменений: по нему процессы сверяют свой кеш настроек
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    
+    __mapper_args__ = {"version_id_col": version}
     
     def __repr__(self):
         return f"<Settings(site_name={self.site_name})>"
@@ -1,7 +1,9 @@
 """
 Модели шаблонов и workflow шагов
 """
-from sqlalchemy import Column, String, ForeignKey, JSON
+from typing import Optional
+
+from sqlalchemy import Column, String, ForeignKey, JSON, Index, event
 from sqlalchemy.orm import relationship
 from loguru import logger
 
@@ -13,38 +15,87 @@ class Template(BaseModel):
     Модель шаблона готового решения
     """
     __tablename__ = "templates"
+    __table_args__ = (
+        # Стабильная сортировка и keyset-пагинация списка
+        Index("ix_templates_created_at_id", "created_at", "id"),
+    )
     
     title = Column(String, nullable=False, index=True)
     description = Column(String, nullable=True)
     customizable = Column(JSON, default=list)  # Список настраиваемых параметров
     status = Column(String, default="active", index=True)  # active | inactive
     
-    # Связь с workflow шагами
+    # Связь с workflow шагами.
+    # selectin: шаги всех шаблонов выборки подгружаются одним IN-запросом,
+    # а не отдельным SELECT на каждый шаблон (N+1); порядок - по числовому ключу позиции
     workflow_steps = relationship(
         "WorkflowStep",
         back_populates="template",
         cascade="all, delete-orphan",
-        order_by="WorkflowStep.position"
+        order_by="[WorkflowStep.sort_key, WorkflowStep.id]",
+        lazy="selectin"
     )
     
     def __repr__(self):
         return f"<Template(title={self.title}, status={self.status})>"
 
 
+# Ширина сегмента ключа сортировки: номера в позиции до 999999
+SORT_KEY_WIDTH = 6
+
+
+def position_sort_key(position: Optional[str]) -> Optional[str]:
+    """
+    Ключ сортировки позиции шага: сегменты дополняются нулями до одной ширины,
+    поэтому строковый порядок ключей совпадает с числовым порядком позиций
+    ("2" -> "000002", "2.1" -> "000002.000001", "10" -> "000010").
+    Родитель идёт перед потомками, нечисловые сегменты - после числовых
+    """
+    if position is None:
+        return None
+    segments = []
+    for segment in str(position).split("."):
+        segment = segment.strip()
+        # isdigit() верен и для "²", "٣" - int() их не разберёт; числа только из 0-9
+        if segment.isascii() and segment.isdecimal():
+            segments.append(str(int(segment)).zfill(SORT_KEY_WIDTH))
+        elif not segment:
+            segments.append("0" * SORT_KEY_WIDTH)
+        else:
+            segments.append(f"~{segment}")
+    return ".".join(segments)
+
+
+def _default_sort_key(context) -> Optional[str]:
+    # Для INSERT мимо ORM (массовый импорт): ключ из позиции той же строки
+    return position_sort_key(context.get_current_parameters().get("position"))
+
+
 class WorkflowStep(BaseModel):
     """
     Модель шага workflow для шаблона
     """
     __tablename__ = "workflow_steps"
+    __table_args__ = (
+        # Шаги шаблона в порядке позиций и выборка поддерева диапазоном ключей
+        Index("ix_workflow_steps_template_sort_key", "template_id", "sort_key", "id"),
+    )
     
     template_id = Column(String, ForeignKey("templates.id", ondelete="CASCADE"), nullable=False, index=True)
     label = Column(String, nullable=False)
     type = Column(String, nullable=False)  # trigger | process | api | notification | complete
     description = Column(String, nullable=True)
     position = Column(String, nullable=False)  # Позиция: "1", "2", "2.1", "2.2", "3", "4.1" и т.д.
+    # Производный ключ сортировки из position (см. position_sort_key); обновляется при записи
+    sort_key = Column(String, nullable=True, default=_default_sort_key)
     
     # Связь с шаблоном
     template = relationship("Template", back_populates="workflow_steps")
     
     def __repr__(self):
         return f"<WorkflowStep(label={self.label}, type={self.type}, position={self.position})>"
+
+
+@event.listens_for(WorkflowStep.position, "set")
+def _update_sort_key(target: WorkflowStep, value, oldvalue, initiator) -> None:
+    target.sort_key = position_sort_key(value)
@@ -1,10 +1,11 @@
 """
 Модель веб-сайта (портфолио)
 """
-from sqlalchemy import Column, String, Boolean, JSON
+from sqlalchemy import Column, String, Boolean, JSON, ForeignKey, Index
 from loguru import logger
 
 from app.core.base import BaseModel
+from app.core.database import Base
 
 
 class Website(BaseModel):
@@ -12,16 +13,40 @@ class Website(BaseModel):
     Модель веб-сайта для портфолио
     """
     __tablename__ = "websites"
+    __table_args__ = (
+        # Стабильная сортировка и keyset-пагинация списка
+        Index("ix_websites_created_at_id", "created_at", "id"),
+    )
     
     name = Column(String, nullable=False, index=True)
-    client = Column(String, nullable=True)
+    client = Column(String, nullable=True, index=True)
     description = Column(String, nullable=True)
     url = Column(String, nullable=True)
     screenshot = Column(String, nullable=True)
     technologies = Column(JSON, default=list)  # Список технологий
     category = Column(String, nullable=True, index=True)
-    date = Column(String, nullable=True)  # Формат: "YYYY-MM"
+    date = Column(String, nullable=True, index=True)  # Формат: "YYYY-MM"
     featured = Column(Boolean, default=False, index=True)
     
     def __repr__(self):
         return f"<Website(name={self.name}, client={self.client})>"
+
+
+class WebsiteTechnology(Base):
+    """
+    Нормализованный индекс технологий сайта для фильтрации и фасетов.
+    Заполняется автоматически из Website.technologies при записи сайтов
+    """
+    __tablename__ = "website_technologies"
+    __table_args__ = (
+        # Поиск сайтов по технологии и подсчёт фасетов без сканирования JSON;
+        # name в индексе - фасет строится только по индексу
+        Index("ix_website_technologies_key_website", "key", "website_id", "name"),
+    )
+    
+    website_id = Column(String, ForeignKey("websites.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String, primary_key=True)  # Название в нижнем регистре
+    name = Column(String, nullable=False)  # Название как в Website.technologies
+    
+    def __repr__(self):
+        return f"<WebsiteTechnology(website_id={self.website_id}, key={self.key})>"
@@ -1,11 +1,12 @@
 """
 Модель workflow схемы (для визуального редактора)
 """
-from sqlalchemy import Column, String, JSON, ForeignKey
+from sqlalchemy import Column, String, JSON, ForeignKey, Index, Integer
 from sqlalchemy.orm import relationship
 from loguru import logger
 
 from app.core.base import BaseModel
+from app.core.database import Base
 
 
 class WorkflowSchema(BaseModel):
@@ -14,9 +15,55 @@ class WorkflowSchema(BaseModel):
     Связана с шаблоном через template_id
     """
     __tablename__ = "workflow_schemas"
+    __table_args__ = (
+        # Стабильная сортировка и keyset-пагинация списка
+        Index("ix_workflow_schemas_created_at_id", "created_at", "id"),
+    )
     
     template_id = Column(String, ForeignKey("templates.id", ondelete="CASCADE"), unique=True, nullable=False, index=True)
     nodes = Column(JSON, default=list)  # Массив узлов для визуального редактора
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Для оптимистичной блокировки
+    
+    __mapper_args__ = {"version_id_col": version}
     
     def __repr__(self):
         return f"<WorkflowSchema(template_id={self.template_id})>"
+
+
+class WorkflowNode(Base):
+    """
+    Нормализованный индекс узлов workflow схемы: тип и подпись каждого узла.
+    Заполняется автоматически из WorkflowSchema.nodes при записи схем
+    """
+    __tablename__ = "workflow_nodes"
+    __table_args__ = (
+        # Подсчёт узлов по типам и поиск схем с узлом данного типа только по индексу
+        Index("ix_workflow_nodes_type_schema", "type", "schema_id"),
+    )
+    
+    schema_id = Column(String, ForeignKey("workflow_schemas.id", ondelete="CASCADE"), primary_key=True)
+    node_id = Column(String, primary_key=True)  # id узла внутри схемы
+    type = Column(String, nullable=True)
+    label = Column(String, nullable=True)
+    
+    def __repr__(self):
+        return f"<WorkflowNode(schema_id={self.schema_id}, node_id={self.node_id})>"
+
+
+class WorkflowEdge(Base):
+    """
+    Нормализованный индекс связей между узлами workflow схемы (connections узлов).
+    Заполняется автоматически из WorkflowSchema.nodes при записи схем
+    """
+    __tablename__ = "workflow_edges"
+    __table_args__ = (
+        # Входящие связи узла; исходящие - по первичному ключу
+        Index("ix_workflow_edges_schema_target", "schema_id", "target", "source"),
+    )
+    
+    schema_id = Column(String, ForeignKey("workflow_schemas.id", ondelete="CASCADE"), primary_key=True)
+    source = Column(String, primary_key=True)
+    target = Column(String, primary_key=True)
+    
+    def __repr__(self):
+        return f"<WorkflowEdge(schema_id={self.schema_id}, {self.source} -> {self.target})>"
@@ -2,11 +2,17 @@
 Pydantic схемы для валидации данных
 """
 from app.schemas.user import UserCreate, UserResponse, Token, LoginRequest
-from app.schemas.website import WebsiteCreate, WebsiteUpdate, WebsiteResponse
-from app.schemas.template import TemplateCreate, TemplateUpdate, TemplateResponse, WorkflowStepCreate, WorkflowStepResponse
+from app.schemas.website import WebsiteCreate, WebsiteUpdate, WebsiteResponse, FacetBucket, WebsiteFacets, WebsiteListResponse
+from app.schemas.template import TemplateCreate, TemplateUpdate, TemplateResponse, WorkflowStepCreate, WorkflowStepUpdate, WorkflowStepResponse
 from app.schemas.page import PageContentCreate, PageContentUpdate, PageContentResponse
 from app.schemas.settings import SettingsCreate, SettingsUpdate, SettingsResponse
-from app.schemas.workflow_schema import WorkflowSchemaCreate, WorkflowSchemaUpdate, WorkflowSchemaResponse
+from app.schemas.workflow_schema import WorkflowSchemaCreate, WorkflowSchemaUpdate, WorkflowSchemaResponse, WorkflowIssue, WorkflowSchemaAnalysis, WorkflowSchemaSaveResponse, WorkflowNodeTypeCount, WorkflowNodeTemplate, WorkflowNodeRef, WorkflowNodeNeighbors
+from app.schemas.json_patch import JsonPatchOperation, JsonPatchRequest
+from app.schemas.bulk import BulkImportRequest, BulkImportResponse, BulkItemResult
+from app.schemas.search import SearchHit, SearchResponse
+from app.schemas.bootstrap import BootstrapResponse
+from app.schemas.changes import ChangeEvent, ChangesResponse
+from app.schemas.revision import RevisionInfo, RevisionResponse
 
 __all__ = [
     "UserCreate",
@@ -16,10 +22,14 @@ __all__ = [
     "WebsiteCreate",
     "WebsiteUpdate",
     "WebsiteResponse",
+    "FacetBucket",
+    "WebsiteFacets",
+    "WebsiteListResponse",
     "TemplateCreate",
     "TemplateUpdate",
     "TemplateResponse",
     "WorkflowStepCreate",
+    "WorkflowStepUpdate",
     "WorkflowStepResponse",
     "PageContentCreate",
     "PageContentUpdate",
@@ -30,4 +40,23 @@ __all__ = [
     "WorkflowSchemaCreate",
     "WorkflowSchemaUpdate",
     "WorkflowSchemaResponse",
+    "WorkflowIssue",
+    "WorkflowSchemaAnalysis",
+    "WorkflowSchemaSaveResponse",
+    "WorkflowNodeTypeCount",
+    "WorkflowNodeTemplate",
+    "WorkflowNodeRef",
+    "WorkflowNodeNeighbors",
+    "JsonPatchOperation",
+    "JsonPatchRequest",
+    "BulkImportRequest",
+    "BulkImportResponse",
+    "BulkItemResult",
+    "SearchHit",
+    "SearchResponse",
+    "BootstrapResponse",
+    "ChangeEvent",
+    "ChangesResponse",
+    "RevisionInfo",
+    "RevisionResponse",
 ]
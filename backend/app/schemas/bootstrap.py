@@ -0,0 +1,23 @@
+"""
+Схема первичной загрузки публичной части сайта
+"""
+from typing import Any, Dict, List
+
+from pydantic import BaseModel, Field
+
+from app.schemas.page import PageContentResponse
+from app.schemas.settings import SettingsResponse
+from app.schemas.template import TemplateResponse
+from app.schemas.website import WebsiteResponse
+
+
+class BootstrapResponse(BaseModel):
+    """Всё, что нужно посетителю при первой загрузке, одним ответом"""
+    version: int = Field(..., description="Версия снимка, растёт при каждом изменении данных")
+    settings: SettingsResponse
+    pages: List[PageContentResponse]
+    websites: List[WebsiteResponse]
+    templates: List[TemplateResponse]
+    workflow_schemas: Dict[str, List[Dict[str, Any]]] = Field(
+        ..., description="Узлы workflow схем по ID шаблона (для шаблонов из templates)"
+    )
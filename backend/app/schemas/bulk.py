@@ -0,0 +1,52 @@
+"""
+Схемы для массового импорта контента
+"""
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.schemas.settings import SettingsUpdate
+from app.schemas.template import TemplateCreate
+
+
+class BulkTemplateCreate(TemplateCreate):
+    """Шаблон в составе импорта"""
+    id: Optional[str] = Field(None, description="Исходный ID шаблона (для привязки workflow схем)")
+
+
+class BulkWorkflowSchemaCreate(BaseModel):
+    """Workflow схема в составе импорта"""
+    template_id: str = Field(..., description="Исходный ID шаблона из импорта или ID существующего шаблона", min_length=1)
+    nodes: List[Dict[str, Any]] = Field(default_factory=list, description="Массив узлов для визуального редактора")
+
+
+class BulkImportRequest(BaseModel):
+    """
+    Схема запроса массового импорта.
+    Элементы списков валидируются по одному; ошибка любого элемента отменяет весь импорт
+    """
+    settings: Optional[SettingsUpdate] = Field(None, description="Настройки сайта")
+    websites: List[Dict[str, Any]] = Field(default_factory=list, description="Веб-сайты (WebsiteCreate)")
+    templates: List[Dict[str, Any]] = Field(default_factory=list, description="Шаблоны (TemplateCreate + исходный id)")
+    pages: List[Dict[str, Any]] = Field(default_factory=list, description="Страницы (PageContentCreate)")
+    workflow_schemas: List[Dict[str, Any]] = Field(default_factory=list, description="Workflow схемы")
+    upsert: bool = Field(default=True, description="Обновлять существующие страницы и схемы вместо ошибки")
+
+
+class BulkItemResult(BaseModel):
+    """Результат импорта одного элемента"""
+    index: int = Field(..., description="Индекс элемента в запросе")
+    status: str = Field(..., description="created | updated | error")
+    id: Optional[str] = Field(None, description="ID записи в БД")
+    source_id: Optional[str] = Field(None, description="Исходный ID (для шаблонов)")
+    error: Optional[str] = Field(None, description="Текст ошибки")
+
+
+class BulkImportResponse(BaseModel):
+    """Схема ответа массового импорта"""
+    settings: Optional[BulkItemResult] = None
+    websites: List[BulkItemResult] = Field(default_factory=list)
+    templates: List[BulkItemResult] = Field(default_factory=list)
+    pages: List[BulkItemResult] = Field(default_factory=list)
+    workflow_schemas: List[BulkItemResult] = Field(default_factory=list)
+    template_id_map: Dict[str, str] = Field(default_factory=dict, description="Исходный ID шаблона -> новый ID")
@@ -0,0 +1,24 @@
+"""
+Схемы ленты изменений контента
+"""
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+ChangeEntityType = Literal["website", "template", "page", "settings", "workflow_schema"]
+
+
+class ChangeEvent(BaseModel):
+    """Изменение записи"""
+    event_id: str = Field(..., description="id события для продолжения (after / Last-Event-ID)")
+    type: ChangeEntityType
+    id: str = Field(..., description="id записи в пути API: page_id страницы, template_id схемы")
+    action: Literal["created", "updated", "deleted"]
+    version: Optional[int] = Field(None, description="Версия записи (страницы, настройки, схемы)")
+
+
+class ChangesResponse(BaseModel):
+    """События после указанного id"""
+    last_id: str = Field(..., description="id последнего события - after для следующего запроса")
+    reset: bool = Field(..., description="Пропущенные события недоступны: перечитать данные целиком")
+    changes: List[ChangeEvent]
@@ -0,0 +1,26 @@
+"""
+Схемы для JSON Patch (RFC 6902)
+"""
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class JsonPatchOperation(BaseModel):
+    """Операция JSON Patch"""
+    op: Literal["add", "remove", "replace", "move", "copy", "test"] = Field(..., description="Операция")
+    path: str = Field(..., description="JSON Pointer изменяемого значения")
+    value: Any = Field(None, description="Значение для add, replace и test")
+    from_: Optional[str] = Field(None, alias="from", description="JSON Pointer источника для move и copy")
+
+    model_config = {"populate_by_name": True}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Операция в виде словаря RFC 6902 (только переданные поля)"""
+        return self.model_dump(by_alias=True, exclude_unset=True)
+
+
+class JsonPatchRequest(BaseModel):
+    """Запрос частичного обновления JSON-документа"""
+    version: Optional[int] = Field(None, description="Ожидаемая версия записи; при расхождении - 409")
+    operations: List[JsonPatchOperation] = Field(..., description="Операции JSON Patch")
@@ -33,6 +33,7 @@ class PageContentResponse(BaseModel):
     sections: int
     updated: Optional[str]
     content: Dict[str, Any]
+    version: int
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,24 @@
+"""
+Схемы истории ревизий страниц и workflow схем
+"""
+from datetime import datetime
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+
+class RevisionInfo(BaseModel):
+    """Ревизия в списке истории"""
+    version: int = Field(..., description="Версия записи после сохранения")
+    kind: Literal["snapshot", "delta"] = Field(..., description="Полный снимок или JSON Patch от предыдущей")
+    size: int = Field(..., description="Размер хранимых данных, байт")
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class RevisionResponse(BaseModel):
+    """Документ записи в версии ревизии"""
+    version: int
+    created_at: datetime
+    data: Any = Field(..., description="content страницы или nodes схемы")
@@ -0,0 +1,25 @@
+"""
+Схемы полнотекстового поиска
+"""
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+SearchEntityType = Literal["website", "template", "page"]
+
+
+class SearchHit(BaseModel):
+    """Найденная сущность"""
+    type: SearchEntityType = Field(..., description="Тип сущности")
+    id: str = Field(..., description="ID сущности")
+    page_id: Optional[str] = Field(None, description="page_id для страниц")
+    title: str = Field(..., description="Название")
+    snippet: str = Field(..., description="Фрагмент текста (HTML: текст экранирован, совпадения в <mark>)")
+    rank: float = Field(..., description="Релевантность (больше - выше)")
+
+
+class SearchResponse(BaseModel):
+    """Схема ответа поиска"""
+    query: str
+    total: int = Field(..., description="Всего совпадений")
+    items: List[SearchHit]
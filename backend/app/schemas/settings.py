@@ -45,6 +45,7 @@ class SettingsResponse(BaseModel):
     meta_title: Optional[str]
     meta_description: Optional[str]
     keywords: Optional[str]
+    version: int
     created_at: datetime
     updated_at: datetime
 
@@ -6,6 +6,8 @@ from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
+from app.schemas.json_patch import JsonPatchOperation
+
 
 class WorkflowStepCreate(BaseModel):
     """Схема создания workflow шага"""
@@ -15,6 +17,11 @@ class WorkflowStepCreate(BaseModel):
     position: str = Field(..., description="Позиция шага: 1, 2, 2.1, 2.2, etc.")
 
 
+class WorkflowStepUpdate(WorkflowStepCreate):
+    """Схема workflow шага при обновлении шаблона"""
+    id: Optional[str] = Field(None, description="ID существующего шага; без него шаг сопоставляется по позиции")
+
+
 class WorkflowStepResponse(BaseModel):
     """Схема ответа с данными workflow шага"""
     id: str
@@ -44,7 +51,10 @@ class TemplateUpdate(BaseModel):
     description: Optional[str] = Field(None, description="Описание шаблона")
     customizable: Optional[List[str]] = Field(None, description="Список настраиваемых параметров")
     status: Optional[str] = Field(None, description="Статус: active или inactive")
-    workflow: Optional[List[WorkflowStepCreate]] = Field(None, description="Список workflow шагов")
+    workflow: Optional[List[WorkflowStepUpdate]] = Field(None, description="Список workflow шагов")
+    workflow_patch: Optional[List[JsonPatchOperation]] = Field(
+        None, description="JSON Patch над списком шагов (вместо полного workflow)"
+    )
 
 
 class TemplateResponse(BaseModel):
@@ -49,3 +49,24 @@ class WebsiteResponse(BaseModel):
     updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class FacetBucket(BaseModel):
+    """Значение фасета и число сайтов с ним"""
+    value: str
+    count: int
+
+
+class WebsiteFacets(BaseModel):
+    """Фасеты списка сайтов"""
+    categories: List[FacetBucket]
+    technologies: List[FacetBucket]
+    clients: List[FacetBucket]
+    years: List[FacetBucket]
+
+
+class WebsiteListResponse(BaseModel):
+    """Схема ответа со страницей отфильтрованных сайтов и фасетами"""
+    total: int = Field(..., description="Всего сайтов по фильтрам")
+    items: List[WebsiteResponse]
+    facets: WebsiteFacets
@@ -2,7 +2,7 @@
 Схемы для workflow схем (визуальный редактор)
 """
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -24,7 +24,63 @@ class WorkflowSchemaResponse(BaseModel):
     id: str
     template_id: str
     nodes: List[Dict[str, Any]]
+    version: int
     created_at: datetime
     updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class WorkflowIssue(BaseModel):
+    """Проблема графа схемы"""
+    code: str = Field(..., description="missing_id, duplicate_id, dangling_edge, cycle, no_trigger, no_complete, unreachable, dead_end")
+    severity: Literal["error", "warning"]
+    message: str
+    nodes: List[str] = Field(..., description="Узлы (для dangling_edge - связи source->target)")
+
+
+class WorkflowSchemaAnalysis(BaseModel):
+    """Результат анализа графа схемы"""
+    valid: bool = Field(..., description="Нет ошибок (предупреждения допускаются)")
+    node_count: int
+    edge_count: int
+    issues: List[WorkflowIssue]
+    cycles: List[List[str]] = Field(..., description="Узлы каждого цикла (компоненты сильной связности)")
+    triggers: List[str]
+    completes: List[str]
+    unreachable: List[str] = Field(..., description="Узлы, недостижимые от триггеров")
+    dead_ends: List[str] = Field(..., description="Достижимые узлы, из которых не достижимо завершение")
+    topological_order: Optional[List[str]] = Field(None, description="null - в графе есть цикл")
+
+
+class WorkflowSchemaSaveResponse(WorkflowSchemaResponse):
+    """Схема ответа на сохранение workflow схемы: данные схемы и анализ её графа"""
+    analysis: WorkflowSchemaAnalysis
+
+
+class WorkflowNodeTypeCount(BaseModel):
+    """Число узлов данного типа и схем (шаблонов), где они встречаются"""
+    type: str
+    nodes: int
+    templates: int
+
+
+class WorkflowNodeTemplate(BaseModel):
+    """Шаблон, в схеме которого есть узлы данного типа"""
+    template_id: str
+    nodes: int = Field(..., description="Число узлов данного типа в схеме")
+
+
+class WorkflowNodeRef(BaseModel):
+    """Узел схемы"""
+    id: str
+    type: Optional[str] = None
+    label: Optional[str] = None
+    exists: bool = Field(True, description="False - связь ведёт к узлу, которого нет в схеме")
+
+
+class WorkflowNodeNeighbors(BaseModel):
+    """Узел схемы и его соседи по связям"""
+    node: WorkflowNodeRef
+    incoming: List[WorkflowNodeRef] = Field(..., description="Узлы со связью в данный")
+    outgoing: List[WorkflowNodeRef] = Field(..., description="Узлы, в которые ведут связи данного")
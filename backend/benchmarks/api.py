@@ -0,0 +1,736 @@
+"""
+Бенчмарк API: задержки, пропускная способность и число SQL-запросов по каждому endpoint.
+
+Наполняет временную SQLite базу заданными объёмами (веб-сайты, шаблоны с N шагами,
+страницы с большим JSON, workflow схемы с множеством узлов) и прогоняет все
+endpoints из app/api/v1 двумя способами:
+  inprocess - через ASGI транспорт без сети, последовательно; для каждого запроса
+              считаются SQL-запросы (события before_cursor_execute движка);
+  uvicorn   - через реальный uvicorn в отдельном процессе с --concurrency клиентами;
+              число SQL берётся из заголовка Server-Timing (METRICS_ENABLED).
+
+Результат (p50/p95/p99/mean, req/s, SQL и байт на запрос) пишется в JSON и может
+сравниваться с предыдущим прогоном как с базовой линией.
+
+Запуск (из каталога backend, нужен httpx):
+    python -m benchmarks.api --output baseline.json
+    python -m benchmarks.api --websites 2000 --steps 30 --page-kb 256 --schema-nodes 500 \\
+        --baseline baseline.json --output current.json --fail-threshold 20
+"""
+import argparse
+import asyncio
+import json
+import math
+import re
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import BACKEND_DIR, free_port, start_server, wait_ready
+
+API = "/api/v1"
+ADMIN_USERNAME = "bench-admin"
+ADMIN_PASSWORD = "bench-password"
+STEP_TYPES = ["trigger", "process", "api", "notification", "complete"]
+SERVER_TIMING_SQL = re.compile(r'db;dur=[0-9.]+;desc="(\d+) SQL"')
+
+
+@dataclass
+class Context:
+    """Данные, на которые ссылаются сценарии"""
+    headers: Dict[str, str]
+    websites: List[str]
+    templates: List[str]
+    pages: List[str]
+    schema_templates: List[str]
+    steps: int
+    schema_nodes: int
+    revisions: int
+    website_cursor: str = ""
+    changes_after: str = ""
+    tag: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+    targets: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Scenario:
+    """
+    Один endpoint: путь и тело строятся по номеру итерации.
+    prepare(n) заранее создаёт n записей для разрушающих сценариев (DELETE, POST схем)
+    или записи, которых нет в базовом наполнении (история ревизий);
+    setup(client, ctx) - подготовка через API перед прогоном (id события ленты изменений)
+    """
+    name: str
+    method: str
+    path: Callable[[Context, int], str]
+    body: Optional[Callable[[Context, int], Any]] = None
+    prepare: Optional[Callable[[Context, int], List[str]]] = None
+    setup: Optional[Callable[[httpx.AsyncClient, Context], Awaitable[None]]] = None
+    auth: bool = False
+    heavy: bool = False
+    expected: int = 200
+
+
+# ---------------------------------------------------------------- генерация данных
+
+def _website_row(i: int, tag: str) -> Dict[str, Any]:
+    return {
+        "id": str(uuid.uuid4()),
+        "name": f"Site {tag}-{i}",
+        "client": f"Client {i % 50}",
+        "description": "Корпоративный сайт с каталогом и личным кабинетом " * 4,
+        "url": f"https://site-{i}.example.com",
+        "technologies": ["React", "FastAPI", "PostgreSQL", "Docker"][: 1 + i % 4],
+        "category": ["web", "mobile", "automation", "ai"][i % 4],
+        "date": f"20{20 + i % 6}-{1 + i % 12:02d}",
+        "featured": i % 10 == 0,
+    }
+
+
+def _steps(count: int, label: str = "Шаг") -> List[Dict[str, Any]]:
+    return [
+        {
+            "label": f"{label} {j}",
+            "type": STEP_TYPES[0] if j == 1 else STEP_TYPES[-1] if j == count else STEP_TYPES[1 + j % 3],
+            "description": f"Описание шага {j}",
+            "position": str(j) if j % 5 else f"{j - 1}.1",
+        }
+        for j in range(1, count + 1)
+    ]
+
+
+def _page_content(kb: int) -> Dict[str, Any]:
+    text = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 18  # ~1 КБ
+    return {
+        "title": "Страница",
+        "sections": [
+            {"id": f"s{j}", "title": f"Секция {j}", "text": text, "items": [j, j + 1, j + 2]}
+            for j in range(max(1, kb))
+        ],
+    }
+
+
+def _schema_nodes(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": f"n{j}",
+            "label": f"Узел {j}",
+            "type": STEP_TYPES[0] if j == 0 else STEP_TYPES[-1] if j == count - 1 else STEP_TYPES[1 + j % 3],
+            "position": {"x": 120 * (j % 10), "y": 80 * (j // 10)},
+            "connections": [f"n{j + 1}"] if j < count - 1 else [],
+        }
+        for j in range(count)
+    ]
+
+
+class Seeder:
+    """
+    Прямая вставка данных через ORM bulk insert, минуя API
+    """
+
+    def __init__(self, page_kb: int, steps: int, schema_nodes: int):
+        from app.core.database import SessionLocal
+        from app.models.page import PageContent
+        from app.models.template import Template, WorkflowStep
+        from app.models.website import Website
+        from app.models.workflow_schema import WorkflowSchema
+
+        self.session_factory = SessionLocal
+        self.models = {
+            "website": Website, "template": Template, "step": WorkflowStep,
+            "page": PageContent, "schema": WorkflowSchema,
+        }
+        self.page_content = _page_content(page_kb)
+        self.steps = steps
+        self.schema_nodes = _schema_nodes(schema_nodes)
+
+    def _insert(self, model: str, rows: List[Dict[str, Any]]) -> None:
+        from sqlalchemy import insert
+
+        if not rows:
+            return
+        with self.session_factory() as session:
+            for start in range(0, len(rows), 1000):
+                session.execute(insert(self.models[model]), rows[start:start + 1000])
+            session.commit()
+
+    def websites(self, count: int, tag: str) -> List[str]:
+        rows = [_website_row(i, tag) for i in range(count)]
+        self._insert("website", rows)
+        return [row["id"] for row in rows]
+
+    def templates(self, count: int, tag: str) -> List[str]:
+        templates, steps = [], []
+        for i in range(count):
+            template_id = str(uuid.uuid4())
+            templates.append({
+                "id": template_id, "title": f"Template {tag}-{i}",
+                "description": "Автоматизация обработки заявок", "customizable": ["crm", "email"],
+                "status": "active",
+            })
+            steps.extend({**step, "template_id": template_id} for step in _steps(self.steps))
+        self._insert("template", templates)
+        self._insert("step", steps)
+        return [row["id"] for row in templates]
+
+    def pages(self, count: int, tag: str) -> List[str]:
+        rows = [
+            {"page_id": f"bench-{tag}-{i}", "name": f"Page {i}",
+             "sections": len(self.page_content["sections"]), "content": self.page_content}
+            for i in range(count)
+        ]
+        self._insert("page", rows)
+        return [row["page_id"] for row in rows]
+
+    def schemas(self, template_ids: List[str]) -> List[str]:
+        self._insert("schema", [
+            {"template_id": template_id, "nodes": self.schema_nodes} for template_id in template_ids
+        ])
+        return list(template_ids)
+
+    def _history(self, model: str, field: str, key: str, ids: List[str], revisions: int,
+                 document: Callable[[int], Any]) -> None:
+        """
+        Сохранить записи через ORM revisions - 1 раз: история ревизий пишется в after_flush
+        """
+        import app.api.revisions  # noqa: F401 - обработчик after_flush, пишущий ревизии
+
+        Model = self.models[model]
+        with self.session_factory() as session:
+            for version in range(2, revisions + 1):
+                for obj in session.query(Model).filter(getattr(Model, key).in_(ids)):
+                    setattr(obj, field, document(version))
+                session.commit()
+
+    def page_history(self, count: int, revisions: int, tag: str) -> List[str]:
+        """
+        Страницы с revisions ревизиями content (в каждой меняется заголовок одной секции)
+        """
+        page_ids = self.pages(count, tag)
+        sections = self.page_content["sections"]
+        self._history("page", "content", "page_id", page_ids, revisions, lambda version: {
+            **self.page_content,
+            "sections": [{**sections[0], "title": f"Секция v{version}"}] + sections[1:],
+        })
+        return page_ids
+
+    def schema_history(self, count: int, revisions: int, tag: str) -> List[str]:
+        """
+        Шаблоны со схемами, у которых revisions ревизий nodes (меняется подпись одного узла)
+        """
+        template_ids = self.schemas(self.templates(count, tag))
+        nodes = self.schema_nodes
+        self._history("schema", "nodes", "template_id", template_ids, revisions, lambda version: [
+            {**nodes[version % len(nodes)], "label": f"v{version}"} if j == version % len(nodes) else node
+            for j, node in enumerate(nodes)
+        ])
+        return template_ids
+
+    def middle_cursor(self) -> str:
+        """
+        Курсор keyset-пагинации на середину списка веб-сайтов
+        """
+        from app.api.pagination import encode_cursor
+
+        Website = self.models["website"]
+        with self.session_factory() as session:
+            total = session.query(Website).count()
+            row = session.query(Website.created_at, Website.id).order_by(
+                Website.created_at, Website.id
+            ).offset(total // 2).first()
+        return encode_cursor(*row) if row else ""
+
+    def admin(self) -> None:
+        from app.core.security import get_password_hash
+        from app.models.user import User
+
+        with self.session_factory() as session:
+            session.add(User(
+                username=ADMIN_USERNAME, email="bench-admin@example.com",
+                hashed_password=get_password_hash(ADMIN_PASSWORD), is_admin=True,
+            ))
+            session.commit()
+
+
+def seed(args: argparse.Namespace) -> "tuple[Seeder, Context]":
+    """
+    Создать схему БД и наполнить её объёмами из аргументов
+    """
+    from app.core.database import init_db
+    from app.core.security import create_access_token
+
+    seeder = Seeder(args.page_kb, args.steps, args.schema_nodes)  # импорт моделей до create_all
+    init_db()
+    seeder.admin()
+    ctx = Context(
+        headers={"Authorization": "Bearer " + create_access_token({"sub": ADMIN_USERNAME, "is_admin": True})},
+        websites=[], templates=[], pages=[], schema_templates=[],
+        steps=args.steps, schema_nodes=args.schema_nodes, revisions=args.revisions,
+    )
+    started = time.perf_counter()
+    ctx.websites = seeder.websites(args.websites, "seed")
+    ctx.templates = seeder.templates(args.templates, "seed")
+    ctx.pages = seeder.pages(args.pages, "seed")
+    ctx.schema_templates = seeder.schemas(ctx.templates[: args.schemas])
+    ctx.website_cursor = seeder.middle_cursor()
+    print(f"Наполнение БД: {time.perf_counter() - started:.1f} с")
+    return seeder, ctx
+
+
+# ---------------------------------------------------------------- сценарии
+
+def _pick(items: List[str], i: int) -> str:
+    return items[i % len(items)]
+
+
+# Записей с историей ревизий для сценариев revisions
+HISTORY_ENTITIES = 5
+# Событий ленты изменений, которые возвращает каждый опрос GET /changes?after
+CHANGES_BACKLOG = 50
+
+
+async def _changes_after(client: httpx.AsyncClient, ctx: Context) -> None:
+    """
+    id события ленты на CHANGES_BACKLOG раньше последнего (события дают предыдущие сценарии записи)
+    """
+    response = await client.get(API + "/changes")
+    epoch, _, number = response.json()["last_id"].partition(":")
+    ctx.changes_after = f"{epoch}:{max(int(number) - CHANGES_BACKLOG, 0)}"
+
+
+def scenarios(seeder: Seeder) -> List[Scenario]:
+    """
+    Все endpoints app/api/v1
+    """
+    def fresh_templates(ctx: Context, n: int) -> List[str]:
+        return seeder.templates(n, f"{ctx.tag}-t{time.monotonic_ns()}")
+
+    def page_history(ctx: Context, n: int) -> List[str]:
+        return seeder.page_history(HISTORY_ENTITIES, ctx.revisions, f"{ctx.tag}-h{time.monotonic_ns()}")
+
+    def schema_history(ctx: Context, n: int) -> List[str]:
+        return seeder.schema_history(HISTORY_ENTITIES, ctx.revisions, f"{ctx.tag}-h{time.monotonic_ns()}")
+
+    return [
+        # auth
+        Scenario("POST /auth/register", "POST", lambda c, i: "/auth/register", heavy=True, expected=201,
+                 body=lambda c, i: {"username": f"u-{c.tag}-{i}", "email": f"u-{c.tag}-{i}@example.com",
+                                    "password": "bench-password"}),
+        Scenario("POST /auth/login", "POST", lambda c, i: "/auth/login", heavy=True,
+                 body=lambda c, i: {"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD}),
+        Scenario("GET /auth/me", "GET", lambda c, i: "/auth/me", auth=True),
+        Scenario("GET /auth/cache-stats", "GET", lambda c, i: "/auth/cache-stats", auth=True),
+        Scenario("GET /auth/hashing-stats", "GET", lambda c, i: "/auth/hashing-stats", auth=True),
+        # websites
+        Scenario("GET /websites", "GET", lambda c, i: "/websites?limit=100"),
+        Scenario("GET /websites?featured", "GET", lambda c, i: "/websites?limit=100&featured=true"),
+        Scenario("GET /websites?cursor", "GET", lambda c, i: f"/websites?limit=100&cursor={c.website_cursor}"),
+        Scenario("GET /websites?technology", "GET",
+                 lambda c, i: "/websites?limit=100&technology=docker&technology=postgresql&technology_match=all"),
+        Scenario("GET /websites/browse", "GET", lambda c, i: "/websites/browse"),
+        Scenario("GET /websites/browse?filters", "GET",
+                 lambda c, i: "/websites/browse?category=web&category=ai&technology=react&date_from=2022&date_to=2024-06"),
+        Scenario("GET /websites/{id}", "GET", lambda c, i: f"/websites/{_pick(c.websites, i)}"),
+        Scenario("POST /websites", "POST", lambda c, i: "/websites", auth=True, expected=201,
+                 body=lambda c, i: {k: v for k, v in _website_row(i, c.tag).items() if k != "id"}),
+        Scenario("PUT /websites/{id}", "PUT", lambda c, i: f"/websites/{_pick(c.websites, i)}", auth=True,
+                 body=lambda c, i: {"description": f"Обновлено {c.tag}-{i}", "featured": bool(i % 2)}),
+        Scenario("DELETE /websites/{id}", "DELETE", lambda c, i: f"/websites/{c.targets[i]}", auth=True,
+                 expected=204, prepare=lambda c, n: seeder.websites(n, f"{c.tag}-del")),
+        # templates
+        Scenario("GET /templates", "GET", lambda c, i: "/templates?limit=100"),
+        Scenario("GET /templates/{id}", "GET", lambda c, i: f"/templates/{_pick(c.templates, i)}"),
+        Scenario("GET /templates/{id}/steps?under", "GET",
+                 lambda c, i: f"/templates/{_pick(c.templates, i)}/steps?under={1 + i % max(c.steps // 2, 1)}&include_self=true"),
+        Scenario("POST /templates", "POST", lambda c, i: "/templates", auth=True, expected=201,
+                 body=lambda c, i: {"title": f"Template {c.tag}-{i}", "workflow": _steps(c.steps)}),
+        Scenario("PUT /templates/{id}", "PUT", lambda c, i: f"/templates/{_pick(c.templates, i)}", auth=True,
+                 body=lambda c, i: {"description": f"Обновлено {i}", "workflow": _steps(c.steps, f"Шаг v{i}")}),
+        Scenario("DELETE /templates/{id}", "DELETE", lambda c, i: f"/templates/{c.targets[i]}", auth=True,
+                 expected=204, prepare=fresh_templates),
+        # pages
+        Scenario("GET /pages", "GET", lambda c, i: "/pages?limit=100"),
+        Scenario("GET /pages/{page_id}", "GET", lambda c, i: f"/pages/{_pick(c.pages, i)}"),
+        Scenario("POST /pages", "POST", lambda c, i: "/pages", auth=True, expected=201,
+                 body=lambda c, i: {"page_id": f"new-{c.tag}-{i}", "name": f"Page {i}",
+                                    "content": seeder.page_content}),
+        Scenario("PUT /pages/{page_id}", "PUT", lambda c, i: f"/pages/{_pick(c.pages, i)}", auth=True,
+                 body=lambda c, i: {"name": f"Page v{i}", "content": {**seeder.page_content, "title": f"v{i}"}}),
+        Scenario("PATCH /pages/{page_id}", "PATCH", lambda c, i: f"/pages/{_pick(c.pages, i)}", auth=True,
+                 body=lambda c, i: {"operations": [{"op": "replace", "path": "/title", "value": f"p{i}"}]}),
+        Scenario("DELETE /pages/{page_id}", "DELETE", lambda c, i: f"/pages/{c.targets[i]}", auth=True,
+                 expected=204, prepare=lambda c, n: seeder.pages(n, f"{c.tag}-del{time.monotonic_ns()}")),
+        # история ревизий
+        Scenario("GET /pages/{page_id}/revisions", "GET", lambda c, i: f"/pages/{_pick(c.targets, i)}/revisions",
+                 auth=True, prepare=page_history),
+        Scenario("GET /pages/{page_id}/revisions/{version}", "GET",
+                 lambda c, i: f"/pages/{_pick(c.targets, i)}/revisions/{1 + i % c.revisions}",
+                 auth=True, prepare=page_history),
+        Scenario("POST /pages/{page_id}/revisions/{version}/rollback", "POST",
+                 lambda c, i: f"/pages/{_pick(c.targets, i)}/revisions/{1 + i % c.revisions}/rollback",
+                 auth=True, prepare=page_history),
+        Scenario("GET /workflow-schemas/template/{id}/revisions/{version}", "GET",
+                 lambda c, i: f"/workflow-schemas/template/{_pick(c.targets, i)}/revisions/{1 + i % c.revisions}",
+                 auth=True, prepare=schema_history),
+        # bootstrap
+        Scenario("GET /bootstrap", "GET", lambda c, i: "/bootstrap"),
+        # поиск
+        Scenario("GET /search", "GET", lambda c, i: "/search?q=корпоративный%20каталог"),
+        Scenario("GET /search?type", "GET", lambda c, i: f"/search?q=описание%20шага%20{1 + i % c.steps}&type=template"),
+        Scenario("GET /search?prefix", "GET", lambda c, i: "/search?q=lo&limit=100"),
+        # лента изменений (опрос; поток SSE - долгое соединение, а не запрос-ответ)
+        Scenario("GET /changes", "GET", lambda c, i: "/changes"),
+        Scenario("GET /changes?after", "GET", lambda c, i: f"/changes?after={c.changes_after}",
+                 setup=_changes_after),
+        # settings
+        Scenario("GET /settings", "GET", lambda c, i: "/settings"),
+        Scenario("PUT /settings", "PUT", lambda c, i: "/settings", auth=True,
+                 body=lambda c, i: {"meta_description": f"Описание {i}"}),
+        # workflow schemas
+        Scenario("GET /workflow-schemas", "GET", lambda c, i: "/workflow-schemas?limit=100"),
+        Scenario("GET /workflow-schemas/template/{id}", "GET",
+                 lambda c, i: f"/workflow-schemas/template/{_pick(c.schema_templates, i)}"),
+        Scenario("GET /workflow-schemas/template/{id}/analysis", "GET",
+                 lambda c, i: f"/workflow-schemas/template/{_pick(c.schema_templates, i)}/analysis"),
+        Scenario("GET /workflow-schemas/node-types", "GET", lambda c, i: "/workflow-schemas/node-types"),
+        Scenario("GET /workflow-schemas/node-types/{type}/templates", "GET",
+                 lambda c, i: f"/workflow-schemas/node-types/{_pick(STEP_TYPES, i)}/templates"),
+        Scenario("GET /workflow-schemas/template/{id}/nodes/{node}/neighbors", "GET",
+                 lambda c, i: f"/workflow-schemas/template/{_pick(c.schema_templates, i)}/nodes/n{i % c.schema_nodes}/neighbors"),
+        Scenario("POST /workflow-schemas", "POST", lambda c, i: "/workflow-schemas", auth=True, expected=201,
+                 body=lambda c, i: {"template_id": c.targets[i], "nodes": seeder.schema_nodes},
+                 prepare=fresh_templates),
+        Scenario("PUT /workflow-schemas/template/{id}", "PUT",
+                 lambda c, i: f"/workflow-schemas/template/{_pick(c.schema_templates, i)}", auth=True,
+                 body=lambda c, i: {"nodes": [{**seeder.schema_nodes[0], "label": f"v{i}"}] + seeder.schema_nodes[1:]}),
+        Scenario("PATCH /workflow-schemas/template/{id}", "PATCH",
+                 lambda c, i: f"/workflow-schemas/template/{_pick(c.schema_templates, i)}", auth=True,
+                 body=lambda c, i: {"operations": [{"op": "replace", "path": "/0/label", "value": f"p{i}"}]}),
+        Scenario("DELETE /workflow-schemas/template/{id}", "DELETE",
+                 lambda c, i: f"/workflow-schemas/template/{c.targets[i]}", auth=True, expected=204,
+                 prepare=lambda c, n: seeder.schemas(fresh_templates(c, n))),
+        # bulk
+        Scenario("POST /bulk/import", "POST", lambda c, i: "/bulk/import", auth=True,
+                 body=lambda c, i: {
+                     "websites": [{k: v for k, v in _website_row(j, f"{c.tag}-b{i}").items() if k != "id"}
+                                  for j in range(10)],
+                     "pages": [{"page_id": f"bulk-{c.tag}-{i}", "name": "Bulk", "content": {"title": "b"}}],
+                 }),
+        Scenario("GET /bulk/export", "GET", lambda c, i: "/bulk/export?format=ndjson", auth=True, heavy=True),
+    ]
+
+
+# ---------------------------------------------------------------- измерение
+
+class QueryCounter:
+    """
+    Счётчик SQL-запросов движка приложения (только для inprocess)
+    """
+
+    def __init__(self):
+        from sqlalchemy import event
+
+        from app.core.database import async_engine, engine
+
+        self.count = 0
+        for target in (engine, async_engine and async_engine.sync_engine):
+            if target is not None:
+                event.listen(target, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Перцентиль методом ближайшего ранга по отсортированному списку
+    """
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float, queries: Optional[List[int]]) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    ms = lambda value: round(value * 1000, 3)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": ms(percentile(ordered, 50)),
+        "p95_ms": ms(percentile(ordered, 95)),
+        "p99_ms": ms(percentile(ordered, 99)),
+        "mean_ms": ms(sum(ordered) / len(ordered)),
+        "max_ms": ms(ordered[-1]),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+        "queries_max": max(queries) if queries else None,
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    ctx: Context,
+    iterations: int,
+    concurrency: int,
+    counter: Optional[QueryCounter],
+    warmup: int,
+) -> Dict[str, Any]:
+    """
+    Прогнать сценарий iterations раз; при concurrency > 1 запросы идут параллельно.
+    SQL считаются счётчиком движка при последовательном прогоне в процессе,
+    иначе - по заголовку Server-Timing ответа
+    """
+    ctx.targets = scenario.prepare(ctx, iterations) if scenario.prepare else []
+    if scenario.setup:
+        await scenario.setup(client, ctx)
+    headers = ctx.headers if scenario.auth else {}
+
+    async def call(i: int) -> httpx.Response:
+        body = scenario.body(ctx, i) if scenario.body else None
+        return await client.request(scenario.method, API + scenario.path(ctx, i), json=body, headers=headers)
+
+    if scenario.method == "GET":
+        for i in range(warmup):
+            await call(i)
+
+    latencies: List[float] = []
+    queries: List[int] = []
+    sizes: List[int] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+    first_error: Optional[str] = None
+    counted = counter is not None and concurrency == 1
+    indexes = iter(range(iterations))
+
+    async def worker() -> None:
+        nonlocal errors, first_error
+        for i in indexes:
+            before = counter.count if counted else 0
+            started = time.perf_counter()
+            response = await call(i)
+            latencies.append(time.perf_counter() - started)
+            sizes.append(response.num_bytes_downloaded)
+            if counted:
+                queries.append(counter.count - before)
+            elif match := SERVER_TIMING_SQL.search(response.headers.get("server-timing", "")):
+                queries.append(int(match.group(1)))
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            if response.status_code != scenario.expected:
+                errors += 1
+                first_error = first_error or f"{response.status_code}: {response.text[:200]}"
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = summarize(latencies, errors, time.perf_counter() - started, queries or None)
+    result["bytes_per_response"] = round(sum(sizes) / len(sizes)) if sizes else None
+    result["statuses"] = statuses
+    if first_error:
+        result["first_error"] = first_error
+    return result
+
+
+async def run_transport(
+    client: httpx.AsyncClient,
+    items: List[Scenario],
+    ctx: Context,
+    args: argparse.Namespace,
+    concurrency: int,
+    counter: Optional[QueryCounter],
+) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    ctx.tag = uuid.uuid4().hex[:8]  # уникальные имена создаваемых записей в каждом прогоне
+    for scenario in items:
+        iterations = args.heavy_iterations if scenario.heavy else args.iterations
+        results[scenario.name] = await run_scenario(
+            client, scenario, ctx, iterations, concurrency, counter, args.warmup
+        )
+        _print_row(scenario.name, results[scenario.name])
+    return results
+
+
+async def run_inprocess(items: List[Scenario], ctx: Context, args: argparse.Namespace) -> Dict[str, Any]:
+    from app.main import app
+
+    counter = QueryCounter()
+    transport = httpx.ASGITransport(app=app)
+    # ASGI транспорт не шлёт lifespan: запуск и остановка приложения вызываются явно
+    await app.router.startup()
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", headers=_client_headers(args), timeout=120
+        ) as client:
+            return await run_transport(client, items, ctx, args, 1, counter)
+    finally:
+        await app.router.shutdown()
+
+
+async def run_uvicorn(
+    items: List[Scenario], ctx: Context, args: argparse.Namespace, database_url: str
+) -> Dict[str, Any]:
+    port = free_port()
+    server = start_server(database_url, port, _app_env(args))
+    limits = httpx.Limits(max_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", headers=_client_headers(args), limits=limits, timeout=120
+        ) as client:
+            await wait_ready(client)
+            return await run_transport(client, items, ctx, args, args.concurrency, None)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+# ---------------------------------------------------------------- отчёт и базовая линия
+
+def _print_row(name: str, result: Dict[str, Any]) -> None:
+    queries = result["queries_per_request"]
+    print(f"  {name:<42} p50 {result['p50_ms']:>9.2f}  p95 {result['p95_ms']:>9.2f}  "
+          f"p99 {result['p99_ms']:>9.2f} мс  {result['rps'] or 0:>8.1f} req/s  "
+          f"SQL {queries if queries is not None else '-':>6}  {_format_size(result.get('bytes_per_response'))}  "
+          f"ошибок {result['errors']}")
+
+
+def _format_size(size: Optional[int]) -> str:
+    if size is None:
+        return f"{'-':>9}"
+    return f"{size / 1024:>7.1f}КБ" if size >= 1024 else f"{size:>8}Б"
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Сравнить прогон с базовой линией; вернуть endpoints, где p95 вырос больше threshold %
+    """
+    regressions = []
+    print(f"\nСравнение с базовой линией ({baseline['meta'].get('git_commit')}, {baseline['meta'].get('created_at')}):")
+    for transport, results in current["results"].items():
+        for name, result in results.items():
+            base = baseline.get("results", {}).get(transport, {}).get(name)
+            if not base:
+                continue
+            if base["errors"] or result["errors"]:
+                # Ответы с ошибкой (4xx) несравнимы с успешными по времени
+                print(f"  {transport:<9} {name:<42} пропущено: есть ошибки в одном из прогонов")
+                continue
+            delta = lambda key: (result[key] - base[key]) / base[key] * 100 if base.get(key) else 0.0
+            p95_delta = delta("p95_ms")
+            mark = ""
+            if p95_delta > threshold:
+                regressions.append(f"{transport} {name}")
+                mark = "  <-- регрессия"
+            print(f"  {transport:<9} {name:<42} p50 {delta('p50_ms'):>+7.1f}%  p95 {p95_delta:>+7.1f}%  "
+                  f"req/s {delta('rps'):>+7.1f}%{mark}")
+    return regressions
+
+
+def _client_headers(args: argparse.Namespace) -> Dict[str, str]:
+    # httpx по умолчанию просит gzip; сжатие включается в прогон явно
+    return {"Accept-Encoding": args.accept_encoding}
+
+
+def _app_env(args: argparse.Namespace) -> Dict[str, str]:
+    env = {} if args.verbose else {"LOGURU_LEVEL": "WARNING"}
+    if not args.response_cache:
+        env["RESPONSE_CACHE_SIZE"] = "0"
+    if args.fast_json:
+        env["FAST_JSON_ENABLED"] = "True"
+    return env
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--websites", type=int, default=500)
+    parser.add_argument("--templates", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=10, help="Шагов workflow в каждом шаблоне")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--page-kb", type=int, default=32, help="Примерный размер JSON контента страницы, КБ")
+    parser.add_argument("--schemas", type=int, default=100, help="Шаблонов с workflow схемой")
+    parser.add_argument("--schema-nodes", type=int, default=100, help="Узлов в каждой workflow схеме")
+    parser.add_argument("--revisions", type=int, default=20, help="Ревизий в истории страниц и схем")
+    parser.add_argument("--iterations", type=int, default=100, help="Запросов на endpoint")
+    parser.add_argument("--heavy-iterations", type=int, default=10, help="Запросов на bcrypt/экспорт")
+    parser.add_argument("--warmup", type=int, default=5, help="Прогревочных запросов для GET")
+    parser.add_argument("--concurrency", type=int, default=10, help="Параллельных клиентов для uvicorn")
+    parser.add_argument("--transports", nargs="+", default=["inprocess", "uvicorn"], choices=["inprocess", "uvicorn"])
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync", help="Режим БД (см. DATABASE_URL)")
+    parser.add_argument("--response-cache", action="store_true", help="Не выключать кеш ответов")
+    parser.add_argument("--fast-json", action="store_true", help="Быстрая сериализация ответов (FAST_JSON_ENABLED)")
+    parser.add_argument("--accept-encoding", default="identity",
+                        help="Accept-Encoding запросов, например gzip или \"zstd, br, gzip\"")
+    parser.add_argument("--verbose", action="store_true", help="Не приглушать логи приложения")
+    parser.add_argument("--only", nargs="+", help="Подстроки имён сценариев")
+    parser.add_argument("--output", type=Path, help="Файл для JSON с результатами")
+    parser.add_argument("--baseline", type=Path, help="JSON предыдущего прогона для сравнения")
+    parser.add_argument("--fail-threshold", type=float, default=None,
+                        help="Код выхода 1, если p95 вырос больше чем на столько процентов")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        driver = "sqlite+aiosqlite" if args.mode == "async" else "sqlite"
+        database_url = f"{driver}:///{Path(tmp) / 'bench.db'}"
+        # Настройки приложения читаются при импорте app.*, поэтому окружение - до него
+        os.environ.update(DATABASE_URL=database_url, **_app_env(args))
+        sys.path.insert(0, str(BACKEND_DIR))
+
+        seeder, ctx = seed(args)
+        items = [
+            scenario for scenario in scenarios(seeder)
+            if not args.only or any(part in scenario.name for part in args.only)
+        ]
+        report = {
+            "meta": {
+                "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+                "git_commit": _git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "mode": args.mode,
+                "response_cache": args.response_cache,
+                "accept_encoding": args.accept_encoding,
+                "fast_json": args.fast_json,
+                "volumes": {key: getattr(args, key) for key in (
+                    "websites", "templates", "steps", "pages", "page_kb", "schemas", "schema_nodes", "revisions")},
+                "iterations": args.iterations,
+                "heavy_iterations": args.heavy_iterations,
+                "concurrency": args.concurrency,
+            },
+            "results": {},
+        }
+        if "inprocess" in args.transports:
+            print("\ninprocess (последовательно, с подсчётом SQL):")
+            report["results"]["inprocess"] = asyncio.run(run_inprocess(items, ctx, args))
+        if "uvicorn" in args.transports:
+            print(f"\nuvicorn (concurrency {args.concurrency}):")
+            report["results"]["uvicorn"] = asyncio.run(run_uvicorn(items, ctx, args, database_url))
+
+    if args.output:
+        args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+        print(f"\nРезультаты записаны в {args.output}")
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.fail_threshold or 0.0)
+        if args.fail_threshold is not None and regressions:
+            print(f"\nРегрессии p95 больше {args.fail_threshold}%: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Общие утилиты бенчмарков: запуск uvicorn в отдельном процессе
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    """
+    Свободный TCP порт на localhost
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database_url: str, port: int, extra_env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    """
+    Запустить uvicorn с приложением на указанной БД
+    """
+    env = dict(os.environ, DATABASE_URL=database_url, **(extra_env or {}))
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient) -> None:
+    """
+    Дождаться ответа /health
+    """
+    for _ in range(100):
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("Сервер не запустился")
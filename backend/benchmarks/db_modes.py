@@ -0,0 +1,111 @@
+"""
+Бенчмарк: синхронный и асинхронный режим БД под высокой конкуренцией.
+
+Для каждого режима поднимает uvicorn на временной SQLite базе, наполняет её
+через API и меряет requests/sec на публичных read endpoints. Кеш ответов
+выключен, чтобы каждый запрос доходил до БД.
+
+Запуск (из каталога backend, нужны httpx и aiosqlite):
+    python -m benchmarks.db_modes --concurrency 200 --requests 5000
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import free_port, start_server, wait_ready
+
+MODES = {
+    "sync": "sqlite:///{path}",
+    "async": "sqlite+aiosqlite:///{path}",
+}
+
+ENDPOINTS = [
+    "/api/v1/websites",
+    "/api/v1/templates",
+    "/api/v1/pages",
+    "/api/v1/settings",
+]
+
+
+async def _seed(client: httpx.AsyncClient, items: int) -> None:
+    await client.post("/api/v1/auth/register", json={
+        "username": "bench", "email": "bench@example.com",
+        "password": "bench-password", "is_admin": True,
+    })
+    token = (await client.post("/api/v1/auth/login", json={
+        "username": "bench", "password": "bench-password",
+    })).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    for i in range(items):
+        await client.post("/api/v1/websites", headers=headers, json={
+            "name": f"Site {i}", "technologies": ["React", "FastAPI"], "date": "2024-01",
+        })
+        await client.post("/api/v1/templates", headers=headers, json={
+            "title": f"Template {i}",
+            "workflow": [
+                {"label": f"Step {j}", "type": "process", "position": str(j)}
+                for j in range(1, 6)
+            ],
+        })
+        await client.post("/api/v1/pages", headers=headers, json={
+            "page_id": f"page-{i}", "name": f"Page {i}", "content": {"text": "x" * 512},
+        })
+
+
+async def _load(client: httpx.AsyncClient, concurrency: int, total: int) -> dict:
+    counter = iter(range(total))
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            response = await client.get(ENDPOINTS[i % len(ENDPOINTS)])
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {"requests": total, "errors": errors, "seconds": round(elapsed, 3),
+            "rps": round(total / elapsed, 1)}
+
+
+async def run_mode(mode: str, args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = MODES[mode].format(path=Path(tmp) / "bench.db")
+        port = free_port()
+        server = start_server(database_url, port, {"RESPONSE_CACHE_SIZE": "0"})
+        limits = httpx.Limits(max_connections=args.concurrency)
+        try:
+            async with httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60
+            ) as client:
+                await wait_ready(client)
+                await _seed(client, args.items)
+                await _load(client, args.concurrency, min(args.requests, 200))  # прогрев
+                return await _load(client, args.concurrency, args.requests)
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--items", type=int, default=50, help="Записей каждого типа")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    args = parser.parse_args()
+
+    for mode in args.modes:
+        result = asyncio.run(run_mode(mode, args))
+        print(f"{mode:>5}: {result['rps']:>8} req/s  "
+              f"({result['requests']} запросов, {result['errors']} ошибок, {result['seconds']} с)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Бенчмарк сериализации больших списков: ORM-объекты -> байты JSON.
+
+Сравнивает три пути для одних и тех же объектов:
+  fastapi  - как endpoint с response_model: проверка схемой, jsonable_encoder, json.dumps;
+  pydantic - TypeAdapter.validate_python + dump_json (кеш ответов до FAST_JSON_ENABLED);
+  fast     - сгенерированный сериализатор app.core.serialization + orjson.
+Заодно проверяет, что все три пути дают одинаковый JSON.
+
+Запуск (из каталога backend, нужен orjson):
+    python -m benchmarks.serialization --items 500 --steps 30 --schema-nodes 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import BACKEND_DIR
+
+
+def _objects(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.models.page import PageContent
+    from app.models.template import Template, WorkflowStep
+    from app.models.website import Website
+    from app.models.workflow_schema import WorkflowSchema
+    from app.schemas.page import PageContentResponse
+    from app.schemas.template import TemplateResponse
+    from app.schemas.website import WebsiteResponse
+    from app.schemas.workflow_schema import WorkflowSchemaResponse
+
+    now = datetime.utcnow()
+    common = lambda: {"id": str(uuid.uuid4()), "created_at": now, "updated_at": now}
+    websites = [
+        Website(**common(), name=f"Site {i}", client=f"Client {i % 50}", description="Описание " * 20,
+                url=f"https://site-{i}.example.com", screenshot=None,
+                technologies=["React", "FastAPI", "PostgreSQL"], category="web", date="2024-01", featured=False)
+        for i in range(args.items)
+    ]
+    templates = []
+    for i in range(args.items):
+        template = Template(**common(), title=f"Template {i}", description="Автоматизация заявок",
+                            customizable=["crm", "email"], status="active")
+        template.workflow_steps = [
+            WorkflowStep(**common(), template_id=template.id, label=f"Шаг {j}", type="process",
+                         description=f"Описание шага {j}", position=str(j))
+            for j in range(1, args.steps + 1)
+        ]
+        templates.append(template)
+    nodes = [
+        {"id": f"n{j}", "label": f"Узел {j}", "type": "process",
+         "position": {"x": 120.5 * (j % 10), "y": 80 * (j // 10)}, "connections": [f"n{j + 1}"]}
+        for j in range(args.schema_nodes)
+    ]
+    schemas = [
+        WorkflowSchema(**common(), template_id=str(uuid.uuid4()), nodes=nodes, version=1)
+        for _ in range(args.items // 10 or 1)
+    ]
+    content = {"sections": [{"id": f"s{j}", "title": f"Секция {j}", "text": "Lorem ipsum " * 80}
+                            for j in range(args.page_kb)]}
+    pages = [
+        PageContent(**common(), page_id=f"page-{i}", name=f"Page {i}", sections=args.page_kb,
+                    updated=None, content=content, version=1)
+        for i in range(args.items // 10 or 1)
+    ]
+    return {
+        "websites": (websites, List[WebsiteResponse]),
+        "templates": (templates, List[TemplateResponse]),
+        "workflow-schemas": (schemas, List[WorkflowSchemaResponse]),
+        "pages": (pages, List[PageContentResponse]),
+    }
+
+
+def _paths(response_type: Any) -> Dict[str, Callable[[Any], bytes]]:
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_model_field
+    from pydantic import TypeAdapter
+
+    from app.core.serialization import fast_serializer
+
+    field = create_model_field(name="Response", type_=response_type, mode="serialization")
+    adapter = TypeAdapter(response_type)
+
+    def fastapi_path(content: Any) -> bytes:
+        data = asyncio.run(serialize_response(field=field, response_content=content, is_coroutine=False))
+        return JSONResponse(data).body
+
+    return {
+        "fastapi": fastapi_path,
+        "pydantic": lambda content: adapter.dump_json(adapter.validate_python(content, from_attributes=True)),
+        "fast": fast_serializer(response_type),
+    }
+
+
+def _measure(fn: Callable[[Any], bytes], content: Any, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(content)
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)[len(timings) // 2]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=500, help="Сайтов и шаблонов в списке (схем и страниц - в 10 раз меньше)")
+    parser.add_argument("--steps", type=int, default=20, help="Шагов workflow в каждом шаблоне")
+    parser.add_argument("--schema-nodes", type=int, default=300, help="Узлов в каждой workflow схеме")
+    parser.add_argument("--page-kb", type=int, default=32, help="Примерный размер JSON контента страницы, КБ")
+    parser.add_argument("--repeat", type=int, default=10, help="Повторов на путь, берётся медиана")
+    args = parser.parse_args()
+
+    # Настройки читаются при импорте app.*: быстрый путь включается до него
+    os.environ.update(FAST_JSON_ENABLED="True", LOGURU_LEVEL="WARNING")
+    sys.path.insert(0, str(BACKEND_DIR))
+    from app.core.serialization import fast_json_enabled
+    if not fast_json_enabled():
+        sys.exit("Нужен пакет orjson")
+
+    for name, (content, response_type) in _objects(args).items():
+        paths = _paths(response_type)
+        outputs = {path: fn(content) for path, fn in paths.items()}
+        reference = json.loads(outputs["fastapi"])
+        mismatched = [path for path, body in outputs.items() if json.loads(body) != reference]
+        timings = {path: _measure(fn, content, args.repeat) for path, fn in paths.items()}
+        print(f"{name:<18} {len(content):>5} шт, {len(outputs['fast']) / 1024:>8.1f} КБ:  " + "  ".join(
+            f"{path} {seconds * 1000:>8.2f} мс" for path, seconds in timings.items()
+        ) + f"  (x{timings['fastapi'] / timings['fast']:.1f} к fastapi, x{timings['pydantic'] / timings['fast']:.1f} к pydantic)"
+          + (f"  РАСХОЖДЕНИЕ: {', '.join(mismatched)}" if mismatched else ""))
+
+
+if __name__ == "__main__":
+    main()
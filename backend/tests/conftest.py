@@ -0,0 +1,50 @@
+"""
+Общие фикстуры тестов: приложение на временной SQLite базе
+"""
+import os
+import tempfile
+
+# Настройки читаются при импорте app.*, поэтому окружение - до него
+_DB_DIR = tempfile.mkdtemp(prefix="atii-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+os.environ["RESPONSE_CACHE_SIZE"] = "0"  # запросы доходят до БД
+os.environ["LOGURU_LEVEL"] = "WARNING"
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    Клиент приложения; запуск и остановка (startup/shutdown) - один раз на сессию
+    """
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def db(client):
+    """
+    Сессия БД запущенного приложения
+    """
+    from app.core.database import SessionLocal
+
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    """
+    Заголовок Authorization администратора
+    """
+    client.post("/api/v1/auth/register", json={
+        "username": "tests-admin", "email": "tests-admin@example.com", "password": "secret123", "is_admin": True,
+    })
+    token = client.post("/api/v1/auth/login", json={
+        "username": "tests-admin", "password": "secret123",
+    }).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,60 @@
+"""
+Кеш авторизации: сброс при изменении пользователя и сверка с БД на админских endpoints
+"""
+import pytest
+from sqlalchemy import delete, update
+
+from app.api.dependencies import _token_key, user_cache
+from app.models.user import User
+
+
+def is_cached(headers):
+    return user_cache.get(_token_key(headers["Authorization"].split()[1])) is not None
+
+
+@pytest.fixture
+def user(client, db):
+    db.execute(delete(User).where(User.username == "cached-user"))
+    db.commit()
+    client.post("/api/v1/auth/register", json={
+        "username": "cached-user", "email": "cached@example.com", "password": "secret123", "is_admin": True,
+    })
+    token = client.post("/api/v1/auth/login", json={
+        "username": "cached-user", "password": "secret123",
+    }).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+    user = db.query(User).filter(User.username == "cached-user").one()
+    assert is_cached(headers)
+    return user, headers
+
+
+def test_deactivation_invalidates_cached_user(client, db, user):
+    user, headers = user
+    user.is_active = False
+    db.commit()
+    assert not is_cached(headers)
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+
+
+def test_deletion_invalidates_cached_user(client, db, user):
+    user, headers = user
+    db.delete(user)
+    db.commit()
+    assert not is_cached(headers)
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+
+
+def test_admin_routes_recheck_cached_user(client, db, user):
+    user, headers = user
+    # Изменение мимо ORM-событий - как запись через другой воркер
+    db.execute(update(User).where(User.id == user.id).values(is_admin=False))
+    db.commit()
+    assert is_cached(headers)
+    assert client.get("/api/v1/auth/cache-stats", headers=headers).status_code == 403
+
+    db.execute(update(User).where(User.id == user.id).values(is_admin=True, is_active=False))
+    db.commit()
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200  # до AUTH_CACHE_TTL_SECONDS
+    assert client.get("/api/v1/auth/cache-stats", headers=headers).status_code == 401
+    assert not is_cached(headers)
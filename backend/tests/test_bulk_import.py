@@ -0,0 +1,128 @@
+"""
+Массовый импорт: создание и обновление в одном запросе, повторный импорт, атомарность
+"""
+import pytest
+from sqlalchemy import delete
+
+from app.models.page import PageContent
+from app.models.template import Template, WorkflowStep
+from app.models.website import Website
+from app.models.workflow_schema import WorkflowSchema
+
+
+@pytest.fixture
+def existing(db):
+    """
+    Страница и шаблон со схемой, которые импорт обновляет
+    """
+    db.execute(delete(Template))
+    db.execute(delete(Website))
+    db.execute(delete(PageContent).where(PageContent.page_id.like("bulk-%")))
+    db.commit()
+    page = PageContent(page_id="bulk-existing", name="Было", content={"v": 1})
+    template = Template(title="Существующий")
+    db.add_all([page, template])
+    db.flush()
+    schema = WorkflowSchema(template_id=template.id, nodes=[{"id": "old"}])
+    db.add(schema)
+    db.commit()
+    return page, template, schema
+
+
+def counts(db):
+    db.expire_all()
+    return {
+        "websites": db.query(Website).count(),
+        "templates": db.query(Template).count(),
+        "steps": db.query(WorkflowStep).count(),
+        "pages": db.query(PageContent).filter(PageContent.page_id.like("bulk-%")).count(),
+        "schemas": db.query(WorkflowSchema).count(),
+    }
+
+
+def statuses(items):
+    return [item["status"] for item in items]
+
+
+def test_mixed_create_and_update(client, db, admin_headers, existing):
+    page, template, schema = existing
+    response = client.post("/api/v1/bulk/import", headers=admin_headers, json={
+        "settings": {"site_name": "Импорт"},
+        "websites": [{"name": "Сайт"}],
+        "templates": [{"id": "src-1", "title": "Новый", "workflow": [{"label": "a", "type": "trigger", "position": "1"}]}],
+        "pages": [
+            {"page_id": "bulk-existing", "name": "Стало", "content": {"v": 2}},
+            {"page_id": "bulk-new", "name": "Новая", "content": {}},
+        ],
+        "workflow_schemas": [
+            {"template_id": "src-1", "nodes": [{"id": "n1"}]},
+            {"template_id": template.id, "nodes": [{"id": "new"}]},
+        ],
+    })
+    assert response.status_code == 200
+    result = response.json()
+    assert result["settings"]["status"] == "updated"
+    assert statuses(result["websites"]) == ["created"]
+    assert statuses(result["templates"]) == ["created"]
+    assert statuses(result["pages"]) == ["updated", "created"]
+    assert statuses(result["workflow_schemas"]) == ["created", "updated"]
+    new_template_id = result["template_id_map"]["src-1"]
+    assert result["templates"][0]["id"] == new_template_id
+    assert result["pages"][0]["id"] == page.id
+    assert result["workflow_schemas"][1]["id"] == schema.id
+
+    assert counts(db) == {"websites": 1, "templates": 2, "steps": 1, "pages": 2, "schemas": 2}
+    db.refresh(page)
+    db.refresh(schema)
+    assert (page.name, page.content, page.version) == ("Стало", {"v": 2}, 2)
+    assert (schema.nodes, schema.version) == ([{"id": "new"}], 2)
+    created = db.query(WorkflowSchema).filter(WorkflowSchema.template_id == new_template_id).one()
+    assert created.nodes == [{"id": "n1"}]
+
+
+def test_rerun_of_same_payload_updates(client, db, admin_headers, existing):
+    _, template, schema = existing
+    payload = {
+        "pages": [{"page_id": "bulk-rerun", "name": "Повтор", "content": {"a": 1}}],
+        "workflow_schemas": [{"template_id": template.id, "nodes": [{"id": "x"}]}],
+    }
+    first = client.post("/api/v1/bulk/import", headers=admin_headers, json=payload).json()
+    second = client.post("/api/v1/bulk/import", headers=admin_headers, json=payload).json()
+    assert statuses(first["pages"]) == ["created"]
+    assert statuses(second["pages"]) == ["updated"]
+    assert second["pages"][0]["id"] == first["pages"][0]["id"]
+    assert statuses(first["workflow_schemas"]) == statuses(second["workflow_schemas"]) == ["updated"]
+
+    assert counts(db)["pages"] == 2
+    rerun = db.query(PageContent).filter(PageContent.page_id == "bulk-rerun").one()
+    assert (rerun.content, rerun.version) == ({"a": 1}, 2)
+    db.refresh(schema)
+    assert schema.version == 3
+
+
+# Обновление существующей страницы, которое должно откатиться вместе с остальным
+UPDATE_EXISTING = {"page_id": "bulk-existing", "name": "Изменено", "content": {"v": 9}}
+
+
+@pytest.mark.parametrize("payload, error", [
+    ({"pages": [UPDATE_EXISTING, {"page_id": "bulk-bad"}]}, "pages[1]: name"),
+    ({"pages": [UPDATE_EXISTING, {"page_id": "bulk-dup", "name": "1"}, {"page_id": "bulk-dup", "name": "2"}]}, "pages[2]"),
+    ({"pages": [UPDATE_EXISTING], "workflow_schemas": [{"template_id": "no-such-template"}]}, "workflow_schemas[0]"),
+    ({"pages": [{"page_id": "bulk-new", "name": "Новая"}, UPDATE_EXISTING], "upsert": False}, "pages[1]"),
+])
+def test_invalid_row_rolls_back_whole_import(client, db, admin_headers, existing, payload, error):
+    page, _, _ = existing
+    before = counts(db)
+    after = client.get("/api/v1/changes").json()["last_id"]
+    response = client.post("/api/v1/bulk/import", headers=admin_headers, json={
+        "websites": [{"name": "Не сохранится"}],
+        "templates": [{"title": "Тоже", "workflow": [{"label": "a", "type": "trigger", "position": "1"}]}],
+        **payload,
+    })
+    assert response.status_code == 422
+    assert error in response.json()["detail"]
+
+    assert counts(db) == before
+    db.refresh(page)
+    assert (page.name, page.content, page.version) == ("Было", {"v": 1}, 1)
+    assert client.get("/api/v1/changes", params={"after": after}).json()["changes"] == []
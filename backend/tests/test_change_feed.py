@@ -0,0 +1,57 @@
+"""
+Лента изменений: события после коммита, сброс кешей до публикации
+"""
+from app.api.change_feed import change_feed
+from app.core.response_cache import response_cache
+from app.models.website import Website
+
+
+def changes_after(client, after):
+    response = client.get("/api/v1/changes", params={"after": after})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_committed_write_produces_event(client, admin_headers):
+    after = changes_after(client, None)["last_id"]
+    website_id = client.post("/api/v1/websites", headers=admin_headers, json={"name": "Feed"}).json()["id"]
+    client.delete(f"/api/v1/websites/{website_id}", headers=admin_headers)
+
+    feed = changes_after(client, after)
+    assert not feed["reset"]
+    assert [(change["type"], change["id"], change["action"]) for change in feed["changes"]] == [
+        ("website", website_id, "created"),
+        ("website", website_id, "deleted"),
+    ]
+    assert feed["last_id"] == feed["changes"][-1]["event_id"]
+
+
+def test_rolled_back_write_produces_no_event(client, db):
+    after = changes_after(client, None)["last_id"]
+    db.add(Website(name="Rolled back"))
+    db.flush()
+    db.rollback()
+    assert changes_after(client, after)["changes"] == []
+
+
+def test_caches_are_invalidated_before_publish(client, db, monkeypatch):
+    calls = []
+    publish = change_feed.publish
+
+    def recording_publish(changes):
+        calls.append("publish")
+        publish(changes)
+
+    def on_invalidate(groups):
+        calls.append(("invalidate", groups))
+
+    monkeypatch.setattr(change_feed, "publish", recording_publish)
+    monkeypatch.setattr(response_cache, "_subscribers", response_cache._subscribers + [on_invalidate])
+    db.add(Website(name="Ordered"))
+    db.commit()
+    assert calls == [("invalidate", ("websites",)), "publish"]
+
+
+def test_invalid_event_id_means_reset(client):
+    for after in ("0:1", f"{change_feed.epoch}:²", f"{change_feed.epoch}:x", "garbage"):
+        assert changes_after(client, after)["reset"]
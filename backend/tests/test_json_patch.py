@@ -0,0 +1,124 @@
+"""
+JSON Patch (RFC 6902) и JSON Pointer (RFC 6901)
+"""
+import pytest
+
+from app.core.json_patch import JsonPatchError, JsonPatchTestFailed, apply_patch, parse_pointer, resolve
+
+
+DOCUMENT = {"title": "Главная", "sections": [{"id": "a"}, {"id": "b"}], "meta": {"a/b": 1, "m~n": 2}}
+
+
+def test_parse_pointer_unescapes_tokens():
+    assert parse_pointer("") == []
+    assert parse_pointer("/meta/a~1b") == ["meta", "a/b"]
+    assert parse_pointer("/m~0n") == ["m~n"]
+    assert parse_pointer("/~01") == ["~1"]  # ~0 раскрывается после ~1
+    with pytest.raises(JsonPatchError):
+        parse_pointer("title")
+
+
+def test_resolve():
+    assert resolve(DOCUMENT, "/sections/1/id") == "b"
+    assert resolve(DOCUMENT, "/meta/a~1b") == 1
+    assert resolve(DOCUMENT, "") is DOCUMENT
+    for pointer in ("/missing", "/sections/2", "/sections/01", "/sections/-", "/title/0"):
+        with pytest.raises(JsonPatchError):
+            resolve(DOCUMENT, pointer)
+
+
+def test_add_remove_replace():
+    result = apply_patch(DOCUMENT, [
+        {"op": "add", "path": "/sections/1", "value": {"id": "x"}},
+        {"op": "add", "path": "/sections/-", "value": {"id": "z"}},
+        {"op": "remove", "path": "/meta/m~0n"},
+        {"op": "replace", "path": "/title", "value": "Новая"},
+        {"op": "add", "path": "/meta/a~1b", "value": 5},  # add по существующему ключу заменяет
+    ])
+    assert result == {
+        "title": "Новая",
+        "sections": [{"id": "a"}, {"id": "x"}, {"id": "b"}, {"id": "z"}],
+        "meta": {"a/b": 5},
+    }
+
+
+def test_source_document_is_not_modified():
+    value = {"id": "c"}
+    result = apply_patch(DOCUMENT, [{"op": "add", "path": "/sections/0", "value": value}])
+    value["id"] = "changed"
+    assert result["sections"][0] == {"id": "c"}
+    assert DOCUMENT["sections"] == [{"id": "a"}, {"id": "b"}]
+
+
+def test_move_and_copy():
+    result = apply_patch(DOCUMENT, [
+        {"op": "move", "from": "/sections/0", "path": "/sections/-"},
+        {"op": "copy", "from": "/meta", "path": "/backup"},
+        {"op": "replace", "path": "/meta/a~1b", "value": 9},
+    ])
+    assert result["sections"] == [{"id": "b"}, {"id": "a"}]
+    assert result["backup"] == {"a/b": 1, "m~n": 2}  # копия не связана с оригиналом
+    assert result["meta"]["a/b"] == 9
+
+
+def test_test_operation():
+    assert apply_patch(DOCUMENT, [{"op": "test", "path": "/sections/0/id", "value": "a"}]) == DOCUMENT
+    with pytest.raises(JsonPatchTestFailed):
+        apply_patch(DOCUMENT, [{"op": "test", "path": "/title", "value": "Другая"}])
+    # test по несуществующему пути - ошибка пути, а не проваленная проверка
+    with pytest.raises(JsonPatchError) as error:
+        apply_patch(DOCUMENT, [{"op": "test", "path": "/missing", "value": 1}])
+    assert not isinstance(error.value, JsonPatchTestFailed)
+
+
+def test_failed_operation_applies_nothing():
+    document = {"a": 1}
+    with pytest.raises(JsonPatchTestFailed):
+        apply_patch(document, [
+            {"op": "replace", "path": "/a", "value": 2},
+            {"op": "test", "path": "/a", "value": 1},
+        ])
+    assert document == {"a": 1}
+
+
+@pytest.mark.parametrize("operation", [
+    {"op": "add", "path": "/title"},                              # нет value
+    {"op": "replace", "path": "/title"},                          # нет value
+    {"op": "test", "path": "/title"},                             # нет value
+    {"op": "remove"},                                             # нет path
+    {"op": "move", "path": "/x"},                                 # нет from
+    {"op": "copy", "path": "/x", "from": 1},                      # from не строка
+    {"op": "rename", "path": "/title", "value": 1},               # неизвестная операция
+    {"op": "remove", "path": "/missing"},
+    {"op": "remove", "path": "/sections/2"},
+    {"op": "replace", "path": "/missing", "value": 1},            # replace требует существующий путь
+    {"op": "add", "path": "/sections/3", "value": 1},             # индекс за концом массива
+    {"op": "add", "path": "/missing/key", "value": 1},            # нет родителя
+    {"op": "add", "path": "/title/x", "value": 1},                # родитель - скаляр
+    {"op": "add", "path": "", "value": {}},                       # корень документа
+    {"op": "move", "from": "/sections", "path": "/sections/0"},   # внутрь самого себя
+    {"op": "move", "from": "/missing", "path": "/x"},
+    {"op": "copy", "from": "/sections/5", "path": "/x"},
+    {"op": "remove", "path": "/sections/²"},                      # не ASCII-цифра
+    {"op": "add", "path": "/sections/٣", "value": 1},
+])
+def test_invalid_operations(operation):
+    with pytest.raises(JsonPatchError):
+        apply_patch(DOCUMENT, [operation])
+
+
+def test_non_ascii_index_in_page_patch_is_422(client, admin_headers):
+    client.post("/api/v1/pages", headers=admin_headers, json={
+        "page_id": "patch-digits", "name": "Patch", "content": {"items": [1]},
+    })
+    response = client.patch("/api/v1/pages/patch-digits", headers=admin_headers, json={
+        "operations": [{"op": "remove", "path": "/items/²"}],
+    })
+    assert response.status_code == 422
+    template_id = client.post("/api/v1/templates", headers=admin_headers, json={"title": "Patch"}).json()["id"]
+    response = client.put(f"/api/v1/templates/{template_id}", headers=admin_headers, json={
+        "workflow_patch": [{"op": "remove", "path": "/²"}],
+    })
+    assert response.status_code == 422
+    with pytest.raises(JsonPatchError):
+        resolve([1, 2], "/²")
@@ -0,0 +1,81 @@
+"""
+Keyset-пагинация по (created_at, id): курсор и порядок страниц
+"""
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete
+
+from app.api.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, next_cursor_headers, paginate
+from app.models.website import Website
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor(created_at, "id/with+chars")
+    assert "=" not in cursor  # без паддинга, безопасен в query string
+    assert decode_cursor(cursor) == (created_at, "id/with+chars")
+
+
+@pytest.mark.parametrize("cursor", [
+    "не-base64",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(b'{"a": 1}').decode(),
+    base64.urlsafe_b64encode(b'["2024-01-01"]').decode(),
+    base64.urlsafe_b64encode(b'["yesterday", "id"]').decode(),
+])
+def test_invalid_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+@pytest.fixture
+def websites(db):
+    """
+    Сайты с совпадающим created_at у групп записей: порядок внутри группы - по id
+    """
+    db.execute(delete(Website))
+    base = datetime(2024, 1, 1)
+    rows = [
+        Website(id=f"w{i:02d}", name=f"Site {i}", created_at=base + timedelta(seconds=i // 4))
+        for i in reversed(range(10))
+    ]
+    db.add_all(rows)
+    db.commit()
+    return sorted((row.created_at, row.id) for row in rows)
+
+
+def test_keyset_pages_cover_all_rows_once_with_ties(db, websites):
+    seen = []
+    cursor = None
+    while True:
+        page = paginate(db.query(Website), Website, 0, 3, cursor).all()
+        seen.extend((row.created_at, row.id) for row in page)
+        headers = next_cursor_headers(page, 3)
+        if not headers:
+            break
+        cursor = headers[NEXT_CURSOR_HEADER]
+    assert seen == websites
+
+
+def test_keyset_matches_offset(db, websites):
+    for skip in range(0, 10, 4):
+        by_offset = paginate(db.query(Website), Website, skip, 4).all()
+        if skip == 0:
+            by_cursor = paginate(db.query(Website), Website, 0, 4).all()
+        else:
+            previous = paginate(db.query(Website), Website, skip - 1, 1).one()
+            by_cursor = paginate(
+                db.query(Website), Website, 0, 4, encode_cursor(previous.created_at, previous.id)
+            ).all()
+        assert [row.id for row in by_cursor] == [row.id for row in by_offset]
+
+
+def test_next_cursor_only_for_full_page(db, websites):
+    page = paginate(db.query(Website), Website, 0, 4).all()
+    assert decode_cursor(next_cursor_headers(page, 4)[NEXT_CURSOR_HEADER]) == (page[-1].created_at, page[-1].id)
+    assert next_cursor_headers(page[:3], 4) == {}
+    assert next_cursor_headers([], 4) == {}
@@ -0,0 +1,70 @@
+"""
+Кеш ответов: ETag и 304, сброс групп при записи, гонка чтения со сбросом
+"""
+import pytest
+from starlette.requests import Request
+
+from app.core.cache import TTLCache
+from app.core.response_cache import response_cache
+
+
+@pytest.fixture
+def cache(client, monkeypatch):
+    """
+    Включённый кеш ответов (в остальных тестах RESPONSE_CACHE_SIZE=0)
+    """
+    monkeypatch.setattr(response_cache, "_cache", TTLCache(maxsize=64, ttl=60))
+    return response_cache
+
+
+def make_request(path="/api/v1/websites", query=b""):
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query, "headers": []})
+
+
+def test_matching_etag_is_304(client, cache):
+    first = client.get("/api/v1/websites")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    hits = cache.stats()["hits"]
+
+    response = client.get("/api/v1/websites", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert cache.stats()["hits"] == hits + 1
+    assert client.get("/api/v1/websites", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_admin_write_changes_etag(client, cache, admin_headers):
+    first = client.get("/api/v1/websites")
+    website = client.post("/api/v1/websites", headers=admin_headers, json={"name": "Cached"}).json()
+
+    response = client.get("/api/v1/websites", headers={"If-None-Match": first.headers["etag"]})
+    assert response.status_code == 200
+    assert response.headers["etag"] != first.headers["etag"]
+    assert website["id"] in [item["id"] for item in response.json()]
+
+
+def test_invalidation_is_per_group(cache):
+    request = make_request()
+    assert cache.get("websites", request) is None
+    cache.put("websites", request, [], list)
+    cache.invalidate("pages")
+    assert cache.get("websites", make_request()) is not None
+    cache.invalidate("websites")
+    assert cache.get("websites", make_request()) is None
+
+
+def test_response_read_during_invalidation_is_not_cached(cache):
+    request = make_request(query=b"skip=0")
+    assert cache.get("websites", request) is None
+    # Запись закоммичена и группа сброшена, пока запрос читал старые данные из БД
+    cache.invalidate("websites")
+    stale = cache.put("websites", request, [], list)
+    assert stale.status_code == 200
+    assert cache.get("websites", make_request(query=b"skip=0")) is None
+
+
+def test_put_without_get_is_not_cached(cache):
+    cache.put("websites", make_request(query=b"skip=1"), [], list)
+    assert cache.get("websites", make_request(query=b"skip=1")) is None
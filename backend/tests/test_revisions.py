@@ -0,0 +1,151 @@
+"""
+make_patch и история ревизий: снимки, патчи и восстановление любой версии
+"""
+import copy
+import json
+import random
+
+import pytest
+from sqlalchemy import delete
+
+from app.api.revisions import DELTA, SNAPSHOT, compact_revisions, list_revisions, load_revision
+from app.core.config import settings
+from app.core.json_patch import apply_patch, make_patch
+from app.models.page import PageContent
+from app.models.revision import ContentRevision
+
+
+@pytest.mark.parametrize("source, target", [
+    ({"a": 1, "b": [1, 2, 3]}, {"a": 1, "b": [1, 2, 3]}),
+    ({"a": 1, "b": 2}, {"b": 3, "c": {"d": [1]}}),
+    ({"k/ey": 1, "t~": 2}, {"k/ey": 2}),
+    ([1, 2, 3, 4, 5], [1, 9, 4, 5]),
+    ([1, 2], [1, 2, 3, 4]),
+    ([{"id": "a", "x": 1}, {"id": "b"}], [{"id": "a", "x": 2}, {"id": "b"}]),
+    ({"a": 1}, {"a": 1.0}),
+    ({"a": 1}, {"a": True}),
+    ({"a": None}, {"a": {}}),
+])
+def test_make_patch_round_trip(source, target):
+    patch = make_patch(source, target)
+    # Сравнение JSON-представлений: 1, 1.0 и true различаются
+    assert json.dumps(apply_patch(source, patch), sort_keys=True) == json.dumps(target, sort_keys=True)
+    if json.dumps(source, sort_keys=True) == json.dumps(target, sort_keys=True):
+        assert patch == []
+
+
+def test_make_patch_is_minimal_for_local_changes():
+    source = {"sections": [{"id": i, "text": "x" * 100} for i in range(50)]}
+    target = copy.deepcopy(source)
+    target["sections"][25]["text"] = "changed"
+    assert make_patch(source, target) == [{"op": "replace", "path": "/sections/25/text", "value": "changed"}]
+
+
+def test_make_patch_random_documents():
+    rng = random.Random(11)
+
+    def value(depth):
+        kind = rng.randrange(6 if depth < 3 else 3)
+        if kind == 0:
+            return rng.randrange(5)
+        if kind == 1:
+            return rng.choice(["a", "b", None, True])
+        if kind == 2:
+            return rng.random()
+        if kind in (3, 4):
+            return [value(depth + 1) for _ in range(rng.randrange(5))]
+        return {rng.choice("abcde"): value(depth + 1) for _ in range(rng.randrange(5))}
+
+    for _ in range(300):
+        source, target = value(0), value(0)
+        if not isinstance(source, (dict, list)) or not isinstance(target, (dict, list)):
+            continue
+        patch = make_patch(source, target)
+        if any(operation["path"] == "" for operation in patch):
+            continue  # замена корня - в истории пишется снимком
+        assert json.dumps(apply_patch(source, patch), sort_keys=True) == json.dumps(target, sort_keys=True)
+
+
+@pytest.fixture
+def page(db):
+    db.execute(delete(ContentRevision))
+    db.execute(delete(PageContent).where(PageContent.page_id == "history"))
+    db.commit()
+    page = PageContent(page_id="history", name="История", content={"title": "v1", "items": list(range(50))})
+    db.add(page)
+    db.commit()
+    return page
+
+
+def save_versions(db, page, count):
+    contents = {page.version: copy.deepcopy(page.content)}
+    for i in range(count):
+        content = copy.deepcopy(page.content)
+        content["title"] = f"v{page.version + 1}"
+        content["items"][i % 50] = -i
+        page.content = content
+        db.commit()
+        contents[page.version] = content
+    return contents
+
+
+def test_every_version_is_reconstructed(db, page):
+    contents = save_versions(db, page, settings.REVISION_SNAPSHOT_INTERVAL * 2 + 3)
+    revisions = list_revisions(db, "page", page.id, 0, 1000)
+    assert [revision.version for revision in revisions] == sorted(contents, reverse=True)
+    kinds = {revision.version: revision.kind for revision in revisions}
+    assert kinds[1] == SNAPSHOT
+    assert DELTA in kinds.values()
+    # Снимок не реже раза в REVISION_SNAPSHOT_INTERVAL ревизий
+    chain = 0
+    for version in sorted(kinds):
+        chain = 0 if kinds[version] == SNAPSHOT else chain + 1
+        assert chain < settings.REVISION_SNAPSHOT_INTERVAL
+    for version, content in contents.items():
+        document, _ = load_revision(db, "page", page.id, version)
+        assert document == content
+    assert load_revision(db, "page", page.id, max(contents) + 1) is None
+
+
+def test_metadata_only_save_has_revision(db, page):
+    page.name = "Новое название"
+    db.commit()
+    assert page.version == 2
+    document, _ = load_revision(db, "page", page.id, 2)
+    assert document == page.content
+
+
+def test_compaction_keeps_latest_versions_readable(db, page, monkeypatch):
+    contents = save_versions(db, page, 30)
+    monkeypatch.setattr(settings, "REVISION_MAX_PER_ENTITY", 7)
+    stats = compact_revisions()
+    assert stats["removed"] == len(contents) - 7
+    revisions = list_revisions(db, "page", page.id, 0, 1000)
+    versions = sorted(revision.version for revision in revisions)
+    assert versions == sorted(contents)[-7:]
+    assert revisions[-1].kind == SNAPSHOT  # самая старая оставшаяся ревизия - снимок
+    for version in versions:
+        assert load_revision(db, "page", page.id, version)[0] == contents[version]
+
+
+def test_rollback_endpoint(client, db, page):
+    contents = save_versions(db, page, 3)
+    client.post("/api/v1/auth/register", json={
+        "username": "revisions-admin", "email": "revisions@example.com", "password": "secret123", "is_admin": True,
+    })
+    token = client.post("/api/v1/auth/login", json={
+        "username": "revisions-admin", "password": "secret123",
+    }).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("/api/v1/pages/history/revisions/2", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["data"] == contents[2]
+    assert client.get("/api/v1/pages/history/revisions/99", headers=headers).status_code == 404
+    assert client.get("/api/v1/pages/history/revisions/2").status_code in (401, 403)
+
+    response = client.post("/api/v1/pages/history/revisions/2/rollback", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["content"] == contents[2]
+    assert response.json()["version"] == max(contents) + 1
+    assert client.get(f"/api/v1/pages/history/revisions/{max(contents) + 1}", headers=headers).json()["data"] == contents[2]
@@ -0,0 +1,37 @@
+"""
+Поиск: контракт бэкенда и подсветка совпадений во фрагменте
+"""
+import pytest
+
+from app.core.search import (
+    _MARK_END,
+    _MARK_START,
+    PostgresSearchBackend,
+    SearchBackend,
+    SqliteFtsBackend,
+    highlight,
+    index_text,
+)
+
+
+def test_backend_without_search_is_not_constructed():
+    class Incomplete(SearchBackend):
+        def setup(self, connection):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+    with pytest.raises(TypeError):
+        SearchBackend()
+    SqliteFtsBackend()
+    PostgresSearchBackend()
+
+
+def test_highlight_escapes_document_text():
+    snippet = f"<img src=x onerror=alert(1)> {_MARK_START}widget{_MARK_END} & co"
+    assert highlight(snippet) == "&lt;img src=x onerror=alert(1)&gt; <mark>widget</mark> &amp; co"
+
+
+def test_index_text_drops_mark_characters():
+    # Иначе текст документа мог бы сам открыть <mark> во фрагменте
+    assert index_text(f"a{_MARK_START}b{_MARK_END}c") == "a b c"
@@ -0,0 +1,93 @@
+"""
+Ключ сортировки позиций workflow шагов и выборка поддерева
+"""
+import random
+
+from sqlalchemy import insert
+
+from app.api.step_ordering import subtree_range
+from app.models.template import Template, WorkflowStep, position_sort_key
+
+
+def natural(position: str):
+    return [int(segment) for segment in position.split(".")]
+
+
+def test_sort_key_matches_numeric_order():
+    positions = ["1", "2", "2.1", "2.2", "2.10", "2.10.1", "3", "9", "10", "10.1", "11", "100"]
+    shuffled = positions[:]
+    random.Random(7).shuffle(shuffled)
+    assert sorted(shuffled, key=position_sort_key) == sorted(positions, key=natural) == positions
+
+
+def test_sort_key_format():
+    assert position_sort_key("2") == "000002"
+    assert position_sort_key("2.1") == "000002.000001"
+    assert position_sort_key(" 02 . 1 ") == position_sort_key("2.1")
+    assert position_sort_key(None) is None
+
+
+def test_parent_before_children_and_non_numeric_last():
+    keys = [position_sort_key(position) for position in ("2", "2.1", "2.x", "3", "x")]
+    assert keys == sorted(keys)
+    assert position_sort_key("2.") < position_sort_key("2.1")  # пустой сегмент - как 0
+
+
+def test_subtree_range_bounds():
+    low, high = subtree_range("2")
+    inside = [position_sort_key(position) for position in ("2.1", "2.10", "2.1.5", "2.x")]
+    outside = [position_sort_key(position) for position in ("2", "1.9", "3", "20", "20.1")]
+    assert all(low <= key < high for key in inside)
+    assert not any(low <= key < high for key in outside)
+
+
+def test_sort_key_is_set_for_orm_and_core_inserts(db):
+    template = Template(title="Ordering")
+    template.workflow_steps = [WorkflowStep(label="a", type="process", position="10")]
+    db.add(template)
+    db.flush()
+    db.execute(insert(WorkflowStep), [
+        {"template_id": template.id, "label": label, "type": "process", "position": position}
+        for label, position in (("b", "2.1"), ("c", "2"), ("d", "9"))
+    ])
+    db.commit()
+    db.expire(template)
+    assert [step.position for step in template.workflow_steps] == ["2", "2.1", "9", "10"]
+
+    step = template.workflow_steps[0]
+    step.position = "11"
+    db.commit()
+    assert step.sort_key == position_sort_key("11")
+
+
+def test_steps_endpoint_returns_subtree_in_order(client, db):
+    template = Template(title="Subtree")
+    template.workflow_steps = [
+        WorkflowStep(label=position, type="process", position=position)
+        for position in ("3", "2.10", "2", "2.2", "2.2.1", "20", "1")
+    ]
+    db.add(template)
+    db.commit()
+    response = client.get(f"/api/v1/templates/{template.id}/steps", params={"under": "2", "include_self": True})
+    assert response.status_code == 200
+    assert [step["position"] for step in response.json()] == ["2", "2.2", "2.2.1", "2.10"]
+    response = client.get(f"/api/v1/templates/{template.id}")
+    assert [step["position"] for step in response.json()["workflow_steps"]] == ["1", "2", "2.2", "2.2.1", "2.10", "3", "20"]
+
+
+def test_non_ascii_digits_are_not_numeric():
+    for position in ("²", "2.²", "٣", "2.٣"):
+        assert "~" in position_sort_key(position)
+    assert position_sort_key("2") < position_sort_key("2.²") < position_sort_key("3")
+
+
+def test_create_template_with_non_ascii_digit_position(client, admin_headers):
+    response = client.post("/api/v1/templates", headers=admin_headers, json={
+        "title": "Digits",
+        "workflow": [
+            {"label": "a", "type": "process", "position": "²"},
+            {"label": "b", "type": "process", "position": "1"},
+        ],
+    })
+    assert response.status_code == 201
+    assert [step["position"] for step in response.json()["workflow_steps"]] == ["1", "²"]
@@ -0,0 +1,53 @@
+"""
+Число SQL-запросов GET /templates не зависит от числа шаблонов:
+шаги загружаются одним selectin-запросом на страницу (без N+1)
+"""
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy import delete, event
+
+from app.core.database import engine
+from app.models.template import Template, WorkflowStep
+
+
+@contextmanager
+def count_statements() -> Iterator[List[str]]:
+    statements: List[str] = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+
+
+def seed_templates(session, count: int, steps: int) -> None:
+    for i in range(count):
+        template = Template(title=f"Template {i}", description="Тест", customizable=[], status="active")
+        template.workflow_steps = [
+            WorkflowStep(label=f"Шаг {j}", type="process", position=str(j)) for j in range(1, steps + 1)
+        ]
+        session.add(template)
+    session.commit()
+
+
+def test_list_templates_query_count_is_constant(client, db):
+    db.execute(delete(Template))
+    db.commit()
+    counts = []
+    total = 0
+    for count in (1, 10, 50):
+        seed_templates(db, count - total, steps=5)
+        total = count
+        with count_statements() as statements:
+            response = client.get("/api/v1/templates", params={"limit": 100})
+        assert response.status_code == 200
+        assert len(response.json()) == count
+        assert all(len(item["workflow_steps"]) == 5 for item in response.json())
+        counts.append(len(statements))
+    # шаблоны + шаги одним SELECT ... WHERE template_id IN (...)
+    assert counts == [2, 2, 2]
@@ -0,0 +1,105 @@
+"""
+Анализ графа workflow схемы: Тарьян (циклы), Кан (топологический порядок), достижимость
+"""
+from app.api.workflow_analysis import _strongly_connected, _topological_order, analyze_workflow
+
+
+def node(id, type="process", connections=()):
+    return {"id": id, "type": type, "connections": list(connections)}
+
+
+def codes(analysis):
+    return [issue["code"] for issue in analysis["issues"]]
+
+
+def test_linear_schema_is_valid():
+    analysis = analyze_workflow([
+        node("start", "trigger", ["check"]),
+        node("check", connections=["done"]),
+        node("done", "complete"),
+    ])
+    assert analysis["valid"]
+    assert analysis["issues"] == []
+    assert (analysis["node_count"], analysis["edge_count"]) == (3, 2)
+    assert analysis["topological_order"] == ["start", "check", "done"]
+
+
+def test_strongly_connected_components():
+    # 0 -> 1 -> 2 -> 0, 2 -> 3, 3 -> 3, 4 отдельно
+    components = _strongly_connected([[1], [2], [0, 3], [3], []])
+    assert sorted(sorted(component) for component in components) == [[0, 1, 2], [3], [4]]
+
+
+def test_cycles_and_self_loop():
+    analysis = analyze_workflow([
+        node("t", "trigger", ["a"]),
+        node("a", connections=["b"]),
+        node("b", connections=["a", "c"]),
+        node("c", connections=["c", "end"]),
+        node("end", "complete"),
+    ])
+    assert not analysis["valid"]
+    assert analysis["cycles"] == [["a", "b"], ["c"]]
+    assert codes(analysis).count("cycle") == 2
+    assert analysis["topological_order"] is None
+
+
+def test_deep_chain_does_not_hit_recursion_limit():
+    count = 20000
+    nodes = [node(f"n{i}", connections=[f"n{(i + 1) % count}"]) for i in range(count)]
+    analysis = analyze_workflow(nodes)
+    assert len(analysis["cycles"]) == 1
+    assert len(analysis["cycles"][0]) == count
+
+
+def test_topological_order_keeps_schema_order_for_ties():
+    # Кан с очередью: независимые узлы - в порядке схемы
+    assert _topological_order([[2], [2], [], []]) == [0, 1, 3, 2]
+    analysis = analyze_workflow([
+        node("b", "trigger", ["d"]),
+        node("a", "trigger", ["d"]),
+        node("d", "complete"),
+    ])
+    assert analysis["topological_order"] == ["b", "a", "d"]
+
+
+def test_integrity_errors():
+    analysis = analyze_workflow([
+        node("t", "trigger", ["x", {"target": "missing"}]),
+        node("x", connections=["end"]),
+        {"type": "process"},
+        node("x", connections=["t2"]),
+        node("end", "complete"),
+    ])
+    assert not analysis["valid"]
+    issues = {issue["code"]: issue["nodes"] for issue in analysis["issues"]}
+    assert issues["missing_id"] == ["#2"]
+    assert issues["duplicate_id"] == ["x"]
+    assert issues["dangling_edge"] == ["t->missing", "x->t2"]
+
+
+def test_reachability_warnings():
+    analysis = analyze_workflow([
+        node("t", "trigger", ["a", "stuck"]),
+        node("a", connections=["end"]),
+        node("stuck"),
+        node("orphan", connections=["end"]),
+        node("end", "complete"),
+    ])
+    assert analysis["valid"]  # предупреждения не делают схему невалидной
+    assert analysis["unreachable"] == ["orphan"]
+    assert analysis["dead_ends"] == ["stuck"]
+    assert codes(analysis) == ["unreachable", "dead_end"]
+
+
+def test_missing_trigger_and_complete():
+    analysis = analyze_workflow([node("a", connections=["b"]), node("b")])
+    assert codes(analysis) == ["no_trigger", "no_complete"]
+    assert analyze_workflow([])["issues"] == []
+    assert analyze_workflow("не список")["node_count"] == 0
+
+
+def test_steps_without_connections_skip_reachability():
+    analysis = analyze_workflow([node("t", "trigger"), node("a"), node("end", "complete")])
+    assert analysis["issues"] == []
+    assert analysis["unreachable"] == []
@@ -0,0 +1,55 @@
+"""
+Граф workflow схем: строки workflow_nodes / workflow_edges и запросы по типам узлов
+"""
+from sqlalchemy import delete
+
+from app.api.workflow_graph import graph_rows, node_targets, node_type_counts, templates_with_node_type
+from app.models.template import Template
+from app.models.workflow_schema import WorkflowSchema
+
+
+def test_node_targets_formats():
+    assert node_targets(["b", {"target": "c"}, {"id": "d"}, 5, "", None, True, {"x": 1}]) == ["b", "c", "d", "5"]
+    assert node_targets(None) == []
+    assert node_targets("b") == []
+
+
+def test_graph_rows_dedup_and_nodes_without_id():
+    nodes = [
+        {"id": "a", "type": "trigger", "label": "A", "connections": ["b", "b", {"target": "zz"}]},
+        {"id": "b", "type": "process", "label": 42},
+        {"id": "a", "type": "complete", "connections": ["b"]},  # повтор id: узел - первый, связь схлопнута
+        {"type": "complete", "connections": ["a"]},
+        "не узел",
+    ]
+    node_rows, edge_rows = graph_rows("s1", nodes)
+    assert node_rows == [
+        {"schema_id": "s1", "node_id": "a", "type": "trigger", "label": "A"},
+        {"schema_id": "s1", "node_id": "b", "type": "process", "label": None},
+        {"schema_id": "s1", "node_id": "#3", "type": "complete", "label": None},
+    ]
+    assert [(row["source"], row["target"]) for row in edge_rows] == [("a", "b"), ("a", "zz"), ("#3", "a")]
+    assert graph_rows("s1", {"not": "a list"}) == ([], [])
+
+
+def test_node_type_queries_skip_deleted_templates(db):
+    db.execute(delete(Template))
+    db.commit()
+    kept, removed = Template(title="Kept"), Template(title="Removed")
+    db.add_all([kept, removed])
+    db.flush()
+    db.add_all([
+        WorkflowSchema(template_id=kept.id, nodes=[{"id": "a", "type": "trigger"}, {"id": "b", "type": "email"}]),
+        WorkflowSchema(template_id=removed.id, nodes=[{"id": "a", "type": "email"}, {"id": "b", "type": "email"}]),
+    ])
+    db.commit()
+    assert {row["type"]: row["nodes"] for row in node_type_counts(db)} == {"email": 3, "trigger": 1}
+
+    db.delete(removed)
+    db.commit()
+    assert db.query(WorkflowSchema).count() == 1  # схема удалена каскадно вместе с шаблоном
+    assert node_type_counts(db) == [
+        {"type": "email", "nodes": 1, "templates": 1},
+        {"type": "trigger", "nodes": 1, "templates": 1},
+    ]
+    assert templates_with_node_type(db, "email", 0, 10) == [{"template_id": kept.id, "nodes": 1}]
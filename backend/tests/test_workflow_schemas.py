@@ -0,0 +1,34 @@
+"""
+Запись workflow схем: ссылка на шаблон проверяется до INSERT/UPDATE
+"""
+from app.models.template import Template
+
+
+def test_create_schema_for_missing_template_is_404(client, admin_headers):
+    response = client.post("/api/v1/workflow-schemas", headers=admin_headers, json={
+        "template_id": "no-such-template", "nodes": [],
+    })
+    assert response.status_code == 404
+    assert "no-such-template" in response.json()["detail"]
+
+
+def test_create_and_move_schema(client, db, admin_headers):
+    first, second, third = Template(title="First"), Template(title="Second"), Template(title="Third")
+    db.add_all([first, second, third])
+    db.commit()
+
+    response = client.post("/api/v1/workflow-schemas", headers=admin_headers, json={
+        "template_id": first.id, "nodes": [{"id": "a", "type": "trigger"}],
+    })
+    assert response.status_code == 201
+    assert client.post("/api/v1/workflow-schemas", headers=admin_headers, json={
+        "template_id": first.id, "nodes": [],
+    }).status_code == 400
+    client.post("/api/v1/workflow-schemas", headers=admin_headers, json={"template_id": third.id, "nodes": []})
+
+    url = f"/api/v1/workflow-schemas/template/{first.id}"
+    assert client.put(url, headers=admin_headers, json={"template_id": "no-such-template"}).status_code == 404
+    assert client.put(url, headers=admin_headers, json={"template_id": third.id}).status_code == 400
+    response = client.put(url, headers=admin_headers, json={"template_id": second.id})
+    assert response.status_code == 200
+    assert response.json()["template_id"] == second.id
@@ -10,6 +10,14 @@ export interface ApiError {
   detail: string;
 }
 
+/** Событие ленты изменений: id - как в пути API (page_id страницы, template_id схемы) */
+export interface ChangeEvent {
+  type: 'website' | 'template' | 'page' | 'settings' | 'workflow_schema';
+  id: string;
+  action: 'created' | 'updated' | 'deleted';
+  version: number | null;
+}
+
 /**
  * Класс для работы с API
  */
@@ -125,6 +133,20 @@ class ApiClient {
     this.setToken(null);
   }
 
+  // ========== Первичная загрузка ==========
+
+  /** Настройки, страницы, сайты, шаблоны и узлы workflow схем одним запросом */
+  async getBootstrap() {
+    return this.request<{
+      version: number;
+      settings: any;
+      pages: any[];
+      websites: any[];
+      templates: any[];
+      workflow_schemas: Record<string, any[]>;
+    }>('/bootstrap');
+  }
+
   // ========== Веб-сайты ==========
 
   async getWebsites(featured?: boolean) {
@@ -132,6 +154,27 @@ class ApiClient {
     return this.request(`/websites${params}`);
   }
 
+  /** Страница сайтов по фильтрам с общим числом и фасетами для фильтров портфолио */
+  async browseWebsites(filters: {
+    category?: string[];
+    technology?: string[];
+    technologyMatch?: 'any' | 'all';
+    client?: string[];
+    dateFrom?: string;
+    dateTo?: string;
+    featured?: boolean;
+  } = {}, skip = 0, limit = 24) {
+    const params = new URLSearchParams({ skip: String(skip), limit: String(limit) });
+    filters.category?.forEach((value) => params.append('category', value));
+    filters.technology?.forEach((value) => params.append('technology', value));
+    filters.client?.forEach((value) => params.append('client', value));
+    if (filters.technologyMatch) params.set('technology_match', filters.technologyMatch);
+    if (filters.dateFrom) params.set('date_from', filters.dateFrom);
+    if (filters.dateTo) params.set('date_to', filters.dateTo);
+    if (filters.featured !== undefined) params.set('featured', String(filters.featured));
+    return this.request(`/websites/browse?${params}`);
+  }
+
   async getWebsite(id: string) {
     return this.request(`/websites/${id}`);
   }
@@ -167,6 +210,17 @@ class ApiClient {
     return this.request(`/templates/${id}`);
   }
 
+  /** Шаги шаблона в порядке позиций; under - только поддерево позиции (шаги 2.x для "2") */
+  async getTemplateSteps(id: string, under?: string, includeSelf = false) {
+    const params = new URLSearchParams();
+    if (under !== undefined) {
+      params.set('under', under);
+      params.set('include_self', String(includeSelf));
+    }
+    const query = params.toString();
+    return this.request(`/templates/${id}/steps${query ? `?${query}` : ''}`);
+  }
+
   async createTemplate(data: any) {
     return this.request('/templates', {
       method: 'POST',
@@ -211,6 +265,31 @@ class ApiClient {
     });
   }
 
+  /** Частичное обновление content операциями JSON Patch (RFC 6902) */
+  async patchPage(pageId: string, operations: unknown[], version?: number) {
+    return this.request(`/pages/${pageId}`, {
+      method: 'PATCH',
+      body: JSON.stringify({ operations, version }),
+    });
+  }
+
+  /** История ревизий content страницы, новые первыми */
+  async getPageRevisions(pageId: string, skip = 0, limit = 50) {
+    return this.request(`/pages/${pageId}/revisions?skip=${skip}&limit=${limit}`);
+  }
+
+  /** content страницы в версии ревизии */
+  async getPageRevision(pageId: string, version: number) {
+    return this.request(`/pages/${pageId}/revisions/${version}`);
+  }
+
+  /** Вернуть content страницы к ревизии */
+  async rollbackPage(pageId: string, version: number) {
+    return this.request(`/pages/${pageId}/revisions/${version}/rollback`, {
+      method: 'POST',
+    });
+  }
+
   async deletePage(pageId: string) {
     return this.request(`/pages/${pageId}`, {
       method: 'DELETE',
@@ -254,11 +333,91 @@ class ApiClient {
     });
   }
 
+  /** Частичное обновление nodes операциями JSON Patch (RFC 6902) */
+  async patchWorkflowSchema(templateId: string, operations: unknown[], version?: number) {
+    return this.request(`/workflow-schemas/template/${templateId}`, {
+      method: 'PATCH',
+      body: JSON.stringify({ operations, version }),
+    });
+  }
+
   async deleteWorkflowSchema(templateId: string) {
     return this.request(`/workflow-schemas/template/${templateId}`, {
       method: 'DELETE',
     });
   }
+
+  /** История ревизий nodes схемы, новые первыми */
+  async getWorkflowSchemaRevisions(templateId: string, skip = 0, limit = 50) {
+    return this.request(`/workflow-schemas/template/${templateId}/revisions?skip=${skip}&limit=${limit}`);
+  }
+
+  /** nodes схемы в версии ревизии */
+  async getWorkflowSchemaRevision(templateId: string, version: number) {
+    return this.request(`/workflow-schemas/template/${templateId}/revisions/${version}`);
+  }
+
+  /** Вернуть nodes схемы к ревизии */
+  async rollbackWorkflowSchema(templateId: string, version: number) {
+    return this.request(`/workflow-schemas/template/${templateId}/revisions/${version}/rollback`, {
+      method: 'POST',
+    });
+  }
+
+  /** Анализ графа схемы: целостность связей, циклы, достижимость, топологический порядок */
+  async getWorkflowSchemaAnalysis(templateId: string) {
+    return this.request(`/workflow-schemas/template/${templateId}/analysis`);
+  }
+
+  /** Число узлов каждого типа во всех схемах */
+  async getWorkflowNodeTypes() {
+    return this.request('/workflow-schemas/node-types');
+  }
+
+  /** Шаблоны, в схемах которых есть узлы данного типа */
+  async getTemplatesWithNodeType(nodeType: string, skip = 0, limit = 100) {
+    return this.request(
+      `/workflow-schemas/node-types/${encodeURIComponent(nodeType)}/templates?skip=${skip}&limit=${limit}`
+    );
+  }
+
+  /** Узел схемы и его соседи по связям (incoming / outgoing) */
+  async getWorkflowNodeNeighbors(templateId: string, nodeId: string) {
+    return this.request(
+      `/workflow-schemas/template/${templateId}/nodes/${encodeURIComponent(nodeId)}/neighbors`
+    );
+  }
+
+  // ========== Массовый импорт ==========
+
+  async bulkImport(data: any) {
+    return this.request('/bulk/import', {
+      method: 'POST',
+      body: JSON.stringify(data),
+    });
+  }
+
+  // ========== Лента изменений ==========
+
+  /**
+   * Подписка на изменения контента (SSE): change - запись изменилась, reset - перечитать всё.
+   * EventSource сам переподключается и продолжает с Last-Event-ID. Возвращает функцию отписки
+   */
+  subscribeChanges(handlers: { onChange: (change: ChangeEvent) => void; onReset: () => void }) {
+    const source = new EventSource(`${this.baseUrl}/changes/stream`);
+    source.addEventListener('change', (event) => handlers.onChange(JSON.parse((event as MessageEvent).data)));
+    source.addEventListener('reset', () => handlers.onReset());
+    return () => source.close();
+  }
+
+  // ========== Поиск ==========
+
+  /** Полнотекстовый поиск по сайтам, шаблонам и страницам, результаты по релевантности */
+  async search(query: string, types?: Array<'website' | 'template' | 'page'>, skip = 0, limit = 20) {
+    const params = new URLSearchParams({ q: query, skip: String(skip), limit: String(limit) });
+    types?.forEach((type) => params.append('type', type));
+    return this.request(`/search?${params}`);
+  }
 }
 
 // Экспортируем singleton экземпляр
@@ -30,6 +30,32 @@ export interface SyncResult {
   };
 }
 
+interface BulkImportPayload {
+  settings?: Record<string, unknown>;
+  websites: Array<Record<string, unknown>>;
+  templates: Array<Record<string, unknown>>;
+  pages: Array<Record<string, unknown>>;
+  workflow_schemas: Array<{ template_id: string; nodes: unknown[] }>;
+  upsert: boolean;
+}
+
+interface BulkItemResult {
+  index: number;
+  status: 'created' | 'updated' | 'error';
+  id: string | null;
+  source_id: string | null;
+  error: string | null;
+}
+
+interface BulkImportResponse {
+  settings: BulkItemResult | null;
+  websites: BulkItemResult[];
+  templates: BulkItemResult[];
+  pages: BulkItemResult[];
+  workflow_schemas: BulkItemResult[];
+  template_id_map: Record<string, string>;
+}
+
 function parseJson<T>(key: string, raw: string | null): T | null {
   if (!raw) return null;
   try {
@@ -40,8 +66,8 @@ function parseJson<T>(key: string, raw: string | null): T | null {
 }
 
 /**
- * Собирает данные из LocalStorage и отправляет в API.
- * Порядок: настройки → веб-сайты → шаблоны → страницы → workflow-схемы (по новым id шаблонов).
+ * Собирает данные из LocalStorage и отправляет в API одним запросом /bulk/import
+ * (одна транзакция; template_id workflow-схем сопоставляются на сервере).
  */
 export async function syncLocalStorageToApi(): Promise<SyncResult> {
   const details: SyncResult['details'] = {
@@ -67,124 +93,123 @@ export async function syncLocalStorageToApi(): Promise<SyncResult> {
     };
   }
 
+  // Строим payload для /bulk/import
+  const payload: BulkImportPayload = {
+    websites: [],
+    templates: [],
+    pages: [],
+    workflow_schemas: [],
+    upsert: true,
+  };
+
+  if (settings && typeof settings === 'object') {
+    payload.settings = {
+      site_name: settings.site_name,
+      domain: settings.domain,
+      description: settings.description,
+      primary_color: settings.primary_color,
+      accent_color: settings.accent_color,
+      background_color: settings.background_color,
+      meta_title: settings.meta_title,
+      meta_description: settings.meta_description,
+      keywords: settings.keywords,
+    };
+  }
+
+  if (Array.isArray(websites)) {
+    payload.websites = websites.map(w => ({
+      name: w.name ?? '',
+      client: w.client ?? null,
+      description: w.description ?? null,
+      url: w.url ?? null,
+      screenshot: w.screenshot ?? null,
+      technologies: Array.isArray(w.technologies) ? w.technologies : [],
+      category: w.category ?? null,
+      date: w.date ?? null,
+      featured: Boolean(w.featured),
+    }));
+  }
+
+  if (Array.isArray(templates)) {
+    payload.templates = templates.map(t => ({
+      id: (t.id as string) ?? null,
+      title: t.title ?? '',
+      description: t.description ?? null,
+      customizable: Array.isArray(t.customizable) ? t.customizable : [],
+      status: (t.status as string) ?? 'active',
+      workflow: Array.isArray(t.workflow) ? t.workflow.map((s: Record<string, unknown>) => ({
+        label: s.label ?? '',
+        type: s.type ?? 'process',
+        description: s.description ?? null,
+        position: s.position ?? '',
+      })) : undefined,
+    }));
+  }
+
+  const importedPages = Array.isArray(pages)
+    ? pages.filter(p => Boolean(p.page_id ?? p.id))
+    : [];
+  payload.pages = importedPages.map(p => ({
+    page_id: (p.page_id ?? p.id) as string,
+    name: p.name ?? '',
+    sections: typeof p.sections === 'number' ? p.sections : 0,
+    updated: (p.updated as string) ?? null,
+    content: (p.content as Record<string, unknown>) ?? {},
+  }));
+
+  // Workflow-схемы: сервер сам сопоставит старые template_id с новыми
+  if (workflowSchemas && typeof workflowSchemas === 'object' && Array.isArray(templates)) {
+    for (const t of templates) {
+      const oldId = t.id as string;
+      const nodes = oldId ? workflowSchemas[oldId] : undefined;
+      if (!Array.isArray(nodes) || nodes.length === 0) continue;
+      payload.workflow_schemas.push({ template_id: oldId, nodes });
+    }
+  }
+
   try {
-    // 1. Настройки (PUT)
-    if (settings && typeof settings === 'object') {
-      try {
-        const payload = {
-          site_name: settings.site_name,
-          domain: settings.domain,
-          description: settings.description,
-          primary_color: settings.primary_color,
-          accent_color: settings.accent_color,
-          background_color: settings.background_color,
-          meta_title: settings.meta_title,
-          meta_description: settings.meta_description,
-          keywords: settings.keywords,
-        };
-        await apiClient.updateSettings(payload);
+    const response = await apiClient.bulkImport(payload) as BulkImportResponse;
+
+    if (response.settings) {
+      if (response.settings.status === 'error') {
+        details.settings.error = response.settings.error ?? undefined;
+      } else {
         details.settings.updated = true;
-      } catch (e) {
-        details.settings.error = e instanceof Error ? e.message : String(e);
       }
     }
-
-    // 2. Веб-сайты (POST каждый)
-    if (Array.isArray(websites)) {
-      for (const w of websites) {
-        try {
-          await apiClient.createWebsite({
-            name: w.name ?? '',
-            client: w.client ?? null,
-            description: w.description ?? null,
-            url: w.url ?? null,
-            screenshot: w.screenshot ?? null,
-            technologies: Array.isArray(w.technologies) ? w.technologies : [],
-            category: w.category ?? null,
-            date: w.date ?? null,
-            featured: Boolean(w.featured),
-          });
-          details.websites.created += 1;
-        } catch (e) {
-          details.websites.errors.push(w.name ? `${w.name}: ${e instanceof Error ? e.message : String(e)}` : String(e));
-        }
+    for (const item of response.websites) {
+      if (item.status === 'error') {
+        const name = payload.websites[item.index]?.name;
+        details.websites.errors.push(name ? `${name}: ${item.error}` : String(item.error));
+      } else {
+        details.websites.created += 1;
       }
     }
-
-    // 3. Шаблоны (POST каждый), собираем новые id по порядку
-    if (Array.isArray(templates)) {
-      for (const t of templates) {
-        try {
-          const workflow = Array.isArray(t.workflow) ? t.workflow.map((s: Record<string, unknown>) => ({
-            label: s.label ?? '',
-            type: s.type ?? 'process',
-            description: s.description ?? null,
-            position: s.position ?? '',
-          })) : undefined;
-          const created = await apiClient.createTemplate({
-            title: t.title ?? '',
-            description: t.description ?? null,
-            customizable: Array.isArray(t.customizable) ? t.customizable : [],
-            status: (t.status as string) ?? 'active',
-            workflow,
-          }) as { id: string };
-          details.templates.created += 1;
-          details.templates.newIds.push(created.id);
-        } catch (e) {
-          details.templates.errors.push(t.title ? `${t.title}: ${e instanceof Error ? e.message : String(e)}` : String(e));
-          details.templates.newIds.push('');
-        }
+    for (const item of response.templates) {
+      if (item.status === 'error') {
+        const title = payload.templates[item.index]?.title;
+        details.templates.errors.push(title ? `${title}: ${item.error}` : String(item.error));
+        details.templates.newIds.push('');
+      } else {
+        details.templates.created += 1;
+        details.templates.newIds.push(item.id ?? '');
       }
     }
-
-    // 4. Страницы: create или update (если уже есть — PUT)
-    if (Array.isArray(pages)) {
-      for (const p of pages) {
-        const pageId = (p.page_id ?? p.id ?? '') as string;
-        if (!pageId) continue;
-        const payload = {
-          name: p.name ?? '',
-          sections: typeof p.sections === 'number' ? p.sections : 0,
-          updated: (p.updated as string) ?? null,
-          content: (p.content as Record<string, unknown>) ?? {},
-        };
-        try {
-          await apiClient.createPage({ page_id: pageId, ...payload });
-          details.pages.created += 1;
-        } catch (e) {
-          const msg = e instanceof Error ? e.message : String(e);
-          if (msg.includes('уже существует') || msg.includes('already exists')) {
-            try {
-              await apiClient.updatePage(pageId, payload);
-              details.pages.created += 1; // считаем как успешную "синхронизацию"
-            } catch (e2) {
-              details.pages.errors.push(p.name ? `${p.name}: ${e2 instanceof Error ? e2.message : String(e2)}` : String(e2));
-            }
-          } else {
-            details.pages.errors.push(p.name ? `${p.name}: ${msg}` : msg);
-          }
-        }
+    for (const item of response.pages) {
+      if (item.status === 'error') {
+        const name = payload.pages[item.index]?.name;
+        details.pages.errors.push(name ? `${name}: ${item.error}` : String(item.error));
+      } else {
+        details.pages.created += 1;
       }
     }
-
-    // 5. Workflow-схемы: старый template_id → новый (по индексу)
-    if (workflowSchemas && typeof workflowSchemas === 'object' && Array.isArray(templates)) {
-      const oldIds = templates.map(t => t.id as string);
-      const newIds = details.templates.newIds;
-      for (let i = 0; i < oldIds.length; i++) {
-        const oldId = oldIds[i];
-        const newId = newIds[i];
-        const nodes = oldId ? workflowSchemas[oldId] : undefined;
-        if (!newId || !Array.isArray(nodes) || nodes.length === 0) continue;
-        try {
-          await apiClient.createWorkflowSchema({ template_id: newId, nodes });
-          details.workflowSchemas.created += 1;
-        } catch (e) {
-          details.workflowSchemas.errors.push(`Шаблон ${oldId}: ${e instanceof Error ? e.message : String(e)}`);
-        }
+    for (const item of response.workflow_schemas) {
+      if (item.status === 'error') {
+        details.workflowSchemas.errors.push(`Шаблон ${item.source_id}: ${item.error}`);
+      } else {
+        details.workflowSchemas.created += 1;
       }
     }
-
   } catch (e) {
     return {
       ok: false,
@@ -51,19 +51,36 @@ export function AppProviderWithAPI({ children }: { children: ReactNode }) {
   // Флаг использования API (можно переключать через env переменную)
   const useAPI = import.meta.env.VITE_USE_API !== 'false';
 
+  // Увеличивается по событию reset ленты изменений - данные перечитываются целиком
+  const [reloadToken, setReloadToken] = useState(0);
+
   // Загрузка данных с API при монтировании
   useEffect(() => {
     if (!useAPI) return;
 
     const loadData = async () => {
       try {
-        // Загружаем все данные параллельно
-        const [websitesData, templatesData, pagesData, settingsData] = await Promise.allSettled([
-          apiClient.getWebsites(),
-          apiClient.getTemplates(),
-          apiClient.getPages(),
-          apiClient.getSettings(),
-        ]);
+        // Всё одним запросом из снимка /bootstrap; если он недоступен - отдельные запросы параллельно
+        let bootstrap: any = null;
+        try {
+          bootstrap = await apiClient.getBootstrap();
+        } catch (error) {
+          console.warn('Снимок /bootstrap недоступен, загрузка по отдельности:', error);
+        }
+        const fulfilled = (value: any): PromiseSettledResult<any> => ({ status: 'fulfilled', value });
+        const [websitesData, templatesData, pagesData, settingsData] = bootstrap
+          ? [
+              fulfilled(bootstrap.websites),
+              fulfilled(bootstrap.templates),
+              fulfilled(bootstrap.pages),
+              fulfilled(bootstrap.settings),
+            ]
+          : await Promise.allSettled([
+              apiClient.getWebsites(),
+              apiClient.getTemplates(),
+              apiClient.getPages(),
+              apiClient.getSettings(),
+            ]);
 
         // Обрабатываем веб-сайты
         if (websitesData.status === 'fulfilled') {
@@ -128,8 +145,11 @@ export function AppProviderWithAPI({ children }: { children: ReactNode }) {
         }
         setLoading(prev => ({ ...prev, settings: false }));
 
-        // Загружаем workflow схемы для всех шаблонов (404 = схемы ещё нет, подставляем [])
-        if (templatesData.status === 'fulfilled') {
+        // Workflow схемы: из снимка или отдельно для каждого шаблона (404 = схемы ещё нет, подставляем [])
+        if (bootstrap) {
+          setWorkflowSchemas(bootstrap.workflow_schemas);
+          localStorage.setItem('atii_workflow_schemas', JSON.stringify(bootstrap.workflow_schemas));
+        } else if (templatesData.status === 'fulfilled') {
           const schemas: Record<string, WorkflowNode[]> = {};
           const schemaPromises = templatesData.value.map(async (template: any) => {
             try {
@@ -178,6 +198,57 @@ export function AppProviderWithAPI({ children }: { children: ReactNode }) {
     };
 
     loadData();
+  }, [useAPI, reloadToken]);
+
+  // Изменения от других администраторов и вкладок: точечное обновление записи вместо перезагрузки списков
+  useEffect(() => {
+    if (!useAPI || typeof EventSource === 'undefined') return;
+
+    const upsert = <T,>(items: T[], item: T, same: (a: T) => boolean) =>
+      items.some(same) ? items.map(existing => (same(existing) ? item : existing)) : [...items, item];
+
+    return apiClient.subscribeChanges({
+      onReset: () => setReloadToken(token => token + 1),
+      onChange: async ({ type, id, action }) => {
+        try {
+          if (type === 'website') {
+            if (action === 'deleted') {
+              setWebsites(prev => prev.filter(w => w.id !== id));
+            } else {
+              const website: any = await apiClient.getWebsite(id);
+              setWebsites(prev => upsert(prev, website, w => w.id === id));
+            }
+          } else if (type === 'template') {
+            if (action === 'deleted') {
+              setTemplates(prev => prev.filter(t => t.id !== id));
+              setWorkflowSchemas(prev => {
+                const { [id]: _removed, ...rest } = prev;
+                return rest;
+              });
+            } else {
+              const template: any = await apiClient.getTemplate(id);
+              const templateWithWorkflow = { ...template, workflow: template.workflow_steps || [] };
+              setTemplates(prev => upsert(prev, templateWithWorkflow, t => t.id === id));
+            }
+          } else if (type === 'page') {
+            if (action === 'deleted') {
+              setPages(prev => prev.filter(p => p.page_id !== id));
+            } else {
+              const page: any = await apiClient.getPage(id);
+              setPages(prev => upsert(prev, page, p => p.page_id === id));
+            }
+          } else if (type === 'settings') {
+            const settingsData: any = await apiClient.getSettings();
+            setSettings(settingsData);
+          } else if (type === 'workflow_schema') {
+            const schema: any = action === 'deleted' ? null : await apiClient.getWorkflowSchemaByTemplate(id);
+            setWorkflowSchemas(prev => ({ ...prev, [id]: schema?.nodes || [] }));
+          }
+        } catch (error) {
+          console.warn(`Не удалось применить изменение ${type} ${id}:`, error);
+        }
+      },
+    });
   }, [useAPI]);
 
   // Portfolio methods